@@ -12,5 +12,28 @@ def run_all_tests():
     sys.exit(pytest.main(["-sx", "./tests"]))  # do print, instant exit
 
 
+def run_benchmarks():
+    """
+    Time the hot paths and save the results as JSON in .benchmarks/. The
+    timings only compare on the same machine, so the folder is not committed:
+    save a baseline at a release, `poetry run bench --benchmark-save=release`,
+    then catch regressions against the latest run saved on this machine with
+    `poetry run bench --benchmark-compare --benchmark-compare-fail=mean:20%`,
+    or against a given one with `--benchmark-compare=0001`.
+    """
+    print("Running benchmarks...")
+    sys.exit(
+        pytest.main(
+            [
+                "./tests/perf_test.py",
+                "--benchmark-enable",  # disabled in pytest.ini for normal runs
+                "--benchmark-only",
+                "--benchmark-autosave",
+                *sys.argv[1:],
+            ]
+        )
+    )
+
+
 if __name__ == "__main__":
     run_all_tests()
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from whisper_note.final_pass import load_merged_audio
+from whisper_note.supportive_class import (
+    SegmentedArchive,
+    SegmentedArchiveWriter,
+    open_merged_audio,
+)
+
+START = datetime(2023, 10, 1, 12)
+RATE = 16000
+
+
+def _speech_like_chunks() -> list[bytes]:
+    """Tones with harmonics and a little noise, 2 s each, as s16le."""
+    rng = np.random.default_rng(0)
+    t = np.arange(2 * RATE) / RATE
+    chunks = []
+    for pitch in (140, 180, 220):
+        wave = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        noisy = 3000 * wave * (t < 1.5) + 30 * rng.standard_normal(len(t))
+        chunks.append(noisy.astype(np.int16).tobytes())
+    return chunks
+
+
+def _write(path, codec: str) -> list[bytes]:
+    chunks = _speech_like_chunks()
+    writer = open_merged_audio(path, RATE, 2, codec)
+    assert isinstance(writer, SegmentedArchiveWriter)
+    for i, pcm in enumerate(chunks):
+        writer.write(pcm, START + timedelta(seconds=2 * (i + 1)))
+    writer.close()
+    return chunks
+
+
+def test_zlib_archive_is_lossless_smaller_and_seekable(tmp_path):
+    path = tmp_path / "session.pcmz"
+    chunks = _write(path, "ZLIB")
+    assert path.stat().st_size < 0.7 * sum(map(len, chunks))
+
+    archive = SegmentedArchive(path)
+    assert [s.chunk for s in archive.segments] == [0, 1, 2]
+    assert [s.sample_offset for s in archive.segments] == [0, 2 * RATE, 4 * RATE]
+    at = lambda second: START + timedelta(seconds=second)
+    (second,) = archive.segments_between(at(2), at(4))  # a row of one chunk
+    assert second is archive.segments[1]
+    assert archive.read_pcm(second) == chunks[1]
+    # a streamed row spans the chunks it was joined from
+    assert archive.segments_between(at(0), at(6)) == archive.segments
+    assert archive.segments_between(at(3), at(5)) == archive.segments[1:]
+    assert archive.segments_between(at(6), at(7)) == []
+    assert len(archive.read_float32(archive.segments[1:])) == 4 * RATE
+
+    samples = load_merged_audio(path)  # what the merged transcription reads
+    expected = np.frombuffer(b"".join(chunks), np.int16) / 32768.0
+    assert np.array_equal(samples, expected.astype(np.float32))
+
+
+def test_index_cut_by_a_crash_keeps_the_written_segments(tmp_path):
+    path = tmp_path / "session.pcmz"
+    chunks = _write(path, "ZLIB")
+    index = path.with_suffix(".index.jsonl")
+    index.write_text(index.read_text()[:-20])  # the last line is cut
+    archive = SegmentedArchive(path)
+    assert len(archive.segments) == 2
+    assert archive.read_pcm(archive.segments[1]) == chunks[1]
+
+
+def test_flac_archive_round_trips(tmp_path):
+    pytest.importorskip("soundfile")
+    path = tmp_path / "session.flacs"
+    chunks = _write(path, "FLAC")
+    archive = SegmentedArchive(path)
+    assert [archive.read_pcm(s) for s in archive.segments] == chunks
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from whisper_note.asr_backend import WhisperBackend, get_asr_backend
+from whisper_note.supportive_class import EXAMPLE_CONFIG, InvalidConfigError
+
+
+def test_whisper_backend_transcribes_samples(tiny_whisper_checkpoint, monkeypatch):
+    config = EXAMPLE_CONFIG.mutated_copy(model=tiny_whisper_checkpoint)
+    asr = get_asr_backend(config)
+    assert isinstance(asr, WhisperBackend)
+    received = []
+    # the random model would decode for a long time, only check the plumbing
+    fake_transcribe = lambda audio, fp16, initial_prompt, **options: (
+        received.append((audio, initial_prompt, options)) or {"text": " hi "}
+    )
+    monkeypatch.setattr(asr.model, "transcribe", fake_transcribe)
+    samples = np.zeros(16000, np.float32)
+    assert asr.transcribe(samples) == "hi"
+    assert asr.transcribe(samples, prompt="Before.", fast=True) == "hi"
+    assert received == [
+        (samples, None, {}),
+        (samples, "Before.", {"temperature": 0.0, "condition_on_previous_text": False}),
+    ]
+
+
+def test_unknown_or_missing_backend_is_a_config_error():
+    with pytest.raises(InvalidConfigError):
+        get_asr_backend(EXAMPLE_CONFIG.mutated_copy(asr_backend="WHISPER_CPP"))
+    try:
+        import faster_whisper  # noqa: F401
+    except ImportError:
+        with pytest.raises(InvalidConfigError, match="faster-whisper"):
+            get_asr_backend(EXAMPLE_CONFIG.mutated_copy(asr_backend="FASTER_WHISPER"))
+
+
+def test_whisper_backend_decodes_chunks_in_one_batch(
+    tiny_whisper_checkpoint, monkeypatch
+):
+    asr = get_asr_backend(EXAMPLE_CONFIG.mutated_copy(model=tiny_whisper_checkpoint))
+    decoded_batches = []
+    decode = asr.model.decode
+    monkeypatch.setattr(
+        asr.model,
+        "decode",
+        lambda mel, options: decoded_batches.append(mel.shape) or decode(mel, options),
+    )
+    monkeypatch.setattr(asr, "transcribe", lambda audio, prompt, fast=False: "alone")
+    rng = np.random.default_rng(0)
+    audios = [rng.standard_normal(n).astype(np.float32) * 0.1 for n in (8000, 24000)]
+    texts = asr.transcribe_batch(audios, fast=True)
+    assert len(texts) == 2 and all(isinstance(text, str) for text in texts)
+    assert decoded_batches == [(2, 80, 3000)]  # both padded to 30 s, one decode
+    assert asr.transcribe_batch(audios[:1]) == ["alone"]
+    mel = asr.features(audios[0])
+    assert mel.shape == (80, 3000) and mel.device.type == "cpu"
+    asr.transcribe_batch(audios[:1], fast=True, features=[mel])
+    assert decoded_batches[-1] == (1, 80, 3000)  # precomputed, no `transcribe`
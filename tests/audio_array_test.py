@@ -0,0 +1,11 @@
+import numpy as np
+
+from whisper_note.supportive_class import pcm16_to_float32
+
+
+def test_pcm16_to_float32():
+    raw = np.array([0, 16384, -16384, 32767, -32768], dtype="<i2").tobytes()
+    samples = pcm16_to_float32(raw)
+    assert samples.dtype == np.float32
+    assert samples.tolist() == [0.0, 0.5, -0.5, 32767 / 32768, -1.0]
+    assert pcm16_to_float32(b"").shape == (0,)
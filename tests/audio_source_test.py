@@ -0,0 +1,133 @@
+import socket
+import wave
+from io import BytesIO
+from pathlib import Path
+from queue import Queue
+from threading import Event, Thread, current_thread
+
+import numpy as np
+import pytest
+
+from whisper_note.audio_source import SocketSource, StdinSource, WavFileSource
+from whisper_note.recorder import ChunkedRecorder
+from whisper_note.supportive_class import EXAMPLE_CONFIG, PreparedChunk
+
+RATE = 16000
+CONFIG = EXAMPLE_CONFIG.mutated_copy(energy_threshold=300, phrase_max_second=5)
+
+
+def _speech_pcm() -> bytes:
+    """1 s silence, then three 1 s tones with 1.5 s pauses, as s16le."""
+    t = np.arange(RATE) / RATE
+    tone = (8000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    pause = np.zeros(int(1.5 * RATE), np.int16)
+    return np.concatenate(
+        [pause[:RATE], tone, pause, tone, pause, tone, pause]
+    ).tobytes()
+
+
+def _record_all(source) -> list:
+    recorder = ChunkedRecorder(Queue(), CONFIG, source)
+    parts = []
+    with pytest.raises(EOFError):
+        while True:
+            parts.append(recorder.get_next_part())
+    recorder.close_source()
+    assert not recorder.pending_time_size
+    return parts
+
+
+def _assert_three_phrases(parts: list) -> None:
+    assert len(parts) == 3
+    times = [time for _, time, *_ in parts]
+    gaps = [(b - a).total_seconds() for a, b in zip(times, times[1:])]
+    assert all(2.0 < gap < 3.0 for gap in gaps)  # replayed time, not wall time
+    for samples, _, size, _ in parts:
+        assert samples.dtype == np.float32 and size == 2 * len(samples)
+
+
+def test_wav_replay_at_full_speed(tmp_path: Path):
+    path = tmp_path / "talk.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(_speech_pcm())
+    _assert_three_phrases(_record_all(WavFileSource(path, realtime=False)))
+
+
+def test_stdin_pcm():
+    _assert_three_phrases(_record_all(StdinSource(RATE, BytesIO(_speech_pcm()))))
+
+
+def test_tcp_socket_pcm():
+    source = SocketSource("127.0.0.1:0", RATE)
+    port = source._server.getsockname()[1]
+
+    def send() -> None:
+        with socket.create_connection(("127.0.0.1", port)) as client:
+            client.sendall(_speech_pcm())
+
+    sender = Thread(target=send)
+    sender.start()
+    _assert_three_phrases(_record_all(source))
+    sender.join()
+
+
+class GatedStdin(BytesIO):
+    """Holds the audio until `gate`."""
+
+    def __init__(self, data: bytes, gate: Event) -> None:
+        super().__init__(data)
+        self.gate = gate
+
+    def read(self, size: int | None = -1) -> bytes:
+        self.gate.wait()
+        return super().read(size)
+
+
+def test_chunks_are_prepared_on_the_feature_thread():
+    gate = Event()
+    recorder = ChunkedRecorder(
+        Queue(), CONFIG, StdinSource(RATE, GatedStdin(_speech_pcm(), gate))
+    )
+    threads = []
+    prepare = lambda samples: (
+        threads.append(current_thread().name)
+        or PreparedChunk(samples, samples[:10], "mel")
+    )
+    recorder.start_preparing(prepare)
+    gate.set()
+    parts = []
+    with pytest.raises(EOFError):
+        while True:
+            parts.append(recorder.get_next_part())
+    recorder.close_source()
+    assert threads == ["features"] * 3
+    assert [len(chunk.voiced) for chunk, *_ in parts] == [10] * 3
+    assert all(chunk.features == "mel" for chunk, *_ in parts)
+
+
+def test_stream_chunks_last_as_long_as_configured():
+    t = np.arange(5 * RATE) / RATE
+    speech = (8000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16).tobytes()
+    config = CONFIG.mutated_copy(phrase_max_second=2)
+    recorder = ChunkedRecorder(Queue(), config, StdinSource(RATE, BytesIO(speech)))
+    assert recorder.recognizer.energy_threshold == 300  # speech from the start
+    parts = []
+    with pytest.raises(EOFError):
+        while True:
+            parts.append(recorder.get_next_part())
+    recorder.close_source()
+    seconds = [len(samples) / RATE for samples, *_ in parts]
+    assert seconds[:2] == pytest.approx([2.0, 2.0], abs=0.1)
+
+
+def test_streaming_chunks_end_at_short_pauses():
+    config = CONFIG.mutated_copy(streaming_interval_ms=500)
+    recorder = ChunkedRecorder(Queue(), config, StdinSource(RATE, BytesIO(b"")))
+    with pytest.raises(EOFError):
+        recorder.get_next_part()
+    recorder.close_source()
+    assert recorder.recognizer.pause_threshold == 0.25
+    assert recorder.recognizer.non_speaking_duration == 0.125
@@ -0,0 +1,83 @@
+import json
+import wave
+from pathlib import Path
+
+import pytest
+
+import whisper_note.batch as batch
+from whisper_note.supportive_class import EXAMPLE_CONFIG
+
+
+class FakeAsr:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def transcribe(self, audio, prompt="", fast=False):
+        self.calls += 1
+        return f"{len(audio) // 16000} seconds."
+
+
+def _write_wav(path: Path, second: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\x00\x00" * 16000 * second)
+
+
+def test_batch_writes_live_outputs_and_resumes(tmp_path, monkeypatch):
+    _write_wav(tmp_path / "in" / "a.wav", 2)
+    _write_wav(tmp_path / "in" / "day 2" / "b.wav", 3)
+    (tmp_path / "in" / "notes.txt").write_text("not audio")
+    asr = FakeAsr()
+    monkeypatch.setattr(batch, "get_asr_backend", lambda config: asr)
+    config = EXAMPLE_CONFIG.mutated_copy(
+        live_history_html=Path("history.html"), live_history_srt=Path("history.srt")
+    )
+    out = tmp_path / "out"
+
+    report = batch.run_batch([tmp_path / "in"], out, config, workers=1)
+    assert (report.files, report.skipped, report.audio_second) == (2, 0, 5.0)
+    assert report.files_per_hour > 0 and "files/h" in str(report)
+    assert (out / "in" / "a.wav.txt").read_text() == "2 seconds."
+    day_2 = out / "in" / "day 2"
+    assert (day_2 / "b.wav.txt").read_text() == "3 seconds."
+    assert "3 seconds." in (day_2 / "b.wav.html").read_text()
+    assert "00:00:00,000 --> 00:00:03,000" in (day_2 / "b.wav.srt").read_text()
+    manifest = (out / batch.MANIFEST_NAME).read_text().splitlines()
+    assert [json.loads(line)["source"] for line in manifest] == [
+        str(tmp_path / "in" / "a.wav"),
+        str(tmp_path / "in" / "day 2" / "b.wav"),
+    ]
+
+    # an interrupted run left a partial line, and one file changed since
+    with open(out / batch.MANIFEST_NAME, "a") as f:
+        f.write('{"source": "cut')
+    _write_wav(tmp_path / "in" / "a.wav", 4)
+    report = batch.run_batch([tmp_path / "in"], out, config, workers=1)
+    assert (report.files, report.skipped) == (1, 1)
+    assert asr.calls == 3
+    assert (out / "in" / "a.wav.txt").read_text() == "4 seconds."
+    report = batch.run_batch([tmp_path / "in"], out, config, workers=1)
+    assert (report.files, report.skipped) == (0, 2)
+
+
+def test_outputs_never_collide(tmp_path):
+    for path in ("a/x.wav", "b/x.wav", "a/y.wav", "a/y.mp3"):
+        _write_wav(tmp_path / path, 1)
+    out = tmp_path / "out"
+    items = batch.collect_audio_files(
+        [tmp_path / "a", tmp_path / "b", tmp_path / "a" / "x.wav"], out
+    )
+    assert sorted(item.output(".txt") for item in items) == [
+        out / "a" / "x.wav.txt",
+        out / "a" / "y.mp3.txt",
+        out / "a" / "y.wav.txt",
+        out / "b" / "x.wav.txt",
+    ]  # a/x.wav once
+    _write_wav(tmp_path / "c" / "a" / "x.wav", 1)
+    with pytest.raises(ValueError, match="would both write"):
+        batch.collect_audio_files([tmp_path / "a", tmp_path / "c" / "a"], out)
+    with pytest.raises(ValueError, match="at least 1 worker"):
+        batch.run_batch([tmp_path / "a"], out, EXAMPLE_CONFIG, workers=-1)
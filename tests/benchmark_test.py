@@ -0,0 +1,19 @@
+import numpy as np
+
+from whisper_note.benchmark import run_benchmark, word_error_rate
+
+
+def test_word_error_rate():
+    assert word_error_rate("Hello, world!", "hello world") == 0
+    assert word_error_rate("the cat sat", "the cat sat down") == 1 / 3
+    assert word_error_rate("the cat sat", "a cat") == 2 / 3
+    assert word_error_rate("", "") == 0
+    assert word_error_rate("", "noise") == 1
+
+
+def test_run_benchmark():
+    fixtures = [("a", np.zeros(16000 * 2, np.float32), "yes okay")]
+    result = run_benchmark("fake", lambda samples: "yes", fixtures)
+    assert result.audio_second == 2
+    assert result.word_error_rate == 0.5
+    assert 0 <= result.real_time_factor < 1
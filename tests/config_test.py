@@ -1,4 +1,7 @@
-from whisper_note.supportive_class import EXAMPLE_CONFIG
+import pytest
+
+from whisper_note.parse_env_cfg import parse_env_and_config
+from whisper_note.supportive_class import EXAMPLE_CONFIG, InvalidConfigError
 
 
 def test_config():
@@ -7,3 +10,13 @@ def test_config():
     assert config.model == "small"
     config = config.mutated_copy(model="large")
     assert config.model == "large"
+
+
+@pytest.mark.parametrize(
+    "line", ["final_pass_window_second: 0", "final_pass_workers: 0"]
+)
+def test_final_pass_settings_that_never_finish_are_rejected(tmp_path, line):
+    (tmp_path / "config.yml").write_text(line + "\n")
+    (tmp_path / ".env").write_text("")
+    with pytest.raises(InvalidConfigError, match=line.split(":")[0]):
+        parse_env_and_config(str(tmp_path))
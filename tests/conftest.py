@@ -0,0 +1,27 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def tiny_whisper_checkpoint(tmp_path_factory) -> str:
+    """A randomly initialized, tiny whisper checkpoint: no download needed."""
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    dims = ModelDimensions(
+        n_mels=80,
+        n_audio_ctx=1500,
+        n_audio_state=64,
+        n_audio_head=2,
+        n_audio_layer=1,
+        n_vocab=51865,
+        n_text_ctx=448,
+        n_text_state=64,
+        n_text_head=2,
+        n_text_layer=1,
+    )
+    torch.manual_seed(0)
+    path = tmp_path_factory.mktemp("whisper") / "tiny-random.pt"
+    torch.save(
+        {"dims": dims.__dict__, "model_state_dict": Whisper(dims).state_dict()}, path
+    )
+    return str(path)
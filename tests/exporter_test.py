@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from whisper_note.exporter import (
+    HtmlExporter,
+    MarkdownExporter,
+    SrtExporter,
+    StreamingExporter,
+    VttExporter,
+    format_subtitle_time,
+)
+from whisper_note.transcription import Phrase
+
+START = datetime(2023, 10, 1, 12, 0, 0)
+
+
+def phrase(second: float, text: str, translated: str, duration: float) -> Phrase:
+    p = Phrase(START + timedelta(seconds=second), text, 1000, duration)
+    p.translated_text = translated
+    return p
+
+
+def test_format_subtitle_time():
+    assert format_subtitle_time(0, ",") == "00:00:00,000"
+    assert format_subtitle_time(3661.5, ",") == "01:01:01,500"
+    assert format_subtitle_time(59.9996, ".") == "00:01:00.000"
+
+
+def test_srt_and_vtt_are_written_row_by_row(tmp_path):
+    srt = SrtExporter(tmp_path / "a.srt", START)
+    vtt = VttExporter(tmp_path / "a.vtt", START)
+    for exporter in (srt, vtt):
+        exporter.write(phrase(4, "Hello", "你好", 3))
+    # readable before closing, e.g. when tailed or after a crash
+    assert (tmp_path / "a.srt").read_text() == (
+        "1\n00:00:01,000 --> 00:00:04,000\nHello\n你好\n\n"
+    )
+    for exporter in (srt, vtt):
+        exporter.write(phrase(6.25, "Bye", "", 1))
+        exporter.close()
+    assert (
+        (tmp_path / "a.srt")
+        .read_text()
+        .endswith("2\n00:00:05,250 --> 00:00:06,250\nBye\n\n")
+    )
+    assert (tmp_path / "a.vtt").read_text() == (
+        "WEBVTT\n\n"
+        "00:00:01.000 --> 00:00:04.000\nHello\n你好\n\n"
+        "00:00:05.250 --> 00:00:06.250\nBye\n\n"
+    )
+
+
+def test_markdown_and_html_escape_cells(tmp_path):
+    md = MarkdownExporter(tmp_path / "a.md", START)
+    md.write(phrase(1, "a | b", "c\nd", 1))
+    md.close()
+    assert (tmp_path / "a.md").read_text().splitlines()[-1] == (
+        "| 12:00:01:000 | a \\| b | c<br>d |"
+    )
+
+    page = HtmlExporter(tmp_path / "a.html", START)
+    page.write(phrase(1, "<b>", "", 1))
+    assert "</html>" not in (tmp_path / "a.html").read_text()
+    page.close()
+    content = (tmp_path / "a.html").read_text()
+    assert "<td>&lt;b&gt;</td>" in content and content.endswith("</html>\n")
+
+
+def test_an_exporter_without_a_format_cannot_be_opened(tmp_path):
+    class NoFormat(StreamingExporter):
+        ...
+
+    with pytest.raises(TypeError):
+        NoFormat(tmp_path / "a.txt", START)  # type: ignore[abstract]
+    assert not (tmp_path / "a.txt").exists()
@@ -0,0 +1,18 @@
+import wave
+
+from whisper_note.supportive_class import StreamingWavWriter
+
+
+def test_streaming_wav_writer_header_is_valid_after_each_chunk(tmp_path):
+    path = tmp_path / "merged.wav"
+    writer = StreamingWavWriter(path, sample_rate=44100, sample_width=2)
+    writer.write(b"\x01\x00" * 100)
+    with wave.open(str(path)) as wav:  # readable before closing, e.g. on crash
+        assert wav.getnframes() == 100
+    writer.write(b"\x02\x00" * 50)
+    assert writer.close() == path
+    writer.write(b"\x03\x00")  # dropped after closing
+    with wave.open(str(path)) as wav:
+        assert (wav.getnchannels(), wav.getsampwidth()) == (1, 2)
+        assert wav.getframerate() == 44100
+        assert wav.readframes(200) == b"\x01\x00" * 100 + b"\x02\x00" * 50
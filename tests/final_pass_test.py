@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from whisper_note.final_pass import find_windows, merge_overlapping_texts
+from whisper_note.supportive_class import WHISPER_SAMPLE_RATE
+
+
+def test_find_windows_cuts_at_silence():
+    rng = np.random.default_rng(0)
+    second = WHISPER_SAMPLE_RATE
+    speech = lambda s: rng.uniform(-0.5, 0.5, int(s * second)).astype(np.float32)
+    silence = lambda s: np.zeros(int(s * second), np.float32)
+    # 8 s speech, 1 s silence at 8-9 s, 8 s speech, silence at 17-18 s, 4 s speech
+    samples = np.concatenate([speech(8), silence(1), speech(8), silence(1), speech(4)])
+    windows = find_windows(samples, window_second=10, overlap_second=1)
+    assert windows[0][0] == 0 and windows[-1][1] == len(samples)
+    for (_, cut), (next_start, _) in zip(windows, windows[1:]):
+        assert 8 * second <= cut <= 9 * second or 17 * second <= cut <= 18 * second
+        assert cut - next_start == second  # overlap
+    assert all(end - start <= 11 * second for start, end in windows)
+
+
+def test_find_windows_short_audio_is_one_window():
+    samples = np.zeros(3 * WHISPER_SAMPLE_RATE, np.float32)
+    assert find_windows(samples, window_second=30) == [(0, len(samples))]
+
+
+def test_find_windows_too_short_to_advance_fails_fast():
+    samples = np.zeros(3 * WHISPER_SAMPLE_RATE, np.float32)
+    with pytest.raises(AssertionError):  # instead of windows until out of memory
+        find_windows(samples, window_second=0)
+
+
+def test_merge_overlapping_texts():
+    assert (
+        merge_overlapping_texts(["Hello there, how are", "How are you today?", ""])
+        == "Hello there, how are you today?"
+    )
+    assert merge_overlapping_texts(["No overlap.", "At all."]) == "No overlap. At all."
@@ -0,0 +1,147 @@
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from queue import Queue
+
+import numpy as np
+import pytest
+
+import whisper_note.inference as inference
+from whisper_note.pipeline import QueueWorker
+from whisper_note.scheduler import DecodeLevel
+from whisper_note.supportive_class import (
+    EXAMPLE_CONFIG,
+    RingSlice,
+    SharedAudioRing,
+    VoiceActivityDetector,
+)
+from whisper_note.transcriber import Transcriber
+from whisper_note.transcription import Transcriptions
+
+
+def _sum_in_ring(name: str, capacity: int, ring_slice: RingSlice) -> float:
+    ring = SharedAudioRing(capacity, name)
+    total = float(ring.read(ring_slice).sum())
+    ring.close()
+    return total
+
+
+def test_ring_wraps_around_and_never_overwrites_unreleased_samples():
+    ring = SharedAudioRing(10)
+    first = ring.write(np.arange(6, dtype=np.float32))
+    assert first == RingSlice(0, 6)
+    assert ring.write(np.ones(5, np.float32)) is None  # 11 > 10 unreleased
+    ring.release(6)
+    second = ring.write(np.full(7, 2, np.float32))
+    assert second == RingSlice(6, 7)
+    assert ring.read(second).tolist() == [2.0] * 7  # wrapped, from 6 to 3
+    assert ring.read(RingSlice(12, 2)).tolist() == [2.0, 3.0]  # 3 is not rewritten
+    with ProcessPoolExecutor(
+        1, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        assert pool.submit(_sum_in_ring, ring.name, 10, second).result() == 14.0
+    ring.close(unlink=True)
+
+
+class FakeInference:
+    def __init__(self, ring: SharedAudioRing) -> None:
+        self.ring = ring
+        self.received: list[list] = []
+        self.broken = False
+
+    def submit(self, audios, prompt="", fast=False):
+        self.received.append(audios)
+        done = Future()
+        done.set_result([f"{len(self.ring.read(audio))} samples" for audio in audios])
+        return done
+
+
+def test_chunks_go_to_the_workers_as_ring_slices():
+    transcriber = Transcriber.__new__(Transcriber)  # no microphone here
+    transcriber._captured_at = {}
+    transcriber.config = EXAMPLE_CONFIG
+    transcriber.data_q = Queue()
+    transcriber.transcription = Transcriptions(False)
+    transcriber.prompt = ""
+    transcriber.level = DecodeLevel.NORMAL
+    transcriber.vad = VoiceActivityDetector(-45)
+    transcriber._chunk_count = 0
+    transcriber.ring = SharedAudioRing(16000 * 10)
+    transcriber.inference = FakeInference(transcriber.ring)  # type: ignore
+    # not started, the test collects the rows itself
+    transcriber.results_worker = QueueWorker("results", transcriber._collect_rows, 0)
+
+    t = np.arange(16000) / 16000
+    tone = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    silence = np.zeros(16000, np.float32)
+    slices = [transcriber.ring.write(np.concatenate([silence, tone]))]
+    slices.append(transcriber.ring.write(silence))
+    times = [datetime(2023, 10, 1, 12, 0, s) for s in range(2)]
+    transcriber._submit_parts(
+        [(slices[0], times[0], 64000, 0.0), (slices[1], times[1], 32000, 0.0)]
+    )
+
+    (sent,) = transcriber.inference.received  # type: ignore
+    assert len(sent) == 1 and isinstance(sent[0], RingSlice)  # silence is dropped
+    assert 12000 < sent[0].start < 16000  # the leading silence is trimmed
+    assert sent[0].start + sent[0].length == 32000
+    decode = transcriber.results_worker.inbox.get_nowait()
+    assert decode.ring_end == 48000
+    results = []
+    transcriber._on_new_row = results.append  # type: ignore
+    transcriber._collect_rows(decode)
+    assert results == [0, None]
+    assert transcriber.ring.released == 48000
+    phrase = transcriber.transcription.phrases[0]
+    assert (phrase.timestamp, phrase.duration) == (times[0], 2.0)
+    assert phrase.text == f"{sent[0].length} samples"
+    transcriber.ring.close(unlink=True)
+
+
+class DyingPool:
+    """Its workers die once started, ProcessPoolExecutor then raises on submit."""
+
+    started = 0
+
+    def __init__(self, *args, **kwargs) -> None:
+        DyingPool.started += 1
+
+    def submit(self, fn, *args):
+        if fn is inference._ready:
+            return Future()  # the warm-up, before the worker died
+        raise BrokenProcessPool("A child process terminated abruptly")
+
+    def shutdown(self, wait=True) -> None:
+        ...
+
+
+def test_a_dead_worker_restarts_the_pool_then_decoding_falls_back(monkeypatch):
+    monkeypatch.setattr(inference, "ProcessPoolExecutor", DyingPool)
+    ring = SharedAudioRing(16000)
+    config = EXAMPLE_CONFIG.mutated_copy(inference_workers=2)
+    pool = inference.InferencePool(config, ring)
+    audio = [RingSlice(0, 10)]
+    for restart in range(1, inference.MAX_RESTARTS + 1):
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(audio)
+        assert pool.restarts == restart and not pool.broken
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(audio)
+    assert pool.broken and DyingPool.started == 1 + inference.MAX_RESTARTS
+
+    class FakeAsr:
+        def transcribe_batch(self, audios, prompt="", fast=False, features=None):
+            return [f"{len(audio)} samples here" for audio in audios]
+
+    transcriber = Transcriber.__new__(Transcriber)  # no microphone here
+    transcriber._captured_at = {}
+    transcriber.asr = FakeAsr()  # type: ignore
+    transcriber.fallback_asr = None
+    transcriber.prompt = ""
+    transcriber.level = DecodeLevel.NORMAL
+    transcriber.ring = ring
+    transcriber.inference = pool
+    future = transcriber._submit_to_workers([RingSlice(0, 10), np.ones(4, np.float32)])
+    assert future.result() == ["10 samples here", "4 samples here"]
+    ring.close(unlink=True)
@@ -0,0 +1,40 @@
+from urllib.request import urlopen
+
+from whisper_note.supportive_class import METRICS, serve_metrics
+from whisper_note.supportive_class.metrics import Metrics
+
+
+def test_histogram_as_prometheus_text_and_summary():
+    metrics = Metrics()
+    metrics.histogram("asr_seconds", "Speech recognition.", bounds=(0.1, 1))
+    metrics.counter("asr_calls_total", "Calls.")
+    metrics.gauge("queue_depth", "Waiting chunks.")
+    for value in (0.05, 0.5, 0.7, 3.0):
+        metrics.observe("asr_seconds", value)
+    metrics.inc("asr_calls_total", 4)
+    metrics.set("queue_depth", 2)
+    text = metrics.to_prometheus()
+    assert "# TYPE whisper_note_asr_seconds histogram" in text
+    assert 'whisper_note_asr_seconds_bucket{le="0.1"} 1' in text
+    assert 'whisper_note_asr_seconds_bucket{le="1"} 3' in text
+    assert 'whisper_note_asr_seconds_bucket{le="+Inf"} 4' in text
+    assert "whisper_note_asr_seconds_sum 4.25\nwhisper_note_asr_seconds_count 4" in text
+    assert "whisper_note_asr_calls_total 4\n" in text
+    assert "whisper_note_queue_depth 2\n" in text
+    assert metrics.summary() == (
+        "asr_seconds: n=4 mean=1.062 p50=1.000 p95=3.000 max=3.000\n"
+        "asr_calls_total: 4"
+    )
+
+
+def test_metrics_endpoint_serves_the_pipeline_metrics():
+    server = serve_metrics("127.0.0.1:0")
+    try:
+        host, port = server.server_address[:2]
+        with urlopen(f"http://{host}:{port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            body = response.read().decode()
+        assert body.startswith(METRICS.to_prometheus().split("\n", 1)[0])
+        assert "# TYPE whisper_note_end_to_end_seconds histogram" in body
+    finally:
+        server.shutdown()
@@ -0,0 +1,199 @@
+"""
+Benchmarks of the hot paths, with a deterministic stand-in for the model so
+they measure our code, not whisper. Plain `pytest` runs each once as a test,
+`poetry run bench` times them and saves JSON in .benchmarks/ to compare.
+"""
+from collections import deque
+from datetime import datetime, timedelta
+from io import StringIO
+from queue import Queue
+from time import perf_counter
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import whisper_note.transcriber as transcriber_module
+from whisper_note.cli import RichTable
+from whisper_note.pipeline import QueueWorker
+from whisper_note.supportive_class import (
+    EXAMPLE_CONFIG,
+    FrozenConfig,
+    StreamingWavWriter,
+    WavTimeSizeQueue,
+)
+from whisper_note.transcriber import Transcriber
+from whisper_note.transcription import Transcriptions
+
+START = datetime(2023, 10, 1, 12)
+RATE = 16000
+
+
+def _fixture_audio(chunks: int, second: float = 3.0) -> list[np.ndarray]:
+    """Tone bursts between pauses, the same samples on every run."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(second * RATE)) / RATE
+    audio = []
+    for i in range(chunks):
+        tone = 0.3 * np.sin(2 * np.pi * (150 + 10 * i) * t) * (t > 0.3) * (t < 2.5)
+        noise = 0.001 * rng.standard_normal(len(t))
+        audio.append((tone + noise).astype(np.float32))
+    return audio
+
+
+class StubAsr:
+    """Instant, deterministic transcripts: one word per 0.1 s of audio."""
+
+    model = None
+    config = EXAMPLE_CONFIG
+
+    def __init__(self, config: FrozenConfig) -> None:
+        self.config = config
+
+    def transcribe(self, audio, prompt="", fast=False) -> str:
+        return " ".join(f"w{i}" for i in range(len(audio) * 10 // RATE))
+
+    def transcribe_batch(
+        self, audios, prompt="", fast=False, features=None
+    ) -> list[str]:
+        return [self.transcribe(audio) for audio in audios]
+
+    def features(self, audio):
+        return None
+
+
+class StubTranslator:
+    def translate(self, text: str) -> str:
+        return text.upper()
+
+    def translate_batch(self, texts: list[str]) -> list[str]:
+        return [text.upper() for text in texts]
+
+
+class QuietRichTable(RichTable):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.console.file = StringIO()  # no terminal in the benchmark
+
+
+class ReplayRecorder:
+    """Stands in for the microphone: queues the fixture, then stops."""
+
+    def __init__(self, data_queue: WavTimeSizeQueue, config: FrozenConfig) -> None:
+        self.data_queue = data_queue
+        self.pending_time_size: deque[tuple[datetime, int]] = deque()
+        self.sample_rate_width = (RATE, 2)
+        self.started_at = START
+        self.recognizer = SimpleNamespace(energy_threshold=config.energy_threshold)
+        for i, samples in enumerate(_fixture_audio(60)):
+            time = START + timedelta(seconds=3 * i)
+            self.pending_time_size.append((time, len(samples) * 2))
+            data_queue.put((samples, time, len(samples) * 2, perf_counter()))
+
+    def get_next_part(self):
+        if self.data_queue.empty():
+            raise KeyboardInterrupt  # what Ctrl+C does to the live loop
+        chunk = self.data_queue.get()
+        self.pending_time_size.popleft()
+        return chunk
+
+    def close_source(self) -> None:
+        ...
+
+    def start_preparing(self, prepare) -> None:
+        ...  # everything is queued already
+
+    def get_ready_parts(self, limit: int):
+        parts = []
+        while len(parts) < limit and not self.data_queue.empty():
+            parts.append(self.get_next_part())
+        return parts
+
+
+def _transcriptions(rows: int) -> Transcriptions:
+    transcriptions = Transcriptions(False, rich_table=QuietRichTable())
+    for i in range(rows):
+        index = transcriptions.add_phrase(
+            START + timedelta(seconds=i), f"row {i}", 96000
+        )
+        transcriptions.phrases[index].translated_text = f"ROW {i}"  # type: ignore
+    return transcriptions
+
+
+def test_streaming_wav_writer(benchmark, tmp_path):
+    pcm = (np.arange(RATE, dtype=np.int16) % 2000).tobytes()  # 1 s per write
+
+    def write_a_minute() -> None:
+        (tmp_path / "merged.wav").unlink(missing_ok=True)
+        writer = StreamingWavWriter(tmp_path / "merged.wav", RATE, 2)
+        for _ in range(60):
+            writer.write(pcm)
+        writer.close()
+
+    benchmark(write_a_minute)
+    assert (tmp_path / "merged.wav").stat().st_size == 44 + 60 * len(pcm)
+
+
+@pytest.mark.parametrize("rows", [10, 1_000, 10_000])
+def test_rich_table_frame(benchmark, rows):
+    """One live update: slice the viewport, format it and draw the frame."""
+    transcriptions = _transcriptions(rows)
+    table = transcriptions.rich_table
+    pending = deque([(START, 32000)] * 3)
+
+    def frame() -> None:
+        transcriptions.rich_print(pending)
+        table.console.print(table._get_renderable())
+
+    try:
+        benchmark(frame)
+    finally:
+        table.close()
+    assert len(table._viewport[0]) == min(rows, table.max_rows)
+
+
+def test_transcriptions_append(benchmark):
+    benchmark(_transcriptions, 10_000)
+
+
+def test_transcriptions_iterate_and_slice(benchmark):
+    transcriptions = _transcriptions(10_000)
+    end = START + timedelta(seconds=6_000)
+
+    def read() -> int:
+        rows = sum(1 for _ in transcriptions.format_for_rich())
+        return rows + len(transcriptions.between(START, end))
+
+    assert benchmark(read) == 16_000
+
+
+def test_queue_handoff(benchmark):
+    """Items through a pipeline stage, from put to handled."""
+
+    def hand_over() -> None:
+        worker = QueueWorker("bench", lambda _: None, maxsize=32)
+        worker.start()
+        for i in range(10_000):
+            worker.put(i)
+        worker.stop()
+
+    benchmark(hand_over)
+
+
+def test_end_to_end_pipeline(benchmark, monkeypatch):
+    """A replayed 3-minute session through Transcriber with stub engines."""
+    monkeypatch.setattr(transcriber_module, "get_asr_backend", StubAsr)
+    monkeypatch.setattr(
+        transcriber_module, "get_translator", lambda _: StubTranslator()
+    )
+    monkeypatch.setattr(transcriber_module, "RichTable", QuietRichTable)
+    config = EXAMPLE_CONFIG.mutated_copy(translator="DEEPL")
+
+    def session() -> Transcriptions:
+        transcriber = Transcriber(config, recorder_factory=ReplayRecorder)  # type: ignore
+        transcriber.live_transcribe()
+        return transcriber.transcription
+
+    transcription = benchmark(session)
+    assert len(transcription) == 60
+    assert transcription.phrases[-1].translated_text.startswith("W0 W1")
@@ -0,0 +1,69 @@
+from threading import Event
+
+from whisper_note.pipeline import BatchQueueWorker, QueueWorker
+
+
+def test_queue_worker_handles_all_items_in_order():
+    handled = []
+    worker = QueueWorker("test", handled.append, maxsize=2)
+    worker.start()
+    for i in range(10):
+        worker.put(i)
+    worker.stop()
+    assert handled == list(range(10))
+    assert not worker.is_alive()
+
+
+def test_queue_worker_offer_coalesces_when_busy():
+    busy, release = Event(), Event()
+    handled = []
+
+    def slow_handle(item: int) -> None:
+        busy.set()
+        release.wait()
+        handled.append(item)
+
+    worker = QueueWorker("test", slow_handle, maxsize=1)
+    worker.start()
+    assert worker.offer(1)
+    busy.wait()  # 1 is being handled, inbox is empty again
+    assert worker.offer(2)
+    assert not worker.offer(3)  # inbox full, the pending request covers it
+    release.set()
+    worker.stop()
+    assert handled == [1, 2]
+
+
+def test_queue_worker_survives_a_failing_item():
+    handled = []
+
+    def handle(item: int) -> None:
+        if item == 1:
+            raise ValueError("bad item")
+        handled.append(item)
+
+    worker = QueueWorker("test", handle, maxsize=4)
+    worker.start()
+    for i in range(3):
+        worker.put(i)
+    worker.stop()
+    assert handled == [0, 2]
+
+
+def test_batch_queue_worker_coalesces_within_window():
+    batches = []
+    worker = BatchQueueWorker("test", batches.append, 16, max_batch=3, max_wait=5)
+    for i in range(7):  # queued before start, so the window never times out
+        worker.put(i)
+    worker.start()
+    worker.stop()
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_batch_queue_worker_does_not_wait_past_window():
+    batches = []
+    worker = BatchQueueWorker("test", batches.append, 16, max_batch=8, max_wait=0)
+    worker.start()
+    worker.put(1)
+    worker.stop()
+    assert batches == [[1]]
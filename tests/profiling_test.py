@@ -0,0 +1,33 @@
+import json
+import pstats
+from threading import Thread
+from time import sleep
+
+from whisper_note.profiling import Profiler
+
+
+def busy_stage(second: float) -> None:
+    sleep(second)
+
+
+def test_spans_samples_and_cprofile_are_written(tmp_path):
+    profiler = Profiler(tmp_path / "profile")
+    with profiler.span("asr", chunk=0):
+        busy_stage(0.05)
+    worker = Thread(target=busy_stage, args=(0.05,), name="translate")
+    worker.start()
+    with profiler.cprofile("on_stop"):
+        worker.join()
+    profiler.close()
+
+    trace = (tmp_path / "profile/stages.trace.json").read_text()
+    events = json.loads(trace.rstrip().rstrip(",") + "]")
+    spans = [event for event in events if event["ph"] == "X"]
+    assert [span["name"] for span in spans] == ["asr", "on_stop"]
+    assert spans[0]["args"] == {"chunk": 0} and spans[0]["dur"] >= 50_000
+    folded = (tmp_path / "profile/samples.folded").read_text().splitlines()
+    assert any(
+        line.startswith("translate;") and "busy_stage (profiling_test.py)" in line
+        for line in folded
+    )
+    assert pstats.Stats(str(tmp_path / "profile/on_stop.prof")).total_calls > 0
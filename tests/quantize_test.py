@@ -0,0 +1,50 @@
+import hashlib
+from pathlib import Path
+
+import torch
+import whisper
+
+import whisper_note.quantize as quantize
+
+
+def test_quantized_model_is_cached(tiny_whisper_checkpoint, tmp_path, monkeypatch):
+    monkeypatch.setattr(quantize, "QUANTIZED_CACHE_DIR", tmp_path)
+    model = quantize.load_quantized_model(tiny_whisper_checkpoint)
+    query = model.decoder.blocks[0].attn.query
+    assert isinstance(query, torch.ao.nn.quantized.dynamic.Linear)
+    assert quantize.quantized_cache_path(tiny_whisper_checkpoint).exists()
+
+    mel = torch.zeros(1, 80, 3000)
+    with torch.no_grad():
+        features = model.encoder(mel)  # runs on the int8 weights
+    assert features.shape == (1, 1500, 64)
+
+    loads = []
+    load = torch.load
+    monkeypatch.setattr(
+        torch,
+        "load",
+        lambda *args, **kwargs: loads.append(kwargs) or load(*args, **kwargs),
+    )
+    monkeypatch.setattr(whisper, "load_model", None)  # must not be called again
+    monkeypatch.setattr(quantize, "quantize_dynamic_int8", None)  # nor this
+    monkeypatch.setattr(hashlib, "sha256", None)  # the checksum is remembered
+    cached = quantize.load_quantized_model(tiny_whisper_checkpoint)
+    assert isinstance(cached.decoder.blocks[0].attn.query, type(query))
+    assert torch.equal(cached.decoder.blocks[0].attn.query.weight(), query.weight())
+    assert loads[-1]["weights_only"]  # the cache is a state dict, no pickled code
+    with torch.no_grad():
+        assert torch.equal(cached.encoder(mel), features)
+
+
+def test_quantized_cache_is_keyed_on_the_checkpoint(
+    tiny_whisper_checkpoint, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(quantize, "QUANTIZED_CACHE_DIR", tmp_path)
+    cache = quantize.quantized_cache_path(tiny_whisper_checkpoint)
+    changed = tmp_path / Path(tiny_whisper_checkpoint).name
+    checkpoint = torch.load(tiny_whisper_checkpoint)
+    checkpoint["model_state_dict"]["decoder.ln.weight"] += 1  # fine-tuned, same name
+    torch.save(checkpoint, changed)
+    other = quantize.quantized_cache_path(str(changed))
+    assert other.name != cache.name and other.stem.startswith(Path(changed).stem)
@@ -1,3 +1,6 @@
+from datetime import datetime
+from io import StringIO
+
 from rich.table import Table
 
 table = Table(
@@ -20,3 +23,43 @@ table.add_row(
     "✓",
     "_",
 )
+
+
+def test_live_print_keeps_viewport_and_reuses_formatted_rows(monkeypatch):
+    import whisper_note.cli as cli
+    from whisper_note.cli import RichTable
+
+    formatted = []
+    original = cli.format_bytes_str
+    monkeypatch.setattr(
+        cli, "format_bytes_str", lambda sz: formatted.append(sz) or original(sz)
+    )
+    rich_table = RichTable(max_rows=3)
+    monkeypatch.setattr(rich_table.console, "file", StringIO())  # no terminal
+    rows = [(f"00:00:0{i}:000", f"text {i}\n", 100 + i, True, False) for i in range(5)]
+    try:
+        rich_table.live_print(iter(rows), [])
+        assert formatted == [102, 103, 104]  # rows out of the viewport are skipped
+        assert [cells[1] for cells in rich_table._viewport[0]] == [
+            "text 2\n",
+            "text 3\n",
+            "text 4\n",
+        ]
+        formatted.clear()
+        rows[4] = ("00:00:04:000", "text 4\nTEXT 4", 104, True, True)  # translated
+        rows.append(("00:00:05:000", "text 5\n", 105, True, False))
+        rich_table.live_print(iter(rows[3:]), [], first_index=3)
+        assert formatted == [104, 105]  # row 3 is cached
+        table = rich_table._get_renderable().renderables[0]
+        assert table.row_count == 3
+    finally:
+        rich_table.close()
+
+
+def test_partial_row_dims_unstable_words():
+    from whisper_note.cli import RichTable
+
+    partial = (datetime(2023, 10, 1, 12), "hello [world]", "and")
+    cells = RichTable._format_partial(partial)
+    assert cells[1] == "hello \\[world] [italic dim]and[/]"
+    assert cells[3:] == ("…", "_")
@@ -0,0 +1,24 @@
+from whisper_note.scheduler import BacklogScheduler, DecodeLevel
+
+
+def test_scheduler_degrades_and_recovers_with_hysteresis():
+    scheduler = BacklogScheduler(max_chunks=4, max_lag_second=10, has_fallback=True)
+    assert scheduler.update(1, 2.0) == DecodeLevel.NORMAL
+    assert scheduler.update(4, 2.0) == DecodeLevel.FAST  # deep queue
+    assert scheduler.update(3, 6.0) == DecodeLevel.FAST  # not recovered yet
+    assert scheduler.update(2, 25.0) == DecodeLevel.FALLBACK_MODEL  # old chunk
+    assert scheduler.update(4, 12.0) == DecodeLevel.FALLBACK_MODEL
+    assert scheduler.update(1, 3.0) == DecodeLevel.FAST  # one level at a time
+    assert scheduler.update(0, 1.0) == DecodeLevel.NORMAL
+    assert scheduler.stats().endswith("s degraded")
+
+
+def test_scheduler_without_fallback_stays_fast():
+    scheduler = BacklogScheduler(max_chunks=4, max_lag_second=10, has_fallback=False)
+    assert scheduler.update(20, 60.0) == DecodeLevel.FAST
+
+
+def test_scheduler_ignores_the_depth_without_max_chunks():
+    scheduler = BacklogScheduler(max_chunks=0, max_lag_second=10, has_fallback=True)
+    assert scheduler.update(50, 2.0) == DecodeLevel.NORMAL
+    assert scheduler.update(50, 12.0) == DecodeLevel.FAST  # the lag still counts
@@ -0,0 +1,175 @@
+import json
+import socket
+from datetime import datetime
+from http.client import HTTPConnection
+from io import BytesIO
+from pathlib import Path
+from threading import Thread
+
+import numpy as np
+
+import whisper_note.server as server
+from whisper_note.supportive_class import EXAMPLE_CONFIG, PreparedChunk
+
+RATE = 16000
+CONFIG = EXAMPLE_CONFIG.mutated_copy(
+    energy_threshold=300,
+    phrase_max_second=5,
+    translator="NONE",
+    live_history_srt=Path("history.srt"),
+)
+
+
+class FakeAsr:
+    def __init__(self) -> None:
+        self.batches: list[int] = []
+
+    def transcribe_batch(self, audios, prompt="", fast=False, features=None):
+        self.batches.append(len(audios))
+        return [f"{len(audio) // 1600} tenths" for audio in audios]
+
+    def features(self, audio):
+        return None
+
+
+def _speech_pcm(tones: int) -> bytes:
+    """1 s silence, then 1 s tones with 1.5 s pauses, as s16le."""
+    t = np.arange(RATE) / RATE
+    tone = (8000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    pause = np.zeros(int(1.5 * RATE), np.int16)
+    return np.concatenate([pause[:RATE]] + [tone, pause] * tones).tobytes()
+
+
+def _new_server(tmp_path, monkeypatch, config=CONFIG) -> server.TranscriptionServer:
+    monkeypatch.setattr(server, "get_asr_backend", lambda config: FakeAsr())
+    return server.TranscriptionServer(config, "127.0.0.1:0", tmp_path / "sessions")
+
+
+def _request(address: str, method: str, path: str, body=None) -> dict:
+    connection = HTTPConnection(*address.split(":"))
+    connection.request(method, path, body, encode_chunked=body is not None)
+    response = connection.getresponse()
+    assert response.status in (200, 201), response.read()
+    return json.loads(response.read())
+
+
+def test_sessions_are_transcribed_concurrently_on_one_model(tmp_path, monkeypatch):
+    transcription_server = _new_server(tmp_path, monkeypatch)
+    transcription_server.start()
+    address = transcription_server.address
+    ids = [_request(address, "POST", "/sessions")["id"] for _ in range(2)]
+    streamed: list[str] = []
+    listener = HTTPConnection(*address.split(":"))
+    listener.request("GET", f"/sessions/{ids[0]}/transcript")
+    listen = lambda: streamed.extend(listener.getresponse().read().splitlines())
+    listening = Thread(target=listen)
+    listening.start()
+
+    results = {}
+    pcm = _speech_pcm(3)
+    upload = lambda id: results.update(
+        {
+            id: _request(
+                address,
+                "POST",
+                f"/sessions/{id}/audio",
+                (pcm[i : i + 4096] for i in range(0, len(pcm), 4096)),
+            )
+        }
+    )
+    uploads = [Thread(target=upload, args=(id,)) for id in ids]
+    for thread in uploads:
+        thread.start()
+    for thread in uploads + [listening]:
+        thread.join(timeout=30)
+    transcription_server.stop()
+
+    texts = [row["text"] for row in results[ids[0]]["rows"]]
+    assert len(texts) == 3 and texts[0].endswith("tenths")  # the tones, trimmed
+    for id in ids:
+        assert [row["text"] for row in results[id]["rows"]] == texts
+        srt = (tmp_path / "sessions" / f"{id}.srt").read_text()
+        assert srt.count("tenths") == 3
+    assert [json.loads(line)["text"] for line in streamed] == texts
+    assert not transcription_server.sessions  # closed once finished
+
+
+def test_rounds_take_one_chunk_per_session_in_turn(tmp_path, monkeypatch):
+    config = CONFIG.mutated_copy(decode_batch_size=1)
+    transcription_server = _new_server(tmp_path, monkeypatch, config)
+    talkative, quiet = (transcription_server.open_session() for _ in range(2))
+    samples = np.zeros(RATE, np.float32)
+    for session, chunks in ((talkative, 3), (quiet, 1)):
+        for _ in range(chunks):
+            chunk = PreparedChunk(samples, samples, None)
+            session.pending.append((chunk, datetime.now(), 2 * RATE, 0.0))
+    served = [
+        [session for session, *_ in transcription_server._next_round()]
+        for _ in range(4)
+    ]
+    assert served == [[talkative], [quiet], [talkative], [talkative]]
+    transcription_server.http.server_close()
+
+
+def test_an_upload_cut_between_chunks_ends_the_session(tmp_path, monkeypatch):
+    body = server.ChunkedBody(
+        BytesIO(b"4\r\nabcd\r\n"), {"Transfer-Encoding": "chunked"}
+    )
+    assert body.read(1024) == b"abcd"
+    assert body.read(1024) == body.read(1024) == b""  # no "0\r\n" chunk came
+
+    transcription_server = _new_server(tmp_path, monkeypatch)
+    transcription_server.start()
+    host, port = transcription_server.address.split(":")
+    session_id = _request(transcription_server.address, "POST", "/sessions")["id"]
+    pcm = _speech_pcm(1)
+    with socket.create_connection((host, int(port))) as client:
+        client.sendall(
+            f"POST /sessions/{session_id}/audio HTTP/1.1\r\nHost: {host}\r\n"
+            "Transfer-Encoding: chunked\r\n\r\n".encode()
+            + f"{len(pcm):x}\r\n".encode()
+            + pcm
+            + b"\r\n"
+        )
+        client.shutdown(socket.SHUT_WR)  # killed before the last chunk
+        client.settimeout(30)
+        response = b""
+        while data := client.recv(4096):
+            response += data
+    transcription_server.stop()
+    rows = json.loads(response.split(b"\r\n\r\n", 1)[1])["rows"]
+    assert len(rows) == 1
+    assert not transcription_server.sessions
+
+
+def test_a_failed_decode_does_not_stall_the_sessions(tmp_path, monkeypatch):
+    transcription_server = _new_server(tmp_path, monkeypatch)
+    decode = transcription_server.asr.transcribe_batch
+    calls = []
+
+    def fail_once(audios, prompt="", fast=False, features=None):
+        calls.append(len(audios))
+        if len(calls) == 1:
+            raise RuntimeError("CUDA out of memory")
+        return decode(audios, prompt, fast, features)
+
+    transcription_server.asr.transcribe_batch = fail_once  # type: ignore
+    transcription_server.start()
+    address = transcription_server.address
+    session_id = _request(address, "POST", "/sessions")["id"]
+    pcm = _speech_pcm(2)
+    result = _request(address, "POST", f"/sessions/{session_id}/audio", [pcm])
+    transcription_server.stop()
+    assert len(calls) == 2 and len(result["rows"]) == 1  # the first chunk is lost
+
+
+def test_audio_is_uploaded_with_put_as_curl_sends_it(tmp_path, monkeypatch):
+    transcription_server = _new_server(tmp_path, monkeypatch)
+    transcription_server.start()
+    address = transcription_server.address
+    session_id = _request(address, "POST", "/sessions")["id"]
+    pcm = _speech_pcm(1)
+    # `curl -T -` sends a pipe as a chunked PUT
+    result = _request(address, "PUT", f"/sessions/{session_id}/audio", [pcm])
+    transcription_server.stop()
+    assert len(result["rows"]) == 1 and result["rows"][0]["text"].endswith("tenths")
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+IMPORT_BUDGET_SECOND = 1.0  # generous for slow CI machines, ~0.15s locally
+
+
+def test_import_is_light_and_within_budget():
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import whisper_note\n"
+        "print(time.perf_counter() - start)\n"
+        "print(*(m for m in ('torch', 'whisper', 'deepl') if m in sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+    assert float(output[0]) < IMPORT_BUDGET_SECOND, f"import took {output[0]}s"
+    assert output[1] == "", f"heavy modules imported eagerly: {output[1]}"
+
+
+def test_help_does_not_load_the_model():
+    output = subprocess.run(
+        [sys.executable, "-m", "whisper_note", "--help"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert "--check-config" in output
@@ -0,0 +1,114 @@
+from collections import deque
+from datetime import datetime, timedelta
+from queue import Empty, Queue
+from types import SimpleNamespace
+
+import numpy as np
+
+from whisper_note.scheduler import DecodeLevel
+from whisper_note.streaming import StreamingHypothesis, carry_prompt, common_prefix
+from whisper_note.supportive_class import EXAMPLE_CONFIG
+from whisper_note.transcriber import Transcriber
+from whisper_note.transcription import Transcriptions
+
+
+def test_stable_words_are_agreed_by_two_hypotheses():
+    assert common_prefix(["a", "b", "c"], ["a", "b", "d"]) == ["a", "b"]
+    hypothesis = StreamingHypothesis()
+    hypothesis.update("hello wor")
+    assert hypothesis.stable_text == "" and hypothesis.unstable_text == "hello wor"
+    hypothesis.update("hello world and")
+    assert hypothesis.stable_text == "hello"
+    assert hypothesis.unstable_text == "world and"
+    assert carry_prompt("x" * 300, "done.").endswith("x done.")
+    assert len(carry_prompt("x" * 300, "done.")) == 200
+
+
+def test_streamed_chunks_become_one_final_phrase_with_prompt():
+    prompts, partials = [], []
+
+    class FakeAsr:
+        def transcribe(self, audio, prompt="", fast=False):
+            prompts.append(prompt)
+            return " ".join(["word"] * (len(audio) // 8000))
+
+    transcriber = Transcriber.__new__(Transcriber)  # no microphone here
+    transcriber._captured_at = {}
+    transcriber.config = EXAMPLE_CONFIG.mutated_copy(streaming_interval_ms=500)
+    transcriber.asr = FakeAsr()  # type: ignore
+    transcriber.data_q = Queue()
+    transcriber.transcription = Transcriptions(False)
+    transcriber.hypothesis = StreamingHypothesis()
+    transcriber.prompt = "Before."
+    transcriber.vad = None
+    transcriber.level = DecodeLevel.NORMAL
+    transcriber.profiler = None
+    transcriber._chunk_count = 0
+    set_partial = transcriber.transcription.set_partial
+    transcriber.transcription.set_partial = lambda *a: partials.append(a) or set_partial(*a)  # type: ignore
+
+    now = datetime.now()
+    half_second = np.zeros(8000, np.float32)
+    assert transcriber._stream_chunk(half_second, now, 16000, 0.0) is None
+    assert transcriber._stream_chunk(half_second, now, 16000, 0.0) is None
+    assert partials[-1] == (now, "word", "word")
+    # a short chunk was cut at a pause, the phrase is final
+    index = transcriber._stream_chunk(half_second[:4000], now, 8000, 0.0)
+    assert index == 0
+    phrase = transcriber.transcription.phrases[0]
+    assert phrase.text == "word word"  # 1.25 s of audio
+    assert phrase.wav_size == 40000 and phrase.duration == 1.25
+    assert transcriber.transcription.partial is None
+    assert prompts == ["Before."] * 3
+    assert transcriber.prompt == "Before. word word"
+    assert transcriber.hypothesis.chunks == []
+
+
+def test_a_phrase_ends_when_the_speaker_stops():
+    class FakeAsr:
+        def transcribe(self, audio, prompt="", fast=False):
+            return f"{len(audio) // 8000} halves"
+
+    class FakeRecorder:
+        recognizer = SimpleNamespace(pause_threshold=0.25)
+
+        def __init__(self, parts) -> None:
+            self.parts = parts
+
+        def get_next_part(self, timeout=None):
+            part = self.parts.pop(0)
+            if part is None:
+                assert timeout == 1.0  # two intervals
+                raise Empty
+            return part
+
+    transcriber = Transcriber.__new__(Transcriber)  # no microphone here
+    transcriber._captured_at = {}
+    transcriber.config = EXAMPLE_CONFIG.mutated_copy(streaming_interval_ms=500)
+    transcriber.asr = FakeAsr()  # type: ignore
+    transcriber.transcription = Transcriptions(False)
+    transcriber.hypothesis = StreamingHypothesis()
+    transcriber.prompt = ""
+    transcriber.level = DecodeLevel.NORMAL
+    transcriber.profiler = None
+    transcriber._chunk_count = 0
+    rows = []
+    transcriber._on_new_row = rows.append  # type: ignore
+
+    start = datetime(2023, 10, 1, 12)
+    half_second = np.zeros(8000, np.float32)
+    at = lambda second: (half_second, start + timedelta(seconds=second), 16000, 0.0)
+    transcriber.recorder = FakeRecorder(  # type: ignore
+        [at(0.5), None, at(5.0), at(5.5), at(6.5)]
+    )
+    # silence records nothing, the phrase ends after two intervals
+    transcriber.hypothesis.append(*transcriber._next_part())
+    assert transcriber._next_part() == at(5.0) and rows == [0]
+    assert transcriber.transcription.phrases[0].timestamp == at(0.5)[1]
+    transcriber.hypothesis.append(*at(5.0))
+    # a chunk that follows right after continues the phrase
+    transcriber.hypothesis.append(*transcriber._next_part())
+    assert rows == [0] and transcriber.hypothesis.duration == 1.0
+    # a replay reads faster than real time, the timestamps show the pause
+    assert transcriber._next_part() == at(6.5) and rows == [0, 1]
+    assert transcriber.transcription.phrases[1].text == "2 halves"
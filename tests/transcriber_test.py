@@ -0,0 +1,163 @@
+import wave
+from datetime import datetime
+from io import StringIO
+from queue import Queue
+from time import perf_counter, sleep
+
+import numpy as np
+import pytest
+
+import whisper_note.transcriber as transcriber_module
+from whisper_note.cli import RichTable
+from whisper_note.pipeline import QueueWorker
+from whisper_note.scheduler import DecodeLevel
+from whisper_note.supportive_class import (
+    EXAMPLE_CONFIG,
+    METRICS,
+    VoiceActivityDetector,
+)
+from whisper_note.transcriber import Transcriber
+from whisper_note.transcription import Transcriptions
+
+
+class FakeAsr:
+    def __init__(self) -> None:
+        self.batches: list[int] = []
+        self.received_features: list = []
+
+    def transcribe_batch(self, audios, prompt="", fast=False, features=None):
+        self.batches.append(len(audios))
+        self.received_features.append(features)
+        return [f"{len(audio)} samples" for audio in audios]
+
+
+def _bare_transcriber() -> Transcriber:
+    transcriber = Transcriber.__new__(Transcriber)  # no microphone here
+    transcriber._captured_at = {}
+    transcriber.config = EXAMPLE_CONFIG
+    transcriber.asr = FakeAsr()  # type: ignore
+    transcriber.fallback_asr = None
+    transcriber.data_q = Queue()
+    transcriber.transcription = Transcriptions(False)
+    transcriber.prompt = ""
+    transcriber.level = DecodeLevel.NORMAL
+    transcriber.vad = VoiceActivityDetector(-45)
+    transcriber.profiler = None
+    transcriber._chunk_count = 0
+    return transcriber
+
+
+def test_pending_chunks_are_decoded_in_one_batch_in_order():
+    transcriber = _bare_transcriber()
+    t = np.arange(16000) / 16000
+    tone = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    times = [datetime(2023, 10, 1, 12, 0, s) for s in range(3)]
+    silence = np.zeros(16000, np.float32)
+    parts = [(tone, times[0], 32000, 0.0), (silence, times[1], 32000, 0.0)]
+    parts.append((tone[:8000], times[2], 16000, 0.0))
+    indices = transcriber._transcribe_parts(parts)
+    assert indices == [0, None, 1]  # the silent chunk never reached the model
+    assert transcriber.asr.batches == [2]  # type: ignore
+    first, second = transcriber.transcription.phrases
+    assert (first.timestamp, first.text, first.duration) == (
+        times[0],
+        "16000 samples",
+        1.0,
+    )
+    assert (second.timestamp, second.duration) == (times[2], 0.5)
+
+
+def test_prepared_chunks_reach_the_model_with_their_features():
+    transcriber = _bare_transcriber()
+    transcriber.asr.features = lambda audio: f"mel of {len(audio)}"  # type: ignore
+    t = np.arange(16000) / 16000
+    tone = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    silence = np.zeros(16000, np.float32)
+    prepared = transcriber._prepare(np.concatenate([silence, tone]))
+    assert len(prepared.voiced) < 32000 and prepared.features.startswith("mel of")
+    assert transcriber._prepare(silence).features is None
+    time = datetime(2023, 10, 1, 12)
+    assert transcriber._transcribe_parts([(prepared, time, 64000, 0.0)]) == [0]
+    assert transcriber.asr.received_features == [[prepared.features]]  # type: ignore
+    assert transcriber.transcription.phrases[0].duration == 2.0
+
+
+class FailingTranslator:
+    def translate_batch(self, texts):
+        raise ConnectionError("DeepL is down")
+
+
+def test_rows_are_exported_when_the_translation_fails():
+    transcriber = _bare_transcriber()
+    transcriber.transcription = Transcriptions(False, FailingTranslator())  # type: ignore
+    transcriber._recognized_at = {0: 0.0}
+    transcriber.export_worker = QueueWorker("export", lambda index: None, 0)
+    transcriber.render_worker = QueueWorker("render", lambda _: None, 1)
+    time = datetime(2023, 10, 1, 12)
+    transcriber.transcription.add_phrase(time, "Hello", 32000)
+    with pytest.raises(ConnectionError):
+        transcriber._translate_rows([0])
+    assert transcriber.export_worker.inbox.get_nowait() == 0  # untranslated
+    assert not transcriber._recognized_at
+
+
+def test_latency_is_measured_from_the_capture_not_the_replayed_time(monkeypatch):
+    observed = []
+    monkeypatch.setattr(METRICS, "observe", lambda *metric: observed.append(metric))
+    transcriber = _bare_transcriber()
+    transcriber.exporters = []
+    replayed = datetime(2023, 10, 1, 12)  # the timestamp of a file read long after
+    t = np.arange(16000) / 16000
+    tone = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    (index,) = transcriber._transcribe_parts([(tone, replayed, 32000, perf_counter())])
+    transcriber._export_row(index)
+    ((_, lag),) = [metric for metric in observed if metric[0] == "end_to_end_seconds"]
+    assert 0 <= lag < 1
+    assert not transcriber._captured_at
+
+
+class SlowAsr:
+    """Takes a second to load, as a real model does, while the WAV replays."""
+
+    def __init__(self, config) -> None:
+        sleep(1)
+
+    def transcribe_batch(self, audios, prompt="", fast=False, features=None):
+        return ["tone" for _ in audios]
+
+    def features(self, audio):
+        return None
+
+
+class QuietRichTable(RichTable):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.console.file = StringIO()
+
+
+def test_subtitles_are_timed_from_the_start_of_the_recording(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcriber_module, "get_asr_backend", SlowAsr)
+    monkeypatch.setattr(transcriber_module, "RichTable", QuietRichTable)
+    t = np.arange(16000) / 16000
+    tone = (8000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    pause = np.zeros(24000, np.int16)
+    path = tmp_path / "talk.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(np.concatenate([pause, tone, pause, tone, pause]).tobytes())
+    config = EXAMPLE_CONFIG.mutated_copy(
+        audio_source="WAV",
+        audio_source_path=str(path),
+        audio_source_realtime=False,
+        energy_threshold=300,
+        translator="NONE",
+        live_history_srt=tmp_path / "talk.srt",
+    )
+    transcriber = Transcriber(config)  # replays the whole WAV while loading
+    transcriber.live_transcribe()
+    cues = (tmp_path / "talk.srt").read_text().split("\n\n")
+    # the tones end at 2.5 s and 5 s, the chunks after the pause that ends them
+    ends = [float(cue.split(" --> ")[1][6:12].replace(",", ".")) for cue in cues[:2]]
+    assert 3 <= ends[0] < 4 and 5.5 <= ends[1] < 6.5  # not 1 s earlier
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from whisper_note.transcription import Transcriptions
 
@@ -17,3 +17,28 @@ def test_transcription_iter() -> None:
     assert next_or_zeroes(it2)[1] == "2"
     assert next(it1) is None
     assert next(it2) is None
+
+
+def test_transcription_between_and_clear() -> None:
+    t = Transcriptions(False)
+    start = datetime(2023, 10, 1, 12, 0, 0)
+    for second, text in enumerate(["a", "", "b", "c"]):
+        t.add_phrase(start + timedelta(seconds=second), text, second)
+    assert len(t) == 3  # empty text is not a phrase
+    phrases = t.between(start + timedelta(seconds=1), start + timedelta(seconds=3))
+    assert [p.text for p in phrases] == ["b"]
+    assert [p.wav_size for p in t.between(start, start + timedelta(hours=1))] == [
+        0,
+        2,
+        3,
+    ]
+    t.clear()
+    assert len(t) == 0 and len(t.epochs) == 0
+    assert t.between(start, start + timedelta(hours=1)) == []
+
+
+def test_transcription_rows_are_slotted() -> None:
+    t = Transcriptions(False)
+    t.add_phrase(datetime.now(), "1", 1)
+    assert not hasattr(t.phrases[0], "__dict__")
+    assert t.live_translate(0) == ""  # no translator
@@ -0,0 +1,88 @@
+from typing import Sequence
+
+from whisper_note.supportive_class import EXAMPLE_CONFIG, CachedTranslator, Language
+
+
+class CountingTranslator:
+    """Stand-in for DeepL, records every batch it is asked for."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    def translate(self, text: str) -> str:
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts: Sequence[str]) -> list[str]:
+        self.batches.append(list(texts))
+        return [text.upper() for text in texts]
+
+
+def test_cached_translator_memory_lru():
+    config = EXAMPLE_CONFIG.mutated_copy(translation_cache_memory_size=2)
+    inner = CountingTranslator()
+    cached = CachedTranslator(inner, config)  # type: ignore[arg-type]
+    assert cached.translate_batch(["yes", "okay", "yes"]) == ["YES", "OKAY", "YES"]
+    assert inner.batches == [["yes", "okay"]]
+    assert cached.translate("okay") == "OKAY"
+    assert cached.translate("next slide") == "NEXT SLIDE"  # evicts "yes"
+    assert cached.translate("yes") == "YES"
+    assert inner.batches == [["yes", "okay"], ["next slide"], ["yes"]]
+    assert cached.stats() == {"hits": 2, "misses": 4, "memory": 2}
+
+
+def test_cached_translator_persists_across_sessions(tmp_path):
+    config = EXAMPLE_CONFIG.mutated_copy(
+        translation_cache=tmp_path / "cache.sqlite3", translation_cache_memory_size=0
+    )
+    first = CachedTranslator(CountingTranslator(), config)  # type: ignore[arg-type]
+    assert first.translate_batch(["yes", "okay"]) == ["YES", "OKAY"]
+    first.close()
+
+    inner = CountingTranslator()
+    second = CachedTranslator(inner, config)  # type: ignore[arg-type]
+    assert second.translate_batch(["okay", "yes"]) == ["OKAY", "YES"]
+    assert inner.batches == []
+    assert second.stats()["hits"] == 2
+
+    # the key includes the languages
+    other_langs = CachedTranslator(
+        inner, config.mutated_copy(target_lang=Language.ES)  # type: ignore[arg-type]
+    )
+    assert other_langs.translate("yes") == "YES"
+    assert inner.batches == [["yes"]]
+
+
+def test_cached_translator_evicts_disk_rows(tmp_path):
+    config = EXAMPLE_CONFIG.mutated_copy(
+        translation_cache=tmp_path / "cache.sqlite3",
+        translation_cache_memory_size=0,
+        translation_cache_max_rows=2,
+    )
+    cached = CachedTranslator(CountingTranslator(), config)  # type: ignore[arg-type]
+    for text in ["a", "b", "c"]:
+        cached.translate(text)
+    assert cached.db is not None
+    rows = cached.db.execute("SELECT text FROM translation ORDER BY text").fetchall()
+    assert rows == [("b",), ("c",)]
+
+
+def test_cached_translator_keeps_the_rows_read_from_disk(tmp_path):
+    config = EXAMPLE_CONFIG.mutated_copy(
+        translation_cache=tmp_path / "cache.sqlite3",
+        translation_cache_memory_size=0,
+        translation_cache_max_rows=2,
+    )
+    first = CachedTranslator(CountingTranslator(), config)  # type: ignore[arg-type]
+    first.translate_batch(["a", "b"])
+    first.close()
+
+    inner = CountingTranslator()
+    second = CachedTranslator(inner, config)  # type: ignore[arg-type]
+    assert second.rows == 2  # counted once, not on every insert
+    assert second.translate_batch(["a", "c"]) == ["A", "C"]  # reads "a", adds "c"
+    assert inner.batches == [["c"]]
+    assert second.db is not None
+    rows = second.db.execute("SELECT text FROM translation ORDER BY text").fetchall()
+    assert rows == [("a",), ("c",)] and second.rows == 2  # "b" was used least
+    indices = second.db.execute("PRAGMA index_list(translation)").fetchall()
+    assert "translation_used_at" in [index[1] for index in indices]
@@ -1,3 +1,7 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
 from whisper_note.supportive_class import Language, EXAMPLE_CONFIG, DeepLTranslator
 
 
@@ -13,3 +17,60 @@ def test_deepl_translate():
     translator = DeepLTranslator(config)
     test_translate = translator.translate("お名前をいただけますか？")
     assert test_translate == "请问你叫什么名字？", f"expected '请问你叫什么名字？', got {test_translate=}"
+
+
+class StandInDeepL(BaseHTTPRequestHandler):
+    """Answers /v2/translate like DeepL, upper-casing the texts."""
+
+    requests: list[list[str]] = []
+    fail_next = 0  # answer 429 to the next n requests
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if StandInDeepL.fail_next > 0:
+            StandInDeepL.fail_next -= 1
+            self.send_response(429)
+            self.end_headers()
+            return
+        StandInDeepL.requests.append(body["text"])
+        translations = [
+            {
+                "text": t.upper(),
+                "detected_source_language": "EN",
+                "billed_characters": len(t),
+            }
+            for t in body["text"]
+        ]
+        payload = json.dumps({"translations": translations}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *_) -> None:
+        ...  # keep pytest output clean
+
+
+def test_deepl_translate_batch_with_stand_in_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInDeepL)
+    Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("DEEPL_API_KEY", "stand-in-key")
+    config = EXAMPLE_CONFIG.mutated_copy(
+        translator_server_url=f"http://127.0.0.1:{server.server_port}",
+        translator_max_retries=2,
+    )
+    try:
+        translator = DeepLTranslator(config)
+        StandInDeepL.requests.clear()
+        StandInDeepL.fail_next = 1  # retried with backoff by the SDK
+        assert translator.translate_batch(["yes", "", "next slide"]) == [
+            "YES",
+            "",
+            "NEXT SLIDE",
+        ]
+        assert StandInDeepL.requests == [["yes", "next slide"]]  # one request
+        assert translator.translate_batch(["", ""]) == ["", ""]  # no request
+        assert len(StandInDeepL.requests) == 1
+    finally:
+        server.shutdown()
@@ -0,0 +1,58 @@
+import numpy as np
+
+from whisper_note.supportive_class import VoiceActivityDetector
+
+RATE = 16000
+
+
+def _tone(second: float, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(round(second * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _noise(second: float, amplitude: float = 0.001) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (amplitude * rng.standard_normal(round(second * RATE))).astype(np.float32)
+
+
+def test_trim_keeps_speech_with_padding():
+    vad = VoiceActivityDetector(-45)
+    chunk = np.concatenate([_noise(1), _tone(1), _noise(1)])
+    trimmed = vad.trim(chunk)
+    assert 1.0 <= len(trimmed) / RATE <= 1.5  # the tone and 0.2 s on each side
+    assert np.abs(trimmed).max() > 0.29
+    assert vad.chunks == 1 and vad.dropped_chunks == 0
+    assert abs(vad.skipped_second - (3 - len(trimmed) / RATE)) < 1e-9
+
+
+def test_noise_and_clicks_are_dropped():
+    vad = VoiceActivityDetector(-45)
+    assert len(vad.trim(_noise(2))) == 0
+    click = _noise(2)
+    click[16000:16480] = 0.5  # one loud frame
+    assert not vad.has_speech(click)
+    hiss = _noise(1, amplitude=0.3)  # loud but crosses zero like white noise
+    assert len(vad.trim(hiss)) == 0
+    assert len(vad.trim(np.zeros(100, np.float32))) == 0  # shorter than a frame
+    assert vad.dropped_chunks == 3
+    assert vad.stats() == "3/3 chunks dropped, 3.0s of 3.0s audio not decoded"
+
+
+def test_continuous_speech_never_becomes_the_noise_floor():
+    vad = VoiceActivityDetector(-45, energy_threshold=500)  # about -36 dBFS
+    t = np.arange(2 * RATE) / RATE
+    steady = _tone(2)
+    wavering = (steady * (0.75 + 0.25 * np.sin(2 * np.pi * 3 * t))).astype(np.float32)
+    for _ in range(100):  # over 6 minutes of speech, as the recorder hands over
+        assert len(vad.trim(steady)) == len(steady)
+        assert len(vad.trim(wavering)) == len(wavering)
+    assert vad.noise_floor_db == -55  # no frame was quiet enough to learn from
+
+
+def test_noise_floor_follows_the_quiet_frames_below_threshold():
+    vad = VoiceActivityDetector(-45, energy_threshold=500)
+    hum = _noise(1, amplitude=0.01)  # -40 dBFS, below the recorder's threshold
+    for _ in range(50):
+        vad.speech_mask(np.concatenate([hum, _tone(1)]))
+    assert vad.noise_floor_db == -45  # risen to the hum, capped at threshold_db
+    assert vad.has_speech(np.concatenate([hum, _tone(1, amplitude=0.05)]))
@@ -1,5 +1,17 @@
-from .transcriber import Transcriber
-from .parse_env_cfg import CONFIG
 from .supportive_class import WavTimeSizeQueue, Language, LOG
 
 __ALL__ = ["Transcriber", "CONFIG", "TimedSampleQueue", "Language"]
+
+
+def __getattr__(name: str):
+    # Load torch / whisper and the config files on first use only, so that
+    # `--help`, config checks and the light tests start fast.
+    if name == "Transcriber":
+        from .transcriber import Transcriber
+
+        return Transcriber
+    if name == "CONFIG":
+        from .parse_env_cfg import DEFAULT_CONFIG_FOLDER, parse_env_and_config
+
+        return parse_env_and_config(DEFAULT_CONFIG_FOLDER)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,132 @@
+import argparse
+from pathlib import Path
+from threading import Event
+from typing import Sequence
+
+from whisper_note.supportive_class import FrozenConfig
 from whisper_note.supportive_class.constants import LOG
-from whisper_note.transcriber import Transcriber
-from whisper_note.parse_env_cfg import CONFIG
+from whisper_note.parse_env_cfg import DEFAULT_CONFIG_FOLDER, parse_env_and_config
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {number}")
+    return number
+
+
+def build_main_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    # only the standard library is needed here, so `--help` answers at once
+    parser = argparse.ArgumentParser(
+        prog="whisper-note", description="Live transcription and translation."
+    )
+    parser.add_argument(
+        "--config-dir",
+        default=DEFAULT_CONFIG_FOLDER,
+        help="Folder containing config.yml and .env.",
+    )
+    parser.add_argument(
+        "--check-config",
+        action="store_true",
+        help="Validate config.yml and .env, then exit without loading the model.",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        type=Path,
+        help="Write stage traces and a flame graph of the session to DIR.",
+    )
+    parser.add_argument(
+        "--profile-torch",
+        action="store_true",
+        help="With --profile, also trace the model every 50 chunks.",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    batch = commands.add_parser(
+        "batch",
+        help="Transcribe recorded audio files instead of the microphone.",
+        description="Transcribe audio files and folders, resuming earlier runs.",
+    )
+    batch.add_argument("paths", nargs="+", type=Path, help="Audio files or folders.")
+    batch.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path("."),
+        help="Where transcripts and the resume manifest go. Default: current folder.",
+    )
+    batch.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=None,
+        help="Processes, each with its own model. Default: final_pass_workers.",
+    )
+    serve = commands.add_parser(
+        "serve",
+        help="Transcribe the audio of many local clients with one model.",
+        description="Serve transcription sessions over HTTP, sharing one model.",
+    )
+    serve.add_argument(
+        "--address",
+        default="127.0.0.1:8765",
+        help="host:port to listen on. Default: 127.0.0.1:8765.",
+    )
+    serve.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path("sessions"),
+        help="Where each session's live_history_* exports go. Default: sessions/.",
+    )
+    return parser.parse_args(argv)
+
 
+def run_core(config: FrozenConfig, args: argparse.Namespace):
+    from whisper_note.profiling import Profiler
+    from whisper_note.transcriber import Transcriber  # loads torch and whisper
 
-def run_core():
-    transcriber = Transcriber(CONFIG)
+    profiler = None
+    if args.profile is not None:
+        profiler = Profiler(args.profile, torch_trace=args.profile_torch)
+    transcriber = Transcriber(config, profiler=profiler)
     transcriber.live_transcribe()
     LOG.info("Finished! Exiting gracefully")
 
 
+def run_batch(config: FrozenConfig, args: argparse.Namespace):
+    from whisper_note.batch import run_batch  # loads torch and whisper
+
+    workers = config.final_pass_workers if args.workers is None else args.workers
+    try:
+        report = run_batch(args.paths, args.output_dir, config, workers)
+    except ValueError as err:  # two files would write the same transcripts
+        exit(f"{err}, transcribe them to separate --output-dir")
+    LOG.info(f"Batch finished: {report}")
+
+
+def run_serve(config: FrozenConfig, args: argparse.Namespace):
+    from whisper_note.server import TranscriptionServer  # loads torch and whisper
+
+    server = TranscriptionServer(config, args.address, args.output_dir)
+    server.start()
+    try:
+        Event().wait()  # the server runs on its own threads until Ctrl+C
+    except KeyboardInterrupt:
+        server.stop()
+    LOG.info("Server stopped")
+
+
 def run():
     # hooked to "poetry run whisper-note", "poetry run note".
-    run_core()
+    args = build_main_args()
+    config = parse_env_and_config(args.config_dir)
+    if args.check_config:
+        LOG.info(f"Config in {args.config_dir} is valid.")
+        return
+    if args.command == "batch":
+        run_batch(config, args)
+    elif args.command == "serve":
+        run_serve(config, args)
+    else:
+        run_core(config, args)
 
 
 if __name__ == "__main__":
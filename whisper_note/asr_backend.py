@@ -0,0 +1,165 @@
+from typing import Any, cast
+
+import numpy as np
+
+from whisper_note.supportive_class import (
+    AsrBackendProtocol,
+    FrozenConfig,
+    InvalidConfigError,
+    LOG,
+)
+
+# no temperature fallback: a failed compression or logprob check re-decodes
+WHISPER_FAST_OPTIONS = {"temperature": 0.0, "condition_on_previous_text": False}
+FASTER_WHISPER_FAST_OPTIONS = {"beam_size": 1, "temperature": 0.0}
+# the thresholds of `whisper.transcribe`, to treat a batched result the same way
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+class WhisperBackend(AsrBackendProtocol):
+    """openai-whisper on torch, optionally int8 quantized on CPU."""
+
+    def __init__(self, config: FrozenConfig):
+        import torch
+        import whisper
+
+        from whisper_note.quantize import load_quantized_model
+
+        self.config = config
+        self.fp16 = torch.cuda.is_available()
+        if config.quantize_int8 and not torch.cuda.is_available():
+            self.model = load_quantized_model(config.model)
+        else:
+            self.model = whisper.load_model(config.model)
+
+    def transcribe(
+        self, audio: np.ndarray | str, prompt: str = "", fast: bool = False
+    ) -> str:
+        options = WHISPER_FAST_OPTIONS if fast else {}
+        transcribed = self.model.transcribe(
+            audio, fp16=self.fp16, initial_prompt=prompt or None, **options
+        )
+        return cast(str, transcribed["text"]).strip()
+
+    def transcribe_batch(
+        self,
+        audios: list[np.ndarray],
+        prompt: str = "",
+        fast: bool = False,
+        features: list[Any] | None = None,
+    ) -> list[str]:
+        """
+        Pad the chunks to whisper's 30 s window, as `transcribe` does one by
+        one, and run the encoder and decoder once on the stacked mels. A
+        single chunk is decoded this way too when its mel is precomputed.
+        The mels only move to the device here, for the batch being decoded.
+        """
+        import torch
+        import whisper
+
+        mels = features or [None] * len(audios)
+        prepared = all(mel is not None for mel in mels)
+        if len(audios) < (1 if prepared else 2) or any(
+            len(a) > whisper.audio.N_SAMPLES for a in audios
+        ):
+            return [self.transcribe(audio, prompt, fast) for audio in audios]
+        mel = torch.stack(
+            [
+                self.features(audio) if mel is None else mel
+                for audio, mel in zip(audios, mels)
+            ]
+        ).to(self.model.device)
+        options = whisper.DecodingOptions(
+            temperature=0.0,
+            prompt=prompt or None,
+            without_timestamps=True,
+            fp16=self.fp16,
+        )
+        texts = []
+        for audio, result in zip(audios, self.model.decode(mel, options)):
+            if (
+                result.no_speech_prob > NO_SPEECH_THRESHOLD
+                and result.avg_logprob < LOGPROB_THRESHOLD
+            ):
+                texts.append("")  # silence, `transcribe` skips it too
+            elif not fast and (
+                result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                or result.avg_logprob < LOGPROB_THRESHOLD
+            ):  # decode alone with the temperature fallback
+                texts.append(self.transcribe(audio, prompt))
+            else:
+                texts.append(result.text.strip())
+        return texts
+
+    def features(self, audio: np.ndarray) -> Any:
+        """
+        The log-mel spectrogram of the chunk padded to 30 s, on the CPU: the
+        chunks queued behind the decoder would each hold one on the GPU.
+        """
+        import torch
+        import whisper
+
+        if len(audio) > whisper.audio.N_SAMPLES:
+            return None  # `transcribe` slides over longer audio itself
+        return whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(torch.from_numpy(audio)),
+            self.model.dims.n_mels,
+        )
+
+
+class FasterWhisperBackend(AsrBackendProtocol):
+    """
+    CTranslate2 through faster-whisper, usually several times faster than
+    openai-whisper on CPU. Optional: `poetry run pip install faster-whisper`.
+    """
+
+    def __init__(self, config: FrozenConfig):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise InvalidConfigError(
+                "asr_backend FASTER_WHISPER needs `pip install faster-whisper`"
+            ) from e
+
+        self.config = config
+        self.model = WhisperModel(
+            config.model,
+            device="auto",
+            compute_type="int8" if config.quantize_int8 else "default",
+        )
+
+    def transcribe(
+        self, audio: np.ndarray | str, prompt: str = "", fast: bool = False
+    ) -> str:
+        options = FASTER_WHISPER_FAST_OPTIONS if fast else {}
+        segments, _ = self.model.transcribe(
+            audio, initial_prompt=prompt or None, **options
+        )
+        return "".join(segment.text for segment in segments).strip()
+
+    def transcribe_batch(
+        self,
+        audios: list[np.ndarray],
+        prompt: str = "",
+        fast: bool = False,
+        features: list[Any] | None = None,
+    ) -> list[str]:
+        # CTranslate2 already batches within a chunk, not across chunks here
+        return [self.transcribe(audio, prompt, fast) for audio in audios]
+
+    def features(self, audio: np.ndarray) -> Any:
+        return None  # computed inside CTranslate2's `transcribe`
+
+
+def get_asr_backend(config: FrozenConfig) -> AsrBackendProtocol:
+    LOG.info(f"Loading {config.asr_backend} model [{config.model}]")
+    if config.asr_backend == "WHISPER":
+        backend = WhisperBackend(config)
+    elif config.asr_backend == "FASTER_WHISPER":
+        backend = FasterWhisperBackend(config)
+    else:
+        raise InvalidConfigError(f"Unknown asr_backend: {config.asr_backend}")
+    LOG.info(f"{config.asr_backend} model [{config.model}] loaded.")
+    return backend
@@ -0,0 +1,190 @@
+import os
+import socket
+import sys
+import wave
+from datetime import datetime, timedelta
+from pathlib import Path
+from sys import platform
+from time import monotonic, sleep
+from typing import BinaryIO, Callable
+
+import speech_recognition as sr
+from result import Err, Ok, Result
+
+from whisper_note.supportive_class import (
+    FrozenConfig,
+    InvalidConfigError,
+    LOG,
+    PCM16_WIDTH,
+)
+
+UNIX_SOCKET_PREFIX = "unix:"
+
+
+def load_microphone_source(mic_name: str | None) -> Result[sr.Microphone, str]:
+    if "linux" not in platform:
+        source = sr.Microphone(sample_rate=16000)
+        return Ok(source)
+
+    # only Linux users need this to prevent permanent application hang / crash
+    if not mic_name or mic_name == "list":
+        LOG.info("Showing available microphone devices: ")
+        for index, name in enumerate(sr.Microphone.list_microphone_names()):
+            LOG.info(f'Found microphone with name "{name}"')
+        return Err("No microphone name provided, aborting.")
+    else:
+        for index, name in enumerate(sr.Microphone.list_microphone_names()):
+            if mic_name in name:
+                source = sr.Microphone(sample_rate=16000, device_index=index)
+                break
+        else:
+            return Err("Default microphone with name {mic_name} not found.")
+    return Ok(source)
+
+
+class _PcmReader:
+    """
+    The `stream` of a StreamSource: reads whole buffers, since the
+    recognizer counts time in buffers, and paces them to real time if asked.
+    Like a pyaudio stream, `read` takes a number of frames, not bytes.
+    """
+
+    def __init__(
+        self, read: Callable[[int], bytes], bytes_per_second: int, realtime: bool
+    ) -> None:
+        self._read = read
+        self.bytes_per_second = bytes_per_second
+        self.realtime = realtime
+        self.bytes_read = 0
+        self.ended = False
+        self._started: float | None = None
+
+    def read(self, frames: int) -> bytes:
+        if self._started is None:
+            self._started = monotonic()
+        size = frames * PCM16_WIDTH  # mono
+        data = b""
+        while len(data) < size and not self.ended:
+            piece = self._read(size - len(data))
+            self.ended = piece == b""
+            data += piece
+        data = data[: len(data) - len(data) % PCM16_WIDTH]  # whole samples only
+        self.bytes_read += len(data)
+        if self.realtime:
+            ahead = (
+                self._started + self.bytes_read / self.bytes_per_second - monotonic()
+            )
+            sleep(max(ahead, 0))
+        return data
+
+
+class StreamSource(sr.AudioSource):
+    """
+    Mono 16-bit PCM from a byte stream, usable with `listen_in_background`
+    like a microphone. Timestamps follow the audio read, not the wall clock,
+    so a replay at full speed keeps its timing.
+    """
+
+    CHUNK = 1024  # same as sr.Microphone
+    SAMPLE_WIDTH = PCM16_WIDTH
+    SAMPLE_RATE: int
+    stream: _PcmReader
+    started_at: datetime
+
+    def __init__(
+        self, read: Callable[[int], bytes], sample_rate: int, realtime: bool = False
+    ) -> None:
+        self.SAMPLE_RATE = sample_rate
+        self.stream = _PcmReader(read, sample_rate * PCM16_WIDTH, realtime)
+        self.started_at = datetime.now()
+
+    def __enter__(self) -> "StreamSource":
+        return self  # entered by the listener, a stream is not calibrated
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        ...  # the stream stays open until `close`
+
+    @property
+    def ended(self) -> bool:
+        return self.stream.ended
+
+    def clock(self) -> datetime:
+        second = self.stream.bytes_read / self.stream.bytes_per_second
+        return self.started_at + timedelta(seconds=second)
+
+    def close(self) -> None:
+        ...
+
+
+class WavFileSource(StreamSource):
+    """Replay a mono 16-bit wav, in real time or as fast as it is read."""
+
+    def __init__(self, path: Path, realtime: bool) -> None:
+        self._wav = wave.open(str(path), "rb")
+        if (self._wav.getnchannels(), self._wav.getsampwidth()) != (1, PCM16_WIDTH):
+            raise InvalidConfigError(f"{path} is not a mono 16-bit wav")
+        read = lambda size: self._wav.readframes(size // PCM16_WIDTH)
+        super().__init__(read, self._wav.getframerate(), realtime)
+
+    def close(self) -> None:
+        self._wav.close()
+
+
+class StdinSource(StreamSource):
+    """Raw mono s16le PCM piped in, e.g. `ffmpeg -i talk.mp3 -f s16le -ac 1 -`."""
+
+    def __init__(self, sample_rate: int, stdin: BinaryIO | None = None) -> None:
+        stdin = stdin or sys.stdin.buffer
+        super().__init__(stdin.read, sample_rate)
+
+
+class SocketSource(StreamSource):
+    """
+    Raw mono s16le PCM from the first client of a local socket, at
+    "host:port" for TCP or "unix:/path" for a Unix socket.
+    """
+
+    def __init__(self, address: str, sample_rate: int) -> None:
+        if address.startswith(UNIX_SOCKET_PREFIX):
+            path = address[len(UNIX_SOCKET_PREFIX) :]
+            if os.path.exists(path):
+                os.unlink(path)  # left over by an earlier run
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(path)
+        else:
+            host, _, port = address.rpartition(":")
+            self._server = socket.create_server((host or "127.0.0.1", int(port)))
+        self._server.listen(1)
+        self.address = address
+        self._client: socket.socket | None = None
+        super().__init__(self._recv, sample_rate)
+
+    def _recv(self, size: int) -> bytes:
+        if self._client is None:  # blocks the recorder until a sender connects
+            LOG.info(f"Waiting for audio on {self.address}")
+            self._client, _ = self._server.accept()
+        return self._client.recv(size)
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+        self._server.close()
+
+
+def open_audio_source(config: FrozenConfig) -> sr.AudioSource:
+    """The configured source, exits listing the devices if no microphone."""
+    if config.audio_source == "MICROPHONE":
+        return (
+            load_microphone_source(config.linux_microphone)
+            .or_else(lambda err: exit(err))
+            .unwrap()
+        )
+    if config.audio_source == "WAV":
+        return WavFileSource(
+            Path(config.audio_source_path), config.audio_source_realtime
+        )
+    if config.audio_source == "STDIN":
+        return StdinSource(config.audio_source_sample_rate)
+    if config.audio_source == "SOCKET":
+        return SocketSource(config.audio_source_path, config.audio_source_sample_rate)
+    raise InvalidConfigError(f"Unknown audio_source: {config.audio_source}")
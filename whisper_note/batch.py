@@ -0,0 +1,239 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from pathlib import Path
+from time import perf_counter
+from typing import NamedTuple, Sequence
+
+from whisper_note.asr_backend import get_asr_backend
+from whisper_note.exporter import configured_exporters
+from whisper_note.final_pass import (
+    find_windows,
+    load_merged_audio,
+    load_worker_asr,
+    merge_overlapping_texts,
+    worker_asr,
+)
+from whisper_note.supportive_class import (
+    AsrBackendProtocol,
+    FrozenConfig,
+    LOG,
+    PCM16_WIDTH,
+    WHISPER_SAMPLE_RATE,
+)
+from whisper_note.transcription import Phrase
+
+AUDIO_SUFFIXES = (".wav", ".flac", ".mp3", ".m4a", ".ogg")  # not .wav needs ffmpeg
+MANIFEST_NAME = "batch_manifest.jsonl"  # one line per finished file, to resume
+
+
+class BatchItem(NamedTuple):
+    source: Path
+    # in the output folder, mirroring the input folders, the audio suffix
+    # kept so talk.wav and talk.mp3 do not write the same transcripts
+    output_stem: Path
+
+    def output(self, suffix: str) -> Path:
+        return self.output_stem.with_name(self.output_stem.name + suffix)
+
+
+class FileResult(NamedTuple):
+    source: str
+    key: str  # size and mtime, a changed file is transcribed again
+    audio_second: float
+    compute_second: float
+
+
+class BatchReport(NamedTuple):
+    files: int
+    skipped: int  # finished in an earlier run
+    audio_second: float
+    compute_second: float  # summed over the workers
+    wall_second: float
+
+    @property
+    def files_per_hour(self) -> float:
+        return self.files / self.wall_second * 3600 if self.wall_second else 0.0
+
+    @property
+    def real_time_factor(self) -> float:
+        """Wall time per second of audio, all workers together."""
+        return self.wall_second / self.audio_second if self.audio_second else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.files} files ({self.skipped} already done), "
+            f"{self.audio_second / 3600:.2f}h of audio in {self.wall_second:.0f}s: "
+            f"{self.files_per_hour:.0f} files/h, RTF {self.real_time_factor:.3f} "
+            f"(per worker {self.compute_second / (self.audio_second or 1):.3f})"
+        )
+
+
+def file_key(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def collect_audio_files(paths: Sequence[Path], output_dir: Path) -> list[BatchItem]:
+    """
+    Files as given, and the audio files under folders, recursively, each
+    folder under its own name in `output_dir`. A file given twice is
+    transcribed once. Raise ValueError when two files would write the same
+    outputs.
+    """
+    items: dict[Path, BatchItem] = {}  # by output stem
+    sources: set[Path] = set()
+    for path in paths:
+        if path.is_dir():
+            files = [
+                (file, output_dir / path.resolve().name / file.relative_to(path))
+                for file in sorted(path.rglob("*"))
+                if file.suffix.lower() in AUDIO_SUFFIXES and file.is_file()
+            ]
+        elif path.is_file():
+            files = [(path, output_dir / path.name)]
+        else:
+            LOG.warning(f"Skipping {path}: no such file or folder")
+            continue
+        for file, stem in files:
+            if file.resolve() in sources:
+                continue
+            if stem in items:
+                raise ValueError(
+                    f"{items[stem].source} and {file} would both write {stem}.*"
+                )
+            sources.add(file.resolve())
+            items[stem] = BatchItem(file, stem)
+    return list(items.values())
+
+
+def load_manifest(output_dir: Path) -> dict[str, str]:
+    """Source path to file key of the files finished by earlier runs."""
+    manifest = output_dir / MANIFEST_NAME
+    if not manifest.exists():
+        return {}
+    done = {}
+    for line in manifest.read_text().splitlines():
+        try:
+            result = FileResult(**json.loads(line))
+        except (ValueError, TypeError):  # a line cut by a crash
+            continue
+        done[result.source] = result.key
+    return done
+
+
+def transcribe_file(
+    item: BatchItem, config: FrozenConfig, asr: AsrBackendProtocol
+) -> FileResult:
+    """
+    Write the transcript and the configured `live_history_*` formats of one
+    file. Rows are the final-pass windows, timed as if the recording ended
+    at the file's modification time.
+    """
+    key = file_key(item.source)
+    samples = load_merged_audio(item.source)
+    start = perf_counter()
+    audio_second = len(samples) / WHISPER_SAMPLE_RATE
+    ended = datetime.fromtimestamp(item.source.stat().st_mtime)
+    session_start = ended - timedelta(seconds=audio_second)
+    item.output_stem.parent.mkdir(parents=True, exist_ok=True)
+    exporters = [
+        exporter(item.output(path.suffix), session_start)
+        for path, exporter in configured_exporters(config)
+    ]
+    texts = []
+    windows = find_windows(samples, config.final_pass_window_second, 0)
+    for window_start, window_end in windows:
+        text = asr.transcribe(samples[window_start:window_end])
+        texts.append(text)
+        if text == "":
+            continue
+        size = window_end - window_start
+        phrase = Phrase(
+            session_start + timedelta(seconds=window_end / WHISPER_SAMPLE_RATE),
+            text,
+            size * PCM16_WIDTH,
+            size / WHISPER_SAMPLE_RATE,
+        )
+        for exporter in exporters:
+            exporter.write(phrase)
+    for exporter in exporters:
+        exporter.close()
+    item.output(".txt").write_text(merge_overlapping_texts(texts))
+    return FileResult(str(item.source), key, audio_second, perf_counter() - start)
+
+
+def _transcribe_or_log(
+    item: BatchItem, config: FrozenConfig, asr: AsrBackendProtocol
+) -> FileResult | None:
+    try:
+        return transcribe_file(item, config, asr)
+    except Exception:  # the other files go on, a rerun retries this one
+        LOG.exception(f"Failed to transcribe {item.source}")
+        return None
+
+
+def _transcribe_in_worker(item: BatchItem, config: FrozenConfig) -> FileResult | None:
+    return _transcribe_or_log(item, config, worker_asr())
+
+
+def run_batch(
+    paths: Sequence[Path], output_dir: Path, config: FrozenConfig, workers: int
+) -> BatchReport:
+    """
+    Transcribe every audio file not finished by an earlier run, sharded
+    over `workers` processes with one model each. A file is recorded in the
+    manifest once all its outputs are written, so an interrupted run resumes.
+    """
+    if workers < 1:
+        raise ValueError(f"Batch needs at least 1 worker, not {workers}")
+    start = perf_counter()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    done = load_manifest(output_dir)
+    items = collect_audio_files(paths, output_dir)
+    todo = [
+        item for item in items if done.get(str(item.source)) != file_key(item.source)
+    ]
+    LOG.info(f"{len(items) - len(todo)} of {len(items)} files already transcribed")
+    results: list[FileResult] = []
+    with open(output_dir / MANIFEST_NAME, "a+") as manifest:
+        if manifest.tell() > 0:
+            manifest.seek(manifest.tell() - 1)
+            if manifest.read(1) != "\n":
+                manifest.write("\n")  # end the line cut by a crash
+
+        def record(result: FileResult | None) -> None:
+            if result is None:
+                return
+            manifest.write(json.dumps(result._asdict()) + "\n")
+            manifest.flush()
+            results.append(result)
+            LOG.info(f"[{len(results)}/{len(todo)}] {result.source}")
+
+        workers = min(workers, len(todo))
+        if workers == 1:
+            asr = get_asr_backend(config)
+            for item in todo:
+                record(_transcribe_or_log(item, config, asr))
+        elif workers > 1:  # 0 when every file is done
+            torch_threads = max((os.cpu_count() or 1) // workers, 1)
+            with ProcessPoolExecutor(
+                workers,
+                mp_context=multiprocessing.get_context("spawn"),  # as final_pass
+                initializer=load_worker_asr,
+                initargs=(config, torch_threads),
+            ) as pool:
+                futures = [
+                    pool.submit(_transcribe_in_worker, item, config) for item in todo
+                ]
+                for future in as_completed(futures):
+                    record(future.result())
+    return BatchReport(
+        files=len(results),
+        skipped=len(items) - len(todo),
+        audio_second=sum(result.audio_second for result in results),
+        compute_second=sum(result.compute_second for result in results),
+        wall_second=perf_counter() - start,
+    )
@@ -0,0 +1,122 @@
+import argparse
+import re
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, NamedTuple, Sequence
+
+import numpy as np
+
+from whisper_note.supportive_class import (
+    EXAMPLE_CONFIG,
+    InvalidConfigError,
+    LOG,
+    WHISPER_SAMPLE_RATE,
+    load_wav_float32,
+)
+
+Fixture = tuple[str, np.ndarray, str]  # name, 16 kHz samples, reference text
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    audio_second: float
+    compute_second: float
+    word_error_rate: float
+
+    @property
+    def real_time_factor(self) -> float:
+        """Compute time per second of audio, below 1 keeps up with a speaker."""
+        return self.compute_second / self.audio_second if self.audio_second else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: RTF {self.real_time_factor:.3f}, "
+            f"WER {self.word_error_rate:.2%} on {self.audio_second:.0f}s of audio"
+        )
+
+
+def _normalized_words(text: str) -> list[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word level edit distance over the reference length, case and punctuation ignored."""
+    ref, hyp = _normalized_words(reference), _normalized_words(hypothesis)
+    if not ref:
+        return float(bool(hyp))
+    row = list(range(len(hyp) + 1))  # one row of the edit distance matrix
+    for i, ref_word in enumerate(ref, 1):
+        diagonal, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            substitution = diagonal + (ref_word != hyp_word)
+            diagonal, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, substitution)
+    return row[-1] / len(ref)
+
+
+def load_fixtures(folder: Path) -> list[Fixture]:
+    """Every `name.wav` (16 kHz mono 16-bit) with its reference in `name.txt`."""
+    fixtures = []
+    for wav in sorted(folder.glob("*.wav")):
+        reference = wav.with_suffix(".txt")
+        if not reference.exists():
+            LOG.warning(f"Skipping {wav}, no reference transcript {reference}")
+            continue
+        fixtures.append((wav.stem, load_wav_float32(wav), reference.read_text()))
+    return fixtures
+
+
+def run_benchmark(
+    name: str, transcribe: Callable[[np.ndarray], str], fixtures: Sequence[Fixture]
+) -> BenchmarkResult:
+    """Transcribe every fixture, the WER is over all fixtures together."""
+    compute_second, references, hypotheses = 0.0, [], []
+    for _, samples, reference in fixtures:
+        start = perf_counter()
+        hypotheses.append(transcribe(samples))
+        compute_second += perf_counter() - start
+        references.append(reference)
+    audio_second = sum(len(samples) for _, samples, _ in fixtures)
+    return BenchmarkResult(
+        name,
+        audio_second / WHISPER_SAMPLE_RATE,
+        compute_second,
+        word_error_rate(" ".join(references), " ".join(hypotheses)),
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> list[BenchmarkResult]:
+    """Run every ASR backend, in fp32 and int8, through the same fixtures."""
+    parser = argparse.ArgumentParser(prog="python -m whisper_note.benchmark")
+    parser.add_argument("fixtures", type=Path, help="Folder of .wav + .txt pairs.")
+    parser.add_argument("--model", default="small", help="Model name.")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["WHISPER", "FASTER_WHISPER"],
+        help="asr_backend values to compare.",
+    )
+    args = parser.parse_args(argv)
+
+    from whisper_note.asr_backend import get_asr_backend
+
+    fixtures = load_fixtures(args.fixtures)
+    assert fixtures, f"No fixtures found in {args.fixtures}"
+    results = []
+    for backend in args.backends:
+        for quantize_int8 in (False, True):
+            config = EXAMPLE_CONFIG.mutated_copy(
+                model=args.model, asr_backend=backend, quantize_int8=quantize_int8
+            )
+            try:
+                asr = get_asr_backend(config)
+            except InvalidConfigError as e:
+                LOG.warning(f"Skipping {backend}: {e}")
+                break
+            name = f"{backend} {args.model} {'int8' if quantize_int8 else 'fp32'}"
+            results.append(run_benchmark(name, asr.transcribe, fixtures))
+            LOG.info(results[-1])
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,21 @@
 import argparse
-from pathlib import Path
 import sys
 from datetime import datetime
 from io import StringIO
-from typing import Iterator, Sequence
+from threading import Lock
+from time import perf_counter
+from typing import Iterable, Iterator, Sequence
 
 from rich.console import Console, Group
 from rich.live import Live
+from rich.markup import escape
 from rich.table import Table
 from rich.align import Align
-from whisper_note.supportive_class import format_bytes_str, format_local_time
+from whisper_note.supportive_class import (
+    METRICS,
+    format_bytes_str,
+    format_local_time,
+)
 
 
 def build_default_args() -> argparse.Namespace:
@@ -50,14 +56,26 @@ def build_default_args() -> argparse.Namespace:
 
 
 class RichTable:
+    """
+    Live table of the most recent `max_rows` transcripts and the pending
+    recordings. Rows are formatted once and cached, `live_print` only swaps
+    the viewport, and Rich redraws it from its own thread at a capped rate.
+    """
+
     console: Console
-    live_console: Live
+    live_console: Live | None  # started on the first `live_print`
+    max_rows: int
+    refresh_per_second: float
 
-    def __init__(self) -> None:
+    def __init__(self, max_rows: int = 50, refresh_per_second: float = 4) -> None:
         self.console = Console()
-        self.live_console = Live(
-            console=self.console, vertical_overflow="visible", auto_refresh=False
-        ).__enter__()
+        self.live_console = None
+        self.max_rows = max_rows
+        self.refresh_per_second = refresh_per_second
+        self._formatted: dict[int, tuple[tuple, tuple[str, ...]]] = {}
+        self._viewport: tuple[list[tuple[str, ...]], list[tuple[str, ...]]] = ([], [])
+        self._table: Table | None = None  # rebuilt only after the viewport changed
+        self._lock = Lock()
 
     def _new_table_with_col(self) -> Table:
         time_width = 14
@@ -88,57 +106,105 @@ class RichTable:
         table.add_column("CN", justify="center", width=checker_width)
         return table
 
+    @staticmethod
+    def _format_row(row: tuple[str, str, int, bool, bool]) -> tuple[str, ...]:
+        time, text, sz, transcribed, translated = row
+        c = lambda x: "✓" if x else "_"  # to check char
+        # do we actually need to pass transcribed?
+        return (time, text, format_bytes_str(sz), c(transcribed), c(translated))
+
+    def _format_cached(
+        self, index: int, row: tuple[str, str, int, bool, bool]
+    ) -> tuple[str, ...]:
+        cached = self._formatted.get(index)
+        if cached is not None and cached[0] == row:
+            return cached[1]  # unchanged since the last frame
+        return self._format_row(row)
+
+    @staticmethod
+    def _format_pending(
+        pending_time_size: Sequence[tuple[datetime, int]]
+    ) -> list[tuple[str, ...]]:
+        return [
+            (format_local_time(time), "", format_bytes_str(size), "_", "_")
+            for time, size in pending_time_size
+        ]
+
+    @staticmethod
+    def _format_partial(partial: tuple[datetime, str, str]) -> tuple[str, ...]:
+        time, stable, unstable = partial
+        text = f"{escape(stable)} [italic dim]{escape(unstable)}[/]".strip()
+        return (format_local_time(time), text, "", "…", "_")
+
     def _construct_new_table(
         self,
-        table_content: Iterator[tuple[str, str, int, bool, bool]],
-        pending_time_size: Sequence[tuple[datetime, int]],
+        formatted_rows: Iterable[tuple[str, ...]],
+        formatted_pending: Iterable[tuple[str, ...]],
     ) -> Table:
         # Instead of re-building the whole table, we may use `table.rows.__delitem__()`
         # BUT, the width of the table will not be updated, so maybe it's not a good idea.
+        # Only the viewport is rebuilt, so this costs the same for any session length.
         table = self._new_table_with_col()
-        for time, text, sz, transcribed, translated in table_content:
-            c = lambda x: "✓" if x else "_"  # to check char
-            table.add_row(
-                time,
-                text,
-                format_bytes_str(sz),
-                c(transcribed),  # do we actually need to pass this?
-                c(translated),
-                end_section=True,
-            )
-        for time, size in pending_time_size:
-            table.add_row(format_local_time(time), "", format_bytes_str(size), "_", "_")
+        for row in formatted_rows:
+            table.add_row(*row, end_section=True)
+        for row in formatted_pending:
+            table.add_row(*row)
         return table
 
     def live_print(
         self,
         table_content: Iterator[tuple[str, str, int, bool, bool]],
         pending_time_size: Sequence[tuple[datetime, int]],
+        first_index: int = 0,
+        partial: tuple[datetime, str, str] | None = None,
     ):
-        table = self._construct_new_table(table_content, pending_time_size)
-        self.live_console.update(
-            Group(table, self._centered_time()),
-            refresh=True,
-        )
+        """
+        Show the last `max_rows` rows of `table_content`, whose first row is
+        row `first_index` of the whole transcript. Cheap, it does not draw.
+        `partial` is the streamed phrase, its unstable words are dimmed.
+        """
+        rows = list(enumerate(table_content, first_index))[-self.max_rows :]
+        formatted = {i: (row, self._format_cached(i, row)) for i, row in rows}
+        pending = self._format_pending(pending_time_size)
+        if partial is not None:
+            pending.insert(0, self._format_partial(partial))
+        with self._lock:
+            self._formatted = formatted  # forget rows scrolled out of the viewport
+            self._viewport = ([cells for _, cells in formatted.values()], pending)
+            self._table = None
+        if self.live_console is None:
+            self.live_console = Live(
+                console=self.console,
+                vertical_overflow="visible",
+                get_renderable=self._get_renderable,
+                refresh_per_second=self.refresh_per_second,
+            ).__enter__()  # auto refresh from the thread of Live
 
-    def save_history_html(
-        self,
-        table_content: Iterator[tuple[str, str, int, bool, bool]],
-        html_path: Path,
-    ):
-        # #TODO:LTR the html has bad styling... Even worse than SVG
-        table = self._construct_new_table(table_content, [])
-        output_buffer = StringIO()
-        with Console(file=output_buffer, record=True) as console:
-            console.print(table)
-            console.save_html(str(html_path))
+    def _get_renderable(self) -> Group:
+        with self._lock:
+            if self._table is None:
+                started = perf_counter()
+                self._table = self._construct_new_table(*self._viewport)
+                METRICS.observe("render_seconds", perf_counter() - started)
+            table = self._table
+        return Group(table, self._centered_time())
+
+    def close(self) -> None:
+        """Draw the last frame and stop the refresh thread."""
+        if self.live_console is not None:
+            self.live_console.refresh()
+            self.live_console.__exit__(None, None, None)
+            self.live_console = None
 
     def gen_history_str(
         self,
         table_content: Iterator[tuple[str, str, int, bool, bool]],
         pending_time_size: Sequence[tuple[datetime, int]],
     ) -> str:
-        table = self._construct_new_table(table_content, pending_time_size)
+        table = self._construct_new_table(
+            map(self._format_row, table_content),
+            self._format_pending(pending_time_size),
+        )
         output_buffer = StringIO()
         str_console = Console(file=output_buffer, record=True)
         str_console.print(table)
@@ -0,0 +1,135 @@
+import html
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import TextIO
+
+from whisper_note.supportive_class import FrozenConfig
+from whisper_note.transcription import Phrase
+
+
+class StreamingExporter(ABC):
+    """
+    Append every finalized phrase to the export file as it is produced and
+    flush it, so a crash loses nothing and other tools can tail the file.
+    Closing only writes the footer, if the format has one.
+    """
+
+    path: Path
+    session_start: datetime
+    count: int  # phrases written so far
+    _file: TextIO
+
+    def __init__(self, path: Path, session_start: datetime) -> None:
+        self.path, self.session_start, self.count = path, session_start, 0
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(self._header())
+        self._file.flush()
+
+    def _header(self) -> str:
+        return ""
+
+    def _footer(self) -> str:
+        return ""
+
+    @abstractmethod
+    def _format(self, phrase: Phrase) -> str:
+        ...
+
+    def write(self, phrase: Phrase) -> None:
+        self.count += 1
+        self._file.write(self._format(phrase))
+        self._file.flush()
+
+    def close(self) -> Path:
+        if not self._file.closed:
+            self._file.write(self._footer())
+            self._file.close()
+        return self.path
+
+    def _relative_span(self, phrase: Phrase) -> tuple[float, float]:
+        """Start and end second of the phrase since the session started."""
+        end = max((phrase.timestamp - self.session_start).total_seconds(), 0.0)
+        return max(end - phrase.duration, 0.0), end
+
+
+class HtmlExporter(StreamingExporter):
+    def _header(self) -> str:
+        return (
+            '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+            "<title>Transcripts</title>\n</head>\n<body>\n<table>\n"
+            "<tr><th>Time</th><th>Text &amp; Translation</th><th>Size</th></tr>\n"
+        )
+
+    def _format(self, phrase: Phrase) -> str:
+        text = "<br>".join(
+            html.escape(t) for t in (phrase.text, phrase.translated_text) if t
+        )
+        return (
+            f"<tr><td>{phrase.time_str}</td><td>{text}</td>"
+            f"<td>{phrase.wav_size}</td></tr>\n"
+        )
+
+    def _footer(self) -> str:
+        return "</table>\n</body>\n</html>\n"
+
+
+class MarkdownExporter(StreamingExporter):
+    def _header(self) -> str:
+        return "| Time | Text | Translation |\n| --- | --- | --- |\n"
+
+    def _format(self, phrase: Phrase) -> str:
+        cell = lambda s: s.replace("|", "\\|").replace("\n", "<br>")
+        return (
+            f"| {phrase.time_str} | {cell(phrase.text)} "
+            f"| {cell(phrase.translated_text)} |\n"
+        )
+
+
+def format_subtitle_time(second: float, decimal_mark: str) -> str:
+    """Format seconds as "HH:MM:SS,mmm" for SRT, "HH:MM:SS.mmm" for WebVTT."""
+    ms = round(second * 1000)
+    h, m, s = ms // 3_600_000, ms // 60_000 % 60, ms // 1000 % 60
+    return f"{h:02d}:{m:02d}:{s:02d}{decimal_mark}{ms % 1000:03d}"
+
+
+class SrtExporter(StreamingExporter):
+    def _format(self, phrase: Phrase) -> str:
+        start, end = (format_subtitle_time(t, ",") for t in self._relative_span(phrase))
+        lines = "\n".join(t for t in (phrase.text, phrase.translated_text) if t)
+        return f"{self.count}\n{start} --> {end}\n{lines}\n\n"
+
+
+class VttExporter(StreamingExporter):
+    def _header(self) -> str:
+        return "WEBVTT\n\n"
+
+    def _format(self, phrase: Phrase) -> str:
+        start, end = (format_subtitle_time(t, ".") for t in self._relative_span(phrase))
+        lines = "\n".join(t for t in (phrase.text, phrase.translated_text) if t)
+        return f"{start} --> {end}\n{lines}\n\n"
+
+
+def configured_exporters(
+    config: FrozenConfig,
+) -> list[tuple[Path, type[StreamingExporter]]]:
+    """The exporter of every `live_history_*` path set in the config."""
+    return [
+        (path, exporter)
+        for path, exporter in (
+            (config.live_history_html, HtmlExporter),
+            (config.live_history_md, MarkdownExporter),
+            (config.live_history_srt, SrtExporter),
+            (config.live_history_vtt, VttExporter),
+        )
+        if path
+    ]
+
+
+def open_exporters(
+    config: FrozenConfig, session_start: datetime
+) -> list[StreamingExporter]:
+    """One exporter per `live_history_*` path set in the config."""
+    return [
+        exporter(path, session_start) for path, exporter in configured_exporters(config)
+    ]
@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Sequence
+
+import numpy as np
+
+from whisper_note.asr_backend import get_asr_backend
+from whisper_note.supportive_class import (
+    ARCHIVE_SUFFIXES,
+    AsrBackendProtocol,
+    FrozenConfig,
+    LOG,
+    SegmentedArchive,
+    WHISPER_SAMPLE_RATE,
+    load_wav_float32,
+)
+
+FRAME_SECOND = 0.02  # energy is measured per 20 ms frame
+SEARCH_SECOND = 5.0  # look this far back from the window end for silence
+OVERLAP_SECOND = 1.0  # each window repeats this much of the previous one
+MAX_OVERLAP_WORDS = 20
+
+_worker_asr: AsrBackendProtocol | None = None  # one model per pool process
+
+
+def load_merged_audio(path: Path) -> np.ndarray:
+    if path.suffix != ".wav" and path.suffix in ARCHIVE_SUFFIXES.values():
+        return SegmentedArchive(path).read_float32()  # our compressed archive
+    try:
+        return load_wav_float32(path)  # no ffmpeg for our own recordings
+    except ValueError:
+        import whisper
+
+        return whisper.load_audio(str(path))
+
+
+def find_windows(
+    samples: np.ndarray,
+    window_second: float,
+    overlap_second: float = OVERLAP_SECOND,
+    search_second: float = SEARCH_SECOND,
+) -> list[tuple[int, int]]:
+    """
+    Split the audio into windows of at most `window_second`, cut at the
+    quietest frame of the last `search_second` of each window. Every window
+    but the first starts `overlap_second` before the previous cut.
+    """
+    frame = int(FRAME_SECOND * WHISPER_SAMPLE_RATE)
+    window = int(window_second * WHISPER_SAMPLE_RATE)
+    overlap = int(overlap_second * WHISPER_SAMPLE_RATE)
+    search = min(int(search_second * WHISPER_SAMPLE_RATE), window // 2)
+    n_frames = len(samples) // frame
+    energy = np.square(samples[: n_frames * frame].reshape(n_frames, frame)).mean(1)
+
+    windows, start = [], 0
+    while len(samples) - start > window:
+        lo, hi = (start + window - search) // frame, (start + window) // frame
+        cut = (lo + int(np.argmin(energy[lo:hi]))) * frame if hi > lo else hi * frame
+        assert cut > start, f"A {window_second} s window is too short to advance"
+        windows.append((max(start - overlap, 0), cut))
+        start = cut
+    windows.append((max(start - overlap, 0), len(samples)))
+    return windows
+
+
+def _words(text: str) -> list[str]:
+    return re.sub(r"[^\w\s']", "", text.lower()).split()
+
+
+def merge_overlapping_texts(texts: Sequence[str]) -> str:
+    """Join window transcripts, dropping words repeated across the overlap."""
+    merged: list[str] = []
+    for text in texts:
+        words = text.split()
+        if not words:
+            continue
+        tail, head = _words(" ".join(merged[-MAX_OVERLAP_WORDS:])), _words(text)
+        for n in range(min(len(tail), len(head), MAX_OVERLAP_WORDS), 0, -1):
+            if tail[-n:] == head[:n]:
+                words = words[n:] if len(words) == len(head) else words
+                break
+        merged.extend(words)
+    return " ".join(merged)
+
+
+def load_worker_asr(config: FrozenConfig, torch_threads: int) -> None:
+    """Pool initializer: load the model of this worker process."""
+    global _worker_asr
+    import torch
+
+    torch.set_num_threads(torch_threads)  # workers share the cores
+    _worker_asr = get_asr_backend(config)
+
+
+def worker_asr() -> AsrBackendProtocol:
+    assert _worker_asr is not None, "Worker model is not loaded"
+    return _worker_asr
+
+
+def _transcribe_in_worker(samples: np.ndarray) -> str:
+    return worker_asr().transcribe(samples)
+
+
+def transcribe_in_windows(
+    samples: np.ndarray,
+    config: FrozenConfig,
+    transcribe_in_process: Callable[[np.ndarray], str],
+) -> str:
+    """
+    Transcribe long audio window by window, in a process pool of
+    `final_pass_workers` processes each holding their own model, or in this
+    process with `transcribe_in_process` when there is only one worker.
+    """
+    windows = find_windows(samples, config.final_pass_window_second)
+    pieces = [samples[start:end] for start, end in windows]
+    workers = min(config.final_pass_workers, len(pieces))
+    LOG.info(f"Transcribing {len(pieces)} windows with {max(workers, 1)} workers")
+    if workers <= 1:
+        texts = [transcribe_in_process(piece) for piece in pieces]
+    else:
+        torch_threads = max((os.cpu_count() or 1) // workers, 1)
+        with ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),  # torch is not fork-safe
+            initializer=load_worker_asr,
+            initargs=(config, torch_threads),
+        ) as pool:
+            texts = list(pool.map(_transcribe_in_worker, pieces))  # keeps order
+    return merge_overlapping_texts(texts)
@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from whisper_note.final_pass import load_worker_asr, worker_asr
+from whisper_note.supportive_class import (
+    FrozenConfig,
+    LOG,
+    RingSlice,
+    SharedAudioRing,
+)
+
+MAX_RESTARTS = 3  # then the workers are given up, see InferencePool.broken
+_worker_ring: SharedAudioRing | None = None  # attached in each worker process
+
+
+def _load_worker(
+    config: FrozenConfig, torch_threads: int, ring_name: str, capacity: int
+) -> None:
+    """Pool initializer: load the model and attach to the recorder's ring."""
+    global _worker_ring
+    load_worker_asr(config, torch_threads)
+    _worker_ring = SharedAudioRing(capacity, ring_name)
+
+
+def _ready() -> None:
+    ...  # the initializer already loaded the model
+
+
+def _transcribe_in_worker(
+    audios: list[RingSlice | np.ndarray], prompt: str, fast: bool
+) -> list[str]:
+    assert _worker_ring is not None, "Worker ring is not attached"
+    samples = [
+        _worker_ring.read(audio) if isinstance(audio, RingSlice) else audio
+        for audio in audios
+    ]
+    return worker_asr().transcribe_batch(samples, prompt, fast)
+
+
+class InferencePool:
+    """
+    `inference_workers` processes, each with its own model and interpreter,
+    so decoding never competes for the GIL with recording, translation and
+    rendering. A chunk goes over as a RingSlice into the shared ring, only
+    samples that did not fit in the ring are pickled. When a worker dies,
+    the pool breaks and is started again, up to MAX_RESTARTS times.
+    """
+
+    restarts: int
+    broken: bool  # the workers kept dying, `submit` raises BrokenProcessPool
+
+    def __init__(self, config: FrozenConfig, ring: SharedAudioRing) -> None:
+        self.config = config
+        self.ring = ring
+        self.restarts = 0
+        self.broken = False
+        self.pool = self._start()
+
+    def _start(self) -> ProcessPoolExecutor:
+        workers = self.config.inference_workers
+        torch_threads = max((os.cpu_count() or 1) // workers, 1)
+        pool = ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),  # as final_pass
+            initializer=_load_worker,
+            initargs=(self.config, torch_threads, self.ring.name, self.ring.capacity),
+        )
+        for _ in range(workers):  # load the models now, not on the first chunk
+            pool.submit(_ready)
+        return pool
+
+    def submit(
+        self, audios: list[RingSlice | np.ndarray], prompt: str = "", fast: bool = False
+    ) -> "Future[list[str]]":
+        """The texts of the chunks, decoded together by the next free worker."""
+        if not audios:
+            done: Future[list[str]] = Future()
+            done.set_result([])
+            return done
+        try:
+            return self.pool.submit(_transcribe_in_worker, audios, prompt, fast)
+        except BrokenProcessPool:  # a worker died, the decodes in flight failed
+            if self.restarts >= MAX_RESTARTS:
+                self.broken = True
+                raise
+            self.restarts += 1
+            LOG.warning(
+                f"An inference worker died, restarting the workers "
+                f"({self.restarts}/{MAX_RESTARTS})"
+            )
+            self.pool.shutdown(wait=False)
+            self.pool = self._start()
+            return self.pool.submit(_transcribe_in_worker, audios, prompt, fast)
+
+    def shutdown(self) -> None:
+        self.pool.shutdown()
@@ -1,9 +1,12 @@
 from functools import lru_cache
+from importlib.util import find_spec
+from pathlib import Path
 import dotenv
 import os
 import yaml
 
 from whisper_note.supportive_class import (
+    ARCHIVE_SUFFIXES,
     Language,
     FrozenConfig,
     InvalidConfigError,
@@ -12,6 +15,7 @@ from whisper_note.supportive_class.file_and_io import parse_path_config
 
 
 DEFAULT_CONFIG_FOLDER = os.path.abspath(os.path.join(__file__, "..", ".."))
+MIN_FINAL_PASS_WINDOW_SECOND = 5  # a window must reach past its overlap and search
 
 
 @lru_cache(maxsize=1)
@@ -27,22 +31,97 @@ def parse_env_and_config(env_config_path: str) -> FrozenConfig:
     with open(cfg_path) as cfg_file:
         cfg = yaml.safe_load(cfg_file)
         parsed_cfg["dot_env_path"] = os.path.join(env_config_path, ".env")
+        parsed_cfg["asr_backend"] = cfg.get("asr_backend", "WHISPER")
         parsed_cfg["model"] = cfg.get("model", "small")
+        parsed_cfg["quantize_int8"] = cfg.get("quantize_int8", False)
+        parsed_cfg["fallback_model"] = cfg.get("fallback_model", "")
         parsed_cfg["translator"] = cfg.get("translator", "NONE")
+        parsed_cfg["translator_server_url"] = cfg.get("translator_server_url", "")
+        parsed_cfg["translator_max_retries"] = cfg.get("translator_max_retries", 5)
+        parsed_cfg["translate_batch_size"] = cfg.get("translate_batch_size", 16)
+        parsed_cfg["translate_batch_ms"] = cfg.get("translate_batch_ms", 200)
+        parsed_cfg["translation_cache"] = cfg.get("translation_cache", "")
+        parsed_cfg["translation_cache_memory_size"] = cfg.get(
+            "translation_cache_memory_size", 1024
+        )
+        parsed_cfg["translation_cache_max_rows"] = cfg.get(
+            "translation_cache_max_rows", 100000
+        )
         parsed_cfg["source_lang"] = Language(cfg.get("source_lang", "English"))
         parsed_cfg["target_lang"] = Language(
             cfg.get("target_lang", "Chinese_Simplified")
         )
+        parsed_cfg["audio_source"] = cfg.get("audio_source", "MICROPHONE")
+        parsed_cfg["audio_source_path"] = cfg.get("audio_source_path", "")
+        parsed_cfg["audio_source_realtime"] = cfg.get("audio_source_realtime", True)
+        parsed_cfg["audio_source_sample_rate"] = cfg.get(
+            "audio_source_sample_rate", 16000
+        )
         parsed_cfg["linux_microphone"] = cfg.get("linux_microphone", None)
         parsed_cfg["energy_threshold"] = cfg.get("energy_threshold", 500)
         parsed_cfg["phrase_max_second"] = cfg.get("phrase_max_second", 3)
+        parsed_cfg["in_memory_audio"] = cfg.get("in_memory_audio", True)
+        parsed_cfg["vad"] = cfg.get("vad", True)
+        parsed_cfg["vad_threshold_db"] = cfg.get("vad_threshold_db", -45)
+        parsed_cfg["pipeline_queue_size"] = cfg.get("pipeline_queue_size", 32)
+        parsed_cfg["decode_batch_size"] = cfg.get("decode_batch_size", 4)
+        parsed_cfg["inference_workers"] = cfg.get("inference_workers", 0)
+        parsed_cfg["backlog_max_chunks"] = cfg.get("backlog_max_chunks", 4)
+        parsed_cfg["backlog_max_second"] = cfg.get("backlog_max_second", 10)
+        parsed_cfg["streaming_interval_ms"] = cfg.get("streaming_interval_ms", 0)
         parsed_cfg["store_merged_wav"] = cfg.get("store_merged_wav", False)
+        parsed_cfg["archive_format"] = cfg.get("archive_format", "WAV")
         parsed_cfg["merged_transcription"] = cfg.get("merged_transcription", "")
+        parsed_cfg["final_pass_window_second"] = cfg.get("final_pass_window_second", 30)
+        parsed_cfg["final_pass_workers"] = cfg.get("final_pass_workers", 1)
         parsed_cfg["live_history_html"] = cfg.get("live_history_html", "")
+        parsed_cfg["live_history_md"] = cfg.get("live_history_md", "")
+        parsed_cfg["live_history_srt"] = cfg.get("live_history_srt", "")
+        parsed_cfg["live_history_vtt"] = cfg.get("live_history_vtt", "")
         parsed_cfg["summarizer"] = cfg.get("summarizer", "NONE")
+        parsed_cfg["live_table_rows"] = cfg.get("live_table_rows", 50)
+        parsed_cfg["live_refresh_fps"] = cfg.get("live_refresh_fps", 4)
+        parsed_cfg["metrics_address"] = cfg.get("metrics_address", "")
+
+    for key, suffix in (
+        ("live_history_html", ".html"),
+        ("live_history_md", ".md"),
+        ("live_history_srt", ".srt"),
+        ("live_history_vtt", ".vtt"),
+    ):
+        _path = parse_path_config(parsed_cfg[key])
+        parsed_cfg[key] = _path.with_suffix(suffix) if _path else None
+
+    if parsed_cfg["asr_backend"] not in ("WHISPER", "FASTER_WHISPER"):
+        raise InvalidConfigError(f"Unknown asr_backend: {parsed_cfg['asr_backend']}")
+
+    audio_source = parsed_cfg["audio_source"]
+    if audio_source not in ("MICROPHONE", "WAV", "STDIN", "SOCKET"):
+        raise InvalidConfigError(f"Unknown audio_source: {audio_source}")
+    if audio_source in ("WAV", "SOCKET") and not parsed_cfg["audio_source_path"]:
+        raise InvalidConfigError(f"audio_source {audio_source} needs audio_source_path")
+
+    if parsed_cfg["decode_batch_size"] < 1:
+        raise InvalidConfigError("decode_batch_size must be at least 1")
+
+    if parsed_cfg["final_pass_window_second"] < MIN_FINAL_PASS_WINDOW_SECOND:
+        raise InvalidConfigError(
+            f"final_pass_window_second must be at least {MIN_FINAL_PASS_WINDOW_SECOND}"
+        )
+    if parsed_cfg["final_pass_workers"] < 1:
+        raise InvalidConfigError("final_pass_workers must be at least 1")
 
-    _path = parse_path_config(parsed_cfg["live_history_html"])
-    parsed_cfg["live_history_html"] = _path.with_suffix(".html") if _path else None
+    if parsed_cfg["inference_workers"] and (
+        not parsed_cfg["in_memory_audio"] or parsed_cfg["streaming_interval_ms"]
+    ):
+        raise InvalidConfigError(
+            "inference_workers needs in_memory_audio and no streaming_interval_ms"
+        )
+
+    if parsed_cfg["streaming_interval_ms"] and not parsed_cfg["in_memory_audio"]:
+        raise InvalidConfigError(
+            "streaming_interval_ms is only available when in_memory_audio is true"
+        )
 
     # parse translator api key
     translator = parsed_cfg["translator"]
@@ -53,10 +132,20 @@ def parse_env_and_config(env_config_path: str) -> FrozenConfig:
     else:
         raise InvalidConfigError(f"Unknown translator: translator={translator}")
 
+    # the translation cache is one file reused by every session, not a PATH type
+    cache_path = parsed_cfg["translation_cache"].strip()
+    parsed_cfg["translation_cache"] = Path(cache_path) if cache_path else None
+
     # check the merged wav file
+    archive_format = parsed_cfg["archive_format"]
+    if archive_format not in ARCHIVE_SUFFIXES:
+        raise InvalidConfigError(f"Unknown archive_format: {archive_format}")
+    if archive_format == "FLAC" and find_spec("soundfile") is None:
+        raise InvalidConfigError("archive_format FLAC needs `pip install soundfile`")
     wav_path = parsed_cfg["store_merged_wav"]
     _path = parse_path_config(wav_path)
-    parsed_cfg["store_merged_wav"] = _path.with_suffix(".wav") if _path else None
+    suffix = ARCHIVE_SUFFIXES[archive_format]
+    parsed_cfg["store_merged_wav"] = _path.with_suffix(suffix) if _path else None
     if wav_path == "" and parsed_cfg["merged_transcription"]:
         raise InvalidConfigError(
             "merged_transcription is only available when store_merged_wav is not empty"
@@ -84,6 +173,3 @@ def parse_env_and_config(env_config_path: str) -> FrozenConfig:
     CONFIG = FrozenConfig(**parsed_cfg)
     parsed_cfg.clear()
     return CONFIG
-
-
-CONFIG = parse_env_and_config(DEFAULT_CONFIG_FOLDER)
@@ -0,0 +1,91 @@
+from queue import Empty, Full, Queue
+from threading import Thread
+from time import monotonic
+from typing import Callable, Generic, TypeVar
+
+from whisper_note.supportive_class import LOG
+
+T = TypeVar("T")
+
+
+class QueueWorker(Thread, Generic[T]):
+    """
+    A pipeline stage: a daemon thread that blocks on its bounded inbox and
+    calls `handle` on every item, until it receives the `None` sentinel.
+    """
+
+    inbox: "Queue[T | None]"
+    handle: Callable[[T], None]
+
+    def __init__(self, name: str, handle: Callable[[T], None], maxsize: int) -> None:
+        super().__init__(name=name, daemon=True)
+        self.inbox = Queue(maxsize=maxsize)
+        self.handle = handle
+
+    def put(self, item: T) -> None:
+        """Hand over an item, blocking when the stage is `maxsize` behind."""
+        self.inbox.put(item)
+
+    def offer(self, item: T) -> bool:
+        """Hand over an item unless the inbox is full. Good for coalescing."""
+        try:
+            self.inbox.put_nowait(item)
+            return True
+        except Full:
+            return False
+
+    def run(self) -> None:
+        while (item := self.inbox.get()) is not None:
+            try:
+                self.handle(item)
+            except Exception:  # one bad item should not kill the stage
+                LOG.exception(f"{self.name} failed to handle {item!r}")
+
+    def stop(self) -> None:
+        """Finish every item already handed over, then end the thread."""
+        if self.is_alive():
+            self.inbox.put(None)
+            self.join()
+
+
+class BatchQueueWorker(QueueWorker[T]):
+    """
+    A pipeline stage that coalesces its inbox: after the first item arrives,
+    it waits up to `max_wait` seconds for more and handles up to `max_batch`
+    items with one `handle_batch` call.
+    """
+
+    handle_batch: Callable[[list[T]], None]
+    max_batch: int
+    max_wait: float
+
+    def __init__(
+        self,
+        name: str,
+        handle_batch: Callable[[list[T]], None],
+        maxsize: int,
+        max_batch: int,
+        max_wait: float,
+    ) -> None:
+        super().__init__(name, lambda item: handle_batch([item]), maxsize)
+        self.handle_batch = handle_batch
+        self.max_batch = max(max_batch, 1)
+        self.max_wait = max_wait
+
+    def run(self) -> None:
+        stopping = False
+        while not stopping and (item := self.inbox.get()) is not None:
+            batch, deadline = [item], monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.inbox.get(timeout=max(deadline - monotonic(), 0))
+                except Empty:
+                    break
+                if item is None:
+                    stopping = True  # still handle what we have collected
+                    break
+                batch.append(item)
+            try:
+                self.handle_batch(batch)
+            except Exception:
+                LOG.exception(f"{self.name} failed to handle {batch!r}")
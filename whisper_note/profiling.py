@@ -0,0 +1,127 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from threading import Lock, Thread
+from time import perf_counter_ns, sleep
+from typing import ContextManager, Iterator, TextIO
+
+from whisper_note.supportive_class import LOG
+
+SAMPLE_INTERVAL_SECOND = 0.01  # 100 Hz, about 1% of one core
+TORCH_PROFILE_EVERY = 50  # chunks, the torch profiler itself is not cheap
+
+
+class Profiler:
+    """
+    Always-on profiling of a session, written to `folder`:
+    - `stages.trace.json`: a span per stage and chunk, for chrome://tracing
+      or Perfetto, streamed so it survives a crash.
+    - `samples.folded`: stacks of every thread sampled at 100 Hz, rooted at
+      the thread name, for flamegraph.pl or speedscope.
+    - `on_stop.prof`: cProfile of the one-off work after recording stops.
+    - `torch-chunk-N.json`: with `torch_trace`, a torch profiler trace of
+      one speech recognition call every `TORCH_PROFILE_EVERY` chunks.
+    """
+
+    folder: Path
+    torch_trace: bool
+    samples: Counter[str]
+    _trace: TextIO
+
+    def __init__(self, folder: Path, torch_trace: bool = False) -> None:
+        self.folder = folder
+        self.torch_trace = torch_trace
+        folder.mkdir(parents=True, exist_ok=True)
+        self.samples = Counter()
+        self._lock = Lock()
+        self._named_threads: set[int] = set()
+        self._trace = open(folder / "stages.trace.json", "w")
+        self._trace.write("[\n")  # the closing bracket is optional in this format
+        self._running = True
+        self._sampler = Thread(target=self._sample, name="profiler", daemon=True)
+        self._sampler.start()
+
+    @contextmanager
+    def span(self, name: str, **args: object) -> Iterator[None]:
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._write_span(name, start, perf_counter_ns() - start, args)
+
+    def torch_profile(self, chunk: int) -> ContextManager:
+        """The torch profiler around one chunk in `TORCH_PROFILE_EVERY`."""
+        if not self.torch_trace or chunk % TORCH_PROFILE_EVERY:
+            return nullcontext()
+        return self._torch_profile(chunk)
+
+    @contextmanager
+    def _torch_profile(self, chunk: int) -> Iterator[None]:
+        import torch
+        from torch.profiler import ProfilerActivity, profile
+
+        activities = [ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(ProfilerActivity.CUDA)
+        with profile(activities=activities) as torch_profiler:
+            yield
+        torch_profiler.export_chrome_trace(
+            str(self.folder / f"torch-chunk-{chunk}.json")
+        )
+
+    @contextmanager
+    def cprofile(self, name: str) -> Iterator[None]:
+        """Deterministic profile of this thread, for one-off stages."""
+        profile = cProfile.Profile()
+        with self.span(name), profile:
+            yield
+        profile.dump_stats(self.folder / f"{name}.prof")
+
+    def close(self) -> None:
+        self._running = False
+        self._sampler.join()
+        with self._lock:
+            self._trace.close()
+        with open(self.folder / "samples.folded", "w") as folded:
+            for stack, count in self.samples.most_common():
+                folded.write(f"{stack} {count}\n")
+        LOG.info(f"Profile written to {self.folder}")
+
+    def _write_span(self, name: str, start_ns: int, duration_ns: int, args: dict):
+        thread = threading.current_thread()
+        events = []
+        if thread.ident not in self._named_threads:
+            self._named_threads.add(thread.ident)  # type: ignore
+            events.append(
+                {"name": "thread_name", "ph": "M", "pid": os.getpid()}
+                | {"tid": thread.ident, "args": {"name": thread.name}}
+            )
+        events.append(
+            {"name": name, "ph": "X", "pid": os.getpid(), "tid": thread.ident}
+            | {"ts": start_ns / 1000, "dur": duration_ns / 1000, "args": args}
+        )
+        with self._lock:
+            if not self._trace.closed:
+                self._trace.writelines(json.dumps(e) + ",\n" for e in events)
+                self._trace.flush()
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        while self._running:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+            sleep(SAMPLE_INTERVAL_SECOND)
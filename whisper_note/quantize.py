@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import torch
+import whisper
+from whisper.model import ModelDimensions, Whisper
+
+from whisper_note.supportive_class import LOG
+
+QUANTIZED_CACHE_DIR = Path(
+    os.getenv("XDG_CACHE_HOME", Path.home() / ".cache"), "whisper"
+)  # next to the checkpoints downloaded by whisper
+CHECKSUM_BLOCK_SIZE = 1 << 20
+CHECKSUM_LENGTH = 12  # of the hex digest, in the cache file name
+CHECKSUMS_FILE = "int8-checksums.json"  # of the checkpoint files, by path
+
+
+def quantize_dynamic_int8(model: whisper.Whisper) -> whisper.Whisper:
+    """
+    Replace the linear layers with int8 dynamically quantized ones, for CPU.
+    Convolutions, layer norms and embeddings stay in fp32.
+    """
+    model = model.cpu().eval()
+    for module in model.modules():
+        # whisper's Linear only casts the weight dtype for fp16, which CPU
+        # inference never uses, and torch only quantizes the exact nn.Linear
+        if isinstance(module, whisper.model.Linear):
+            module.__class__ = torch.nn.Linear
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def _int8_modules(dims: ModelDimensions) -> whisper.Whisper:
+    """
+    The modules of the int8 model, with placeholder weights: no checkpoint
+    is read and nothing is quantized, a cached state dict fills them in.
+    """
+    model = Whisper(dims).eval()
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, torch.nn.Linear):
+                int8 = torch.ao.nn.quantized.dynamic.Linear(
+                    child.in_features,
+                    child.out_features,
+                    bias_=child.bias is not None,
+                    dtype=torch.qint8,
+                )
+                setattr(parent, name, int8)
+    return model
+
+
+def _known_checksums() -> dict[str, dict[str, Any]]:
+    try:
+        return json.loads((QUANTIZED_CACHE_DIR / CHECKSUMS_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def checkpoint_checksum(model: str) -> str:
+    """
+    SHA256 of a checkpoint file, or the one whisper checks its download of
+    a named model against, in the download URL. A file is hashed again
+    only when its size or modification time changed.
+    """
+    if not os.path.isfile(model):
+        return whisper._MODELS[model].split("/")[-2]
+    stat, path = os.stat(model), str(Path(model).resolve())
+    known = _known_checksums()
+    seen = known.get(path, {})
+    if (seen.get("size"), seen.get("mtime_ns")) == (stat.st_size, stat.st_mtime_ns):
+        return seen["sha256"]
+    digest = hashlib.sha256()
+    with open(model, "rb") as checkpoint:
+        while block := checkpoint.read(CHECKSUM_BLOCK_SIZE):
+            digest.update(block)
+    known[path] = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest.hexdigest(),
+    }
+    QUANTIZED_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    (QUANTIZED_CACHE_DIR / CHECKSUMS_FILE).write_text(json.dumps(known))
+    return digest.hexdigest()
+
+
+def quantized_cache_path(model: str) -> Path:
+    name = Path(model).stem if os.path.isfile(model) else model
+    checksum = checkpoint_checksum(model)[:CHECKSUM_LENGTH]
+    return QUANTIZED_CACHE_DIR / f"{name}-{checksum}-int8-torch{torch.__version__}.pt"
+
+
+def load_quantized_model(model: str) -> whisper.Whisper:
+    """
+    Load the int8 model from the cache, or quantize and cache it once.
+    Only the dims and the state dict are cached: loading them runs no
+    pickled code, and a changed checkpoint never matches, the key has its
+    checksum.
+    """
+    cache = quantized_cache_path(model)
+    if cache.exists():
+        LOG.info(f"Loading cached int8 model from {cache}")
+        cached = torch.load(cache, map_location="cpu", weights_only=True)
+        quantized = _int8_modules(ModelDimensions(**cached["dims"]))
+        quantized.load_state_dict(cached["model_state_dict"])
+        if model in whisper._ALIGNMENT_HEADS:  # as `whisper.load_model` does
+            quantized.set_alignment_heads(whisper._ALIGNMENT_HEADS[model])
+        return quantized
+    LOG.info(f"Quantizing whisper model [{model}] to int8, only done once")
+    loaded = whisper.load_model(model, device="cpu")
+    quantized = quantize_dynamic_int8(loaded)
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    torch.save(
+        {"dims": vars(loaded.dims), "model_state_dict": quantized.state_dict()}, cache
+    )
+    return quantized
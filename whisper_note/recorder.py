@@ -2,109 +2,250 @@ import os
 from collections import deque
 from datetime import datetime
 from pathlib import Path
-from sys import platform
-from tempfile import NamedTemporaryFile, _TemporaryFileWrapper
+from queue import Empty
+from threading import Event
+from time import perf_counter
+from tempfile import NamedTemporaryFile
+from typing import Callable
 
+import numpy as np
 import speech_recognition as sr
-from result import Err, Ok, Result
 
-from whisper_note.supportive_class.file_and_io import merge_wav_files
-from whisper_note.supportive_class import FrozenConfig, WavTimeSizeQueue, LOG
+from whisper_note.audio_source import StreamSource, open_audio_source
+from whisper_note.pipeline import QueueWorker
+from whisper_note.supportive_class import (
+    AudioChunk,
+    FrozenConfig,
+    PreparedChunk,
+    SharedAudioRing,
+    SegmentedArchiveWriter,
+    StreamingWavWriter,
+    WavTimeSizeQueue,
+    LOG,
+    METRICS,
+    PCM16_WIDTH,
+    WHISPER_SAMPLE_RATE,
+    open_merged_audio,
+    pcm16_to_float32,
+)
+
+STREAM_PAUSE_RATIO = 0.5  # of the streaming interval, silence that ends a chunk
 
 
 class ChunkedRecorder:
     """
     Record audio in chunks in a background thread and return the
-    chunks as wav files.
+    chunks as wav files, or as float32 samples with `in_memory_audio`.
+    The source is the microphone, or any other `audio_source`. When a
+    stream source ends, `get_next_part` raises EOFError. After
+    `start_preparing`, in-memory chunks are queued ready to decode, after
+    `start_sharing`, as slices of a ring shared with other processes.
     """
 
     data_queue: WavTimeSizeQueue  # coupled to pending_time_size, should combine
     pending_time_size: deque[tuple[datetime, int]]
-    source: sr.Microphone
-    temp_wav: _TemporaryFileWrapper
+    source: sr.AudioSource
     sample_rate_width: tuple[int, int]
+    started_at: datetime  # the time of the first sample recorded
     config: FrozenConfig
-    all_wav: list[_TemporaryFileWrapper]
+    # written as chunks arrive, a wav or an archive, see `archive_format`
+    merged_wav: StreamingWavWriter | SegmentedArchiveWriter | None
+    stop_listening: Callable[..., None]
+    recognizer: sr.Recognizer
+    preparer: QueueWorker[tuple[np.ndarray, datetime, int, float]] | None
+    ring: SharedAudioRing | None
 
-    def __init__(self, data_queue: WavTimeSizeQueue, config: FrozenConfig):
+    def __init__(
+        self,
+        data_queue: WavTimeSizeQueue,
+        config: FrozenConfig,
+        source: sr.AudioSource | None = None,
+    ):
         self.config = config
         self.data_queue = data_queue
         self.pending_time_size = deque()
-        self.source, _ = self._initialize_recorder_source()
-        self.sample_rate_width = (self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH)
-        self.all_wav = []
-
-    def get_next_part(self) -> tuple[_TemporaryFileWrapper | None, datetime, int]:
-        if self.data_queue.empty():
-            return (None, datetime.now(), 0)  # no data yet, return None.
-        # data_queue is not empty, handle the data.
-        temp_wav, time, size = self.data_queue.get()  # best way for Queue.
+        self.merged_wav = None
+        self.preparer = None
+        self.ring = None
+        self.source = source or open_audio_source(config)
+        self._ended = False  # the source ended and the queue is drained
+        self._listening = Event()  # set once `stop_listening` is assigned
+        self._initialize_recorder_source()
+
+    def get_next_part(
+        self, timeout: float | None = None
+    ) -> tuple[AudioChunk, datetime, int, float]:
+        """
+        Block until the next chunk is recorded, no polling needed. Raise
+        queue.Empty if none is recorded within `timeout` seconds.
+        """
+        # best way for Queue.
+        part = None if self._ended else self.data_queue.get(timeout=timeout)
+        if part is None:  # put by the callback after the last chunk
+            self._ended = True
+            raise EOFError("The audio source ended")
         self.pending_time_size.popleft()
-        return (temp_wav, time, size)
+        return part
+
+    def get_ready_parts(
+        self, limit: int
+    ) -> list[tuple[AudioChunk, datetime, int, float]]:
+        """Up to `limit` chunks that are already recorded, without blocking."""
+        parts = []
+        while len(parts) < limit:
+            try:
+                part = self.data_queue.get_nowait()
+            except Empty:
+                break
+            if part is None:
+                self._ended = True
+                break
+            parts.append(part)
+            self.pending_time_size.popleft()
+        return parts
 
-    def write_merged_wav(self) -> Path:
-        """merge all wav files in self.all_wav to a single wav file"""
-        if not self.config.store_merged_wav:  # double checking is good
+    def start_preparing(self, prepare: Callable[[np.ndarray], PreparedChunk]) -> None:
+        """
+        Run `prepare` on every in-memory chunk from now on, on a "features"
+        thread between the recording callback and the queue. It overlaps
+        with the decoding of the chunks before, and never delays recording.
+        """
+        preparer = QueueWorker(
+            "features", lambda part: self._put_prepared(prepare, *part), maxsize=0
+        )
+        preparer.start()
+        self.preparer = preparer  # the callback reads it from now on
+
+    def start_sharing(self, ring: SharedAudioRing) -> None:
+        """Write in-memory chunks to `ring` from now on, queue their slices."""
+        self.ring = ring
+
+    def close_merged_wav(self) -> Path:
+        """Stop recording and finalize the merged wav written so far."""
+        if self.merged_wav is None:  # double checking is good
             raise ValueError("store_merged_wav is not set.")
-        with open(self.config.store_merged_wav, "ab") as merged_wav:
-            merge_wav_files(self.all_wav, merged_wav)
-        return self.config.store_merged_wav
-
-    def _load_microphone_source(self) -> Result[sr.Microphone, str]:
-        if "linux" not in platform:
-            source = sr.Microphone(sample_rate=16000)
-            return Ok(source)
-
-        # only Linux users need this to prevent permanent application hang / crash
-        mic_name = self.config.linux_microphone
-        if not mic_name or mic_name == "list":
-            LOG.info("Showing available microphone devices: ")
-            for index, name in enumerate(sr.Microphone.list_microphone_names()):
-                LOG.info(f'Found microphone with name "{name}"')
-            return Err("No microphone name provided, aborting.")
-        else:
-            for index, name in enumerate(sr.Microphone.list_microphone_names()):
-                if mic_name in name:
-                    source = sr.Microphone(sample_rate=16000, device_index=index)
-                    break
-            else:
-                return Err("Default microphone with name {mic_name} not found.")
-        return Ok(source)
+        self.stop_listening(wait_for_stop=False)
+        return self.merged_wav.close()
+
+    def close_source(self) -> None:
+        """Stop recording, and close the source if it is not the microphone."""
+        self.stop_listening(wait_for_stop=False)
+        if isinstance(self.source, StreamSource):
+            self.source.close()
 
     def _record_callback(self, _, audio: sr.AudioData) -> None:
         """
         Threaded callback function to receive audio data when recordings finish.
         audio: An AudioData containing the recorded bytes.
         """
-        # Convert raw data to wav file before pushing it to the queue.
-        temp_wav = NamedTemporaryFile(delete=self.config.store_merged_wav == "")
-        temp_wav.write(audio.get_wav_data())  # temp .wav file for whisper to read
-        time, size = datetime.now(), os.path.getsize(temp_wav.name)
-        if self.config.store_merged_wav:
-            self.all_wav.append(temp_wav)
-        self.data_queue.put((temp_wav, time, size))
-        self.pending_time_size.append((time, size))
+        ended = isinstance(self.source, StreamSource) and self.source.ended
+        if ended:  # a short file can end before `stop_listening` is assigned
+            self._listening.wait()
+            self.stop_listening(wait_for_stop=False)
+        # the recognizer hands over the silence before the end of a stream
+        if audio.frame_data and (not ended or self._is_speech(audio)):
+            self._queue_audio(audio)
+        if ended:
+            if self.preparer is not None:
+                self.preparer.stop()  # queues the chunks it still has
+            self.data_queue.put(None)  # no more chunks
+
+    def _is_speech(self, audio: sr.AudioData) -> bool:
+        samples = np.frombuffer(audio.get_raw_data(convert_width=2), np.int16)
+        rms = np.sqrt(np.mean(np.square(samples, dtype=np.float64)))
+        return rms > self.recognizer.energy_threshold
+
+    def _queue_audio(self, audio: sr.AudioData) -> None:
+        captured = perf_counter()
+        if isinstance(self.source, StreamSource):
+            time = self.source.clock()  # the replayed time
+        else:
+            time = datetime.now()
+        chunk: AudioChunk
+        if self.config.in_memory_audio:
+            # Whisper takes float32 samples directly: no temp file, no ffmpeg.
+            raw = audio.get_raw_data(WHISPER_SAMPLE_RATE, PCM16_WIDTH)
+            chunk, size = pcm16_to_float32(raw), len(raw)
+            if self.ring is not None:
+                # a full ring means inference is far behind, pickle the samples
+                chunk = self.ring.write(chunk) or chunk
+        else:
+            # Convert raw data to wav file before pushing it to the queue.
+            temp_wav = NamedTemporaryFile()  # deleted once transcribed and dropped
+            temp_wav.write(audio.get_wav_data())  # temp .wav file for whisper to read
+            temp_wav.flush()
+            chunk, size = temp_wav, os.path.getsize(temp_wav.name)
+        if self.merged_wav is not None:
+            self.merged_wav.write(audio.get_raw_data(), time)  # in the source format
+        self.pending_time_size.append((time, size))  # before the consumer pops it
+        if self.preparer is not None and isinstance(chunk, np.ndarray):
+            self.preparer.put((chunk, time, size, captured))
+        else:
+            self.data_queue.put((chunk, time, size, captured))
+        METRICS.observe("capture_seconds", perf_counter() - captured)
         # push bytes to thread-safe queue
         LOG.info(f"Received {size} bytes of wav data.")
 
-    def _initialize_recorder_source(self) -> tuple[sr.Microphone, sr.Recognizer]:
+    def _put_prepared(
+        self,
+        prepare: Callable[[np.ndarray], PreparedChunk],
+        samples: np.ndarray,
+        time: datetime,
+        size: int,
+        captured: float,
+    ) -> None:
+        chunk: AudioChunk = samples
+        try:
+            chunk = prepare(samples)
+        except Exception:  # the transcriber can still decode the raw samples
+            LOG.exception("Failed to prepare a chunk, queueing it as is")
+        self.data_queue.put((chunk, time, size, captured))
+
+    def _initialize_recorder_source(self) -> sr.Recognizer:
         # We use SpeechRecognizer to record our audio because it has a nice feature where it can detect when speech ends.
-        recorder = sr.Recognizer()
+        recorder = self.recognizer = sr.Recognizer()
         recorder.energy_threshold = self.config.energy_threshold
         # Definitely do this, dynamic energy compensation lowers the energy threshold dramatically to a point where the SpeechRecognizer never stops recording.
         recorder.dynamic_energy_threshold = False
-        source = self._load_microphone_source().or_else(lambda err: exit(err)).unwrap()
+        source = self.source
 
-        with source:
-            recorder.adjust_for_ambient_noise(source)
+        if not isinstance(source, StreamSource):
+            # a stream may start with speech, and calibrating would consume
+            # its first second: keep the configured `energy_threshold`
+            with source:
+                recorder.adjust_for_ambient_noise(source)
+        self.sample_rate_width = (source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+        if self.config.store_merged_wav:
+            self.merged_wav = open_merged_audio(
+                self.config.store_merged_wav,
+                *self.sample_rate_width,
+                self.config.archive_format,
+            )
 
         # Create a background thread that will pass us raw audio bytes.
         # We could do this manually but SpeechRecognizer provides a nice helper.
         # here the recording is splitted to chunks of length <= phrase_max_second
         # or splitted by silence. It's not very few bytes.
-        recorder.listen_in_background(
+        # When streaming, chunks are cut every interval and the transcriber
+        # joins them back into phrases. A pause well within the interval
+        # cuts the chunk short, which ends the phrase.
+        interval = self.config.streaming_interval_ms / 1000
+        if interval:
+            recorder.pause_threshold = min(
+                recorder.pause_threshold, interval * STREAM_PAUSE_RATIO
+            )
+            recorder.non_speaking_duration = min(
+                recorder.non_speaking_duration, recorder.pause_threshold / 2
+            )
+        # a stream is timed from its own start, see `StreamSource.clock`
+        if isinstance(source, StreamSource):
+            self.started_at = source.started_at
+        else:
+            self.started_at = datetime.now()
+        self.stop_listening = recorder.listen_in_background(
             source,
             self._record_callback,
-            phrase_time_limit=self.config.phrase_max_second,
+            phrase_time_limit=interval or self.config.phrase_max_second,
         )
-        return source, recorder
+        self._listening.set()
+        return recorder
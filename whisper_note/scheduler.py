@@ -0,0 +1,72 @@
+from enum import IntEnum
+from time import monotonic
+
+from whisper_note.supportive_class import LOG
+
+RECOVER_LOAD = 0.5  # step back up only once the backlog is half the threshold
+
+
+class DecodeLevel(IntEnum):
+    NORMAL = 0
+    FAST = 1  # greedy, no temperature fallback
+    FALLBACK_MODEL = 2  # the smaller `fallback_model`, also fast
+
+
+class BacklogScheduler:
+    """
+    Pick how to decode the next chunk from the backlog, so the live view
+    stays at most about `max_lag_second` behind. The load is the larger of
+    queue depth over `max_chunks`, ignored if 0, and chunk age over
+    `max_lag_second`. It degrades one level at load 1 and another at load 2,
+    and recovers one level at a time below `RECOVER_LOAD`, so it does not
+    flap.
+    """
+
+    max_chunks: int  # 0: the queue depth never degrades
+    max_lag_second: float
+    has_fallback: bool
+    level: DecodeLevel
+    degraded_second: float  # time spent below NORMAL
+    _degraded_since: float | None
+
+    def __init__(
+        self, max_chunks: int, max_lag_second: float, has_fallback: bool
+    ) -> None:
+        self.max_chunks = max_chunks
+        self.max_lag_second = max_lag_second
+        self.has_fallback = has_fallback
+        self.level = DecodeLevel.NORMAL
+        self.degraded_second = 0.0
+        self._degraded_since = None
+
+    def update(self, depth: int, lag_second: float) -> DecodeLevel:
+        """`depth` chunks wait behind one recorded `lag_second` ago."""
+        depth_load = depth / self.max_chunks if self.max_chunks else 0.0
+        load = max(depth_load, lag_second / self.max_lag_second)
+        if load >= 2 and self.has_fallback:
+            target = DecodeLevel.FALLBACK_MODEL
+        elif load >= 1:
+            target = DecodeLevel.FAST
+        else:
+            target = DecodeLevel.NORMAL
+        if target > self.level:
+            LOG.warning(
+                f"Inference is behind ({depth} chunks, {lag_second:.1f}s), "
+                f"degrading to {target.name}"
+            )
+            self._set_level(target)
+        elif load < RECOVER_LOAD and self.level > DecodeLevel.NORMAL:
+            self._set_level(DecodeLevel(self.level - 1))
+            LOG.info(f"Inference caught up, recovering to {self.level.name}")
+        return self.level
+
+    def _set_level(self, level: DecodeLevel) -> None:
+        now = monotonic()
+        if self._degraded_since is not None:
+            self.degraded_second += now - self._degraded_since
+        self.level = level
+        self._degraded_since = now if level > DecodeLevel.NORMAL else None
+
+    def stats(self) -> str:
+        self._set_level(self.level)  # count the current period
+        return f"{self.degraded_second:.1f}s degraded"
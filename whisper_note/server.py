@@ -0,0 +1,409 @@
+import json
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from queue import Queue
+from threading import Condition, Thread
+from time import perf_counter
+from typing import BinaryIO
+from urllib.parse import parse_qs, urlsplit
+from uuid import uuid4
+
+import numpy as np
+
+from whisper_note.asr_backend import get_asr_backend
+from whisper_note.audio_source import StreamSource
+from whisper_note.exporter import StreamingExporter, configured_exporters
+from whisper_note.pipeline import QueueWorker
+from whisper_note.recorder import ChunkedRecorder
+from whisper_note.supportive_class import (
+    FrozenConfig,
+    LOG,
+    METRICS,
+    PreparedChunk,
+    TranslatorProtocol,
+    VoiceActivityDetector,
+    WavTimeSizeQueue,
+    WHISPER_SAMPLE_RATE,
+    get_translator,
+)
+from whisper_note.transcription import Phrase, Transcriptions
+
+MAX_CHUNK_LINE = 1024  # the size line of a chunked upload, extensions included
+
+
+class ChunkedBody:
+    """
+    The body of an upload as a byte stream, with a Content-Length or
+    `Transfer-Encoding: chunked`, as `curl -T -` sends from a pipe.
+    """
+
+    def __init__(self, rfile: BinaryIO, headers) -> None:
+        self._rfile = rfile
+        self._chunked = "chunked" in headers.get("Transfer-Encoding", "").lower()
+        self._left = 0 if self._chunked else int(headers.get("Content-Length", 0))
+        self._done = False
+
+    def read(self, size: int) -> bytes:
+        """Up to `size` bytes, b"" once the upload ended or was cut short."""
+        try:
+            if self._chunked and self._left == 0 and not self._done:
+                self._left = self._next_chunk_size()
+            if self._done or self._left == 0:
+                return b""
+            data = self._rfile.read(min(size, self._left))
+            self._left -= len(data)
+            if self._chunked and self._left == 0:
+                self._rfile.readline(MAX_CHUNK_LINE)  # the CRLF after the chunk
+        except OSError:  # the connection was reset
+            data = b""
+        if not data:  # the client went away
+            self._done = True
+        return data
+
+    def _next_chunk_size(self) -> int:
+        """The size of the next chunk, 0 at the last one or when cut short."""
+        line = self._rfile.readline(MAX_CHUNK_LINE)
+        try:
+            size = int(line.split(b";")[0], 16)
+        except ValueError:  # b"" when the client went away between chunks
+            size = -1
+        if size < 0:
+            LOG.warning(f"Upload cut short, invalid chunk size line {line!r}")
+            self._done = True
+            return 0
+        if size == 0:  # the last chunk, then the trailers
+            while self._rfile.readline(MAX_CHUNK_LINE).strip():
+                ...
+            self._done = True
+        return size
+
+
+class UploadSource(StreamSource):
+    """Raw mono s16le PCM uploaded to a session."""
+
+    def __init__(self, body: ChunkedBody, sample_rate: int) -> None:
+        super().__init__(body.read, sample_rate)
+
+
+class Session:
+    """
+    One client stream: its own recorder, voice activity detector, transcript
+    and exports. The server decodes its chunks on the shared model.
+    """
+
+    id: str
+    started: datetime
+    transcription: Transcriptions
+    exporters: list[StreamingExporter]
+    vad: VoiceActivityDetector | None
+    recorder: ChunkedRecorder | None  # once the audio upload starts
+    pending: list[tuple[PreparedChunk | np.ndarray, datetime, int, float]]
+    rows: list[dict]  # delivered rows, translated and exported
+    ended: bool  # the upload ended and every chunk is queued
+    finished: bool  # every row is delivered, the exports are closed
+
+    def __init__(
+        self,
+        config: FrozenConfig,
+        output_dir: Path,
+        translator: TranslatorProtocol | None,
+    ) -> None:
+        self.id = uuid4().hex[:12]
+        self.started = datetime.now()
+        self.transcription = Transcriptions(False, live_translator=translator)
+        self.exporters = [
+            exporter(output_dir / f"{self.id}{path.suffix}", self.started)
+            for path, exporter in configured_exporters(config)
+        ]
+        self.vad = (  # an upload is not calibrated, see ChunkedRecorder
+            VoiceActivityDetector(config.vad_threshold_db, config.energy_threshold)
+            if config.vad
+            else None
+        )
+        self.recorder = None
+        self.pending = []
+        self.rows = []
+        self.ended = False
+        self.finished = False
+        self.delivered = Condition()  # notified on every row and when finished
+
+    def deliver(self, phrase: Phrase | None) -> None:
+        """Publish an exported row to the listeners, None when finished."""
+        with self.delivered:
+            if phrase is None:
+                self.finished = True
+            else:
+                self.rows.append(phrase_to_json(phrase))
+            self.delivered.notify_all()
+
+    def rows_from(self, start: int) -> tuple[list[dict], bool]:
+        """Block until there are rows after `start` or the session finished."""
+        with self.delivered:
+            self.delivered.wait_for(lambda: len(self.rows) > start or self.finished)
+            return self.rows[start:], self.finished and len(self.rows) == start
+
+
+def phrase_to_json(phrase: Phrase) -> dict:
+    return {
+        "time": phrase.timestamp.isoformat(),
+        "text": phrase.text,
+        "translation": phrase.translated_text,
+        "duration": phrase.duration,
+    }
+
+
+class TranscriptionServer:
+    """
+    Load the model once and transcribe the audio of many local clients.
+    The ASR thread takes the oldest chunk of each session in turn, up to
+    `decode_batch_size` sessions per call, so a talkative client cannot
+    starve the others, and decodes them together. Rows are translated and
+    exported per session on the "deliver" worker.
+    """
+
+    sessions: dict[str, Session]
+    _turn: int  # the session to serve first in the next round
+
+    def __init__(self, config: FrozenConfig, address: str, output_dir: Path) -> None:
+        # a session streams in memory and has nothing to merge
+        self.config = config.mutated_copy(
+            in_memory_audio=True, streaming_interval_ms=0, store_merged_wav=None
+        )
+        self.output_dir = output_dir
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.asr = get_asr_backend(config)
+        self.translator = (
+            None if config.translator == "NONE" else get_translator(config)
+        )
+        self.sessions = {}
+        self._turn = 0
+        self._ready = Condition()  # notified when a session queues a chunk
+        self._running = True
+        self.deliver_worker = QueueWorker(
+            "deliver", self._deliver, config.pipeline_queue_size
+        )
+        host, _, port = address.rpartition(":")
+        self.http = ThreadingHTTPServer((host or "127.0.0.1", int(port)), _Handler)
+        self.http.daemon_threads = True
+        self.http.transcription_server = self  # type: ignore
+        self._asr_thread = Thread(target=self._decode_loop, name="asr", daemon=True)
+
+    @property
+    def address(self) -> str:
+        host, port = self.http.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> None:
+        self.deliver_worker.start()
+        self._asr_thread.start()
+        Thread(target=self.http.serve_forever, name="http", daemon=True).start()
+        LOG.info(f"Serving transcriptions at http://{self.address}/sessions")
+
+    def stop(self) -> None:
+        self.http.shutdown()
+        with self._ready:
+            self._running = False
+            self._ready.notify()
+        self._asr_thread.join()
+        self.deliver_worker.stop()
+        self.http.server_close()
+
+    def open_session(self) -> Session:
+        session = Session(self.config, self.output_dir, self.translator)
+        with self._ready:
+            self.sessions[session.id] = session
+            METRICS.set("sessions", len(self.sessions))
+        LOG.info(f"Session {session.id} opened")
+        return session
+
+    def record(self, session: Session, body: ChunkedBody, sample_rate: int) -> None:
+        """Queue the chunks of an upload until it ends, on the request thread."""
+        data_queue: WavTimeSizeQueue = Queue()
+        recorder = ChunkedRecorder(
+            data_queue, self.config, UploadSource(body, sample_rate)
+        )
+        recorder.start_preparing(lambda samples: self._prepare(session, samples))
+        session.recorder = recorder
+        while True:
+            try:
+                part = recorder.get_next_part()
+            except EOFError:
+                break
+            with self._ready:
+                session.pending.append(part)
+                self._ready.notify()
+        recorder.close_source()
+        with self._ready:
+            session.ended = True
+            self._ready.notify()
+
+    def _prepare(self, session: Session, samples: np.ndarray) -> PreparedChunk:
+        voiced = samples if session.vad is None else session.vad.trim(samples)
+        features = self.asr.features(voiced) if len(voiced) else None
+        return PreparedChunk(samples, voiced, features)
+
+    def _next_round(self) -> list[tuple[Session, PreparedChunk, datetime, int]]:
+        """The oldest chunk of each waiting session, the next ones first."""
+        with self._ready:
+            while self._running and not self._waiting_sessions():
+                self._ready.wait()
+            waiting = self._waiting_sessions()
+            order = list(self.sessions.values())
+            first = self._turn % len(order) if order else 0
+            rotated = order[first:] + order[:first]
+            chosen = [s for s in rotated if s in waiting]
+            chosen = chosen[: self.config.decode_batch_size]
+            if chosen:
+                self._turn = order.index(chosen[-1]) + 1
+            round_ = []
+            for session in chosen:
+                if not session.pending:  # ended, every chunk decoded
+                    self.sessions.pop(session.id)
+                    METRICS.set("sessions", len(self.sessions))
+                    self.deliver_worker.put((session, None))
+                    continue
+                chunk, time, size, _ = session.pending.pop(0)
+                if not isinstance(chunk, PreparedChunk):  # failed to prepare
+                    chunk = self._prepare(session, chunk)
+                round_.append((session, chunk, time, size))
+            METRICS.set("queue_depth", sum(len(s.pending) for s in order))
+            return round_
+
+    def _waiting_sessions(self) -> list[Session]:
+        """Sessions with a chunk to decode, or that ended and can be closed."""
+        return [s for s in self.sessions.values() if s.pending or s.ended]
+
+    def _decode_loop(self) -> None:
+        while self._running:
+            try:
+                self._decode_round()
+            except Exception:  # one failed round must not stall every session
+                LOG.exception("Failed to decode a round of chunks, skipping them")
+
+    def _decode_round(self) -> None:
+        round_ = self._next_round()
+        voiced = [part for part in round_ if len(part[1].voiced)]
+        started = perf_counter()
+        texts = iter(
+            self.asr.transcribe_batch(
+                [chunk.voiced for _, chunk, _, _ in voiced],
+                features=[chunk.features for _, chunk, _, _ in voiced],
+            )
+            if voiced
+            else []
+        )
+        if voiced:
+            METRICS.observe("asr_seconds", perf_counter() - started)
+            METRICS.inc("asr_calls_total")
+        for session, chunk, time, size in round_:
+            index = session.transcription.add_phrase(
+                time,
+                next(texts) if len(chunk.voiced) else "",
+                size,
+                len(chunk.samples) / WHISPER_SAMPLE_RATE,
+            )
+            if index is not None:
+                self.deliver_worker.put((session, index))
+
+    def _deliver(self, item: tuple[Session, int | None]) -> None:
+        session, index = item
+        if index is None:
+            for exporter in session.exporters:
+                exporter.close()
+            session.deliver(None)
+            LOG.info(f"Session {session.id} finished")
+            return
+        try:
+            session.transcription.live_translate(index)  # "" without a translator
+        finally:  # a failed translation still delivers the row, untranslated
+            phrase = session.transcription.phrases[index]
+            for exporter in session.exporters:
+                exporter.write(phrase)
+            session.deliver(phrase)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    POST /sessions                  open a session, answers its id
+    POST /sessions/<id>/audio       stream s16le PCM (?rate=16000), answers
+                                    the whole transcript once it is done
+    PUT  /sessions/<id>/audio       the same, as `curl -T` sends it
+    GET  /sessions/<id>/transcript  rows as JSON lines, as they are ready
+    """
+
+    server: ThreadingHTTPServer
+
+    @property
+    def transcription_server(self) -> TranscriptionServer:
+        return self.server.transcription_server  # type: ignore
+
+    def do_POST(self) -> None:
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        if parts == ["sessions"]:
+            session = self.transcription_server.open_session()
+            self._send_json(201, {"id": session.id})
+            return
+        self._upload(parts)
+
+    def do_PUT(self) -> None:
+        self._upload(urlsplit(self.path).path.strip("/").split("/"))
+
+    def _upload(self, parts: list[str]) -> None:
+        session = self._session(parts, "audio")
+        if session is None:
+            return
+        if session.recorder is not None:
+            self.send_error(409, "Audio was already uploaded to this session")
+            return
+        query = parse_qs(urlsplit(self.path).query)
+        rate = int(query.get("rate", [WHISPER_SAMPLE_RATE])[0])
+        body = ChunkedBody(self.rfile, self.headers)
+        self.transcription_server.record(session, body, rate)
+        rows, start = [], 0
+        while True:
+            new_rows, finished = session.rows_from(start)
+            rows += new_rows
+            start += len(new_rows)
+            if finished:
+                break
+        self._send_json(200, {"id": session.id, "rows": rows})
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        session = self._session(parts, "transcript")
+        if session is None:
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()  # HTTP/1.0: the body ends when the connection closes
+        start = 0
+        while True:
+            rows, finished = session.rows_from(start)
+            if finished:
+                return
+            for row in rows:
+                self.wfile.write(json.dumps(row).encode() + b"\n")
+            self.wfile.flush()
+            start += len(rows)
+
+    def _session(self, parts: list[str], action: str) -> Session | None:
+        sessions = self.transcription_server.sessions
+        if len(parts) != 3 or parts[0] != "sessions" or parts[2] != action:
+            self.send_error(404)
+        elif parts[1] not in sessions:
+            self.send_error(404, f"No open session {parts[1]}")
+        else:
+            return sessions[parts[1]]
+        return None
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        LOG.debug(format % args)
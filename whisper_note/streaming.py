@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import numpy as np
+
+from whisper_note.supportive_class import WHISPER_SAMPLE_RATE
+
+PROMPT_MAX_CHARS = 200  # whisper only looks at the last ~224 prompt tokens
+
+
+def common_prefix(a: list[str], b: list[str]) -> list[str]:
+    n = 0
+    while n < min(len(a), len(b)) and a[n] == b[n]:
+        n += 1
+    return a[:n]
+
+
+class StreamingHypothesis:
+    """
+    The growing audio of the phrase being spoken and its latest text.
+    Words that two consecutive hypotheses agree on are stable, the rest
+    may still change when more audio arrives.
+    """
+
+    chunks: list[np.ndarray]
+    started: datetime | None  # when the first chunk of the phrase arrived
+    ended: datetime | None  # when the last one arrived
+    captured: float  # perf_counter() when the last one was captured
+    size: int  # bytes received for the phrase, as in the pending queue
+    words: list[str]  # latest hypothesis
+    stable: list[str]
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.chunks, self.started, self.ended, self.size = [], None, None, 0
+        self.captured = 0.0
+        self.words, self.stable = [], []
+
+    def append(
+        self, samples: np.ndarray, time: datetime, size: int, captured: float
+    ) -> None:
+        self.chunks.append(samples)
+        self.started = self.started or time
+        self.ended, self.captured = time, captured
+        self.size += size
+
+    def audio(self) -> np.ndarray:
+        if len(self.chunks) > 1:  # concatenate once, keep the result
+            self.chunks = [np.concatenate(self.chunks)]
+        return self.chunks[0] if self.chunks else np.zeros(0, np.float32)
+
+    @property
+    def duration(self) -> float:
+        return sum(len(chunk) for chunk in self.chunks) / WHISPER_SAMPLE_RATE
+
+    def update(self, text: str) -> None:
+        words = text.split()
+        self.stable = common_prefix(self.words, words) if self.words else []
+        self.words = words
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.words)
+
+    @property
+    def unstable_text(self) -> str:
+        return " ".join(self.words[len(self.stable) :])
+
+    @property
+    def stable_text(self) -> str:
+        return " ".join(self.stable)
+
+
+def carry_prompt(prompt: str, finalized: str) -> str:
+    """The previous finalized text, used as the prompt of the next phrase."""
+    return (prompt + " " + finalized).strip()[-PROMPT_MAX_CHARS:]
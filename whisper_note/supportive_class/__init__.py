@@ -2,18 +2,47 @@
 
 # no internal dependencies
 from .enum_language import Language
-from .constants import WavTimeSizeQueue, LOG
+from .audio_ring import RingSlice, SharedAudioRing
+
+# depend on .audio_ring
+from .constants import AudioChunk, PreparedChunk, WavTimeSizeQueue, LOG
+from .audio_array import (
+    WHISPER_SAMPLE_RATE,
+    PCM16_WIDTH,
+    load_wav_float32,
+    pcm16_to_float32,
+)
 from .formatter import format_bytes_str, format_local_time, format_filename
+from .metrics import METRICS, serve_metrics
+
+# depend on .audio_array
+from .vad import VoiceActivityDetector
 
 # depend on .enum_language
 from .typed_config import EXAMPLE_CONFIG, FrozenConfig, InvalidConfigError
 
 # depend on .typed_config
-from .protocol_translator import DeepLTranslator, TranslatorProtocol, get_translator
+from .protocol_translator import (
+    CachedTranslator,
+    DeepLTranslator,
+    TranslatorProtocol,
+    get_translator,
+)
+
+from .protocol_asr import AsrBackendProtocol
 
 # DO NOT SORT IMPORTS! the order is important. If this line after all imports, it's wrong.
 
 # depend on .constants
-from .file_and_io import parse_path_config, merge_wav_files
+from .file_and_io import parse_path_config, StreamingWavWriter
+
+# depend on .file_and_io
+from .archive import (
+    ARCHIVE_SUFFIXES,
+    ArchiveSegment,
+    SegmentedArchive,
+    SegmentedArchiveWriter,
+    open_merged_audio,
+)
 
 # DO NOT SORT IMPORTS! the order is important.
@@ -0,0 +1,190 @@
+import json
+import os.path
+import zlib
+from bisect import bisect_left
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from threading import Lock
+from typing import NamedTuple
+
+import numpy as np
+
+from .audio_array import PCM16_WIDTH, WHISPER_SAMPLE_RATE, pcm16_to_float32
+from .constants import LOG
+from .file_and_io import StreamingWavWriter
+from .typed_config import InvalidConfigError
+
+# the file of each `archive_format`, next to an ".index.jsonl" for the segments
+ARCHIVE_SUFFIXES = {"WAV": ".wav", "ZLIB": ".pcmz", "FLAC": ".flacs"}
+# overlaps shorter than this are rounding, not audio of the phrase
+SEGMENT_TOLERANCE_SECOND = 0.01
+
+
+class ArchiveSegment(NamedTuple):
+    """One recorded chunk, stored on its own: decodable without the others."""
+
+    chunk: int  # the chunk id, in recording order
+    time: datetime  # end of its recording, the last chunk's is the row's time
+    sample_offset: int  # from the start of the session
+    samples: int
+    byte_offset: int  # in the archive file
+    byte_length: int
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_suffix(".index.jsonl")
+
+
+def _encode(codec: str, pcm: bytes, sample_rate: int) -> bytes:
+    samples = np.frombuffer(pcm, np.int16)
+    if codec == "FLAC":
+        import soundfile
+
+        flac = BytesIO()
+        soundfile.write(flac, samples, sample_rate, format="FLAC", subtype="PCM_16")
+        return flac.getvalue()
+    # speech changes slowly: the deltas are small, and their high bytes,
+    # grouped after all the low bytes, are mostly 0x00 and 0xff
+    deltas = np.diff(samples, prepend=np.int16(0))  # wraps around, reversibly
+    planes = deltas.view(np.uint8).reshape(-1, PCM16_WIDTH).T
+    return zlib.compress(planes.tobytes())
+
+
+def _decode(codec: str, data: bytes) -> bytes:
+    if codec == "FLAC":
+        import soundfile
+
+        samples, _ = soundfile.read(BytesIO(data), dtype="int16")
+        return samples.tobytes()
+    planes = np.frombuffer(zlib.decompress(data), np.uint8)
+    deltas = planes.reshape(PCM16_WIDTH, -1).T.copy().view(np.int16).ravel()
+    return np.cumsum(deltas, dtype=np.int16).tobytes()
+
+
+class SegmentedArchiveWriter:
+    """
+    Append each recorded chunk to a losslessly compressed archive as an
+    independent segment, and its place to a sidecar index, so any phrase
+    can be replayed or transcribed again by seeking straight to it. Both
+    files are flushed per chunk, a crash loses at most the last one.
+    """
+
+    path: Path
+    codec: str  # "ZLIB" or "FLAC"
+    sample_rate: int
+    sample_width: int
+
+    def __init__(
+        self, path: Path, sample_rate: int, sample_width: int, codec: str
+    ) -> None:
+        assert (
+            not path.exists() or os.path.getsize(path) == 0
+        ), f"{path} exists and is not empty, cannot write it"
+        if sample_width != PCM16_WIDTH:
+            raise InvalidConfigError(f"archive_format {codec} stores 16-bit audio")
+        self.path, self.codec = path, codec
+        self.sample_rate, self.sample_width = sample_rate, sample_width
+        self._file = open(path, "wb")
+        self._index = open(_index_path(path), "w", encoding="utf-8")
+        header = {"codec": codec, "sample_rate": sample_rate, "channels": 1}
+        self._index.write(json.dumps(header | {"sample_width": sample_width}) + "\n")
+        self._chunks = self._samples = 0
+        self._lock = Lock()  # written by the recorder thread, closed by another
+
+    def write(self, pcm: bytes, time: datetime | None = None) -> None:
+        data = _encode(self.codec, pcm, self.sample_rate)
+        with self._lock:
+            if self._file.closed:
+                LOG.warning(f"Dropped {len(pcm)} bytes recorded after closing")
+                return
+            entry = {
+                "chunk": self._chunks,
+                "time": (time or datetime.now()).isoformat(),
+                "sample_offset": self._samples,
+                "samples": len(pcm) // self.sample_width,
+                "byte_offset": self._file.tell(),
+                "byte_length": len(data),
+            }
+            self._file.write(data)
+            self._file.flush()  # before the index points at it
+            self._index.write(json.dumps(entry) + "\n")
+            self._index.flush()
+            self._chunks += 1
+            self._samples += entry["samples"]
+
+    def close(self) -> Path:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                self._index.close()
+        return self.path
+
+
+class SegmentedArchive:
+    """Read an archive written by SegmentedArchiveWriter, one segment at a time."""
+
+    path: Path
+    codec: str
+    sample_rate: int
+    sample_width: int
+    segments: list[ArchiveSegment]
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with open(_index_path(path), encoding="utf-8") as index:
+            header = json.loads(index.readline())
+            self.segments = []
+            for line in index:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:  # cut by a crash while writing
+                    break
+                entry["time"] = datetime.fromisoformat(entry["time"])
+                self.segments.append(ArchiveSegment(**entry))
+        self.codec = header["codec"]
+        self.sample_rate = header["sample_rate"]
+        self.sample_width = header["sample_width"]
+        self._times = [segment.time.timestamp() for segment in self.segments]
+
+    def segments_between(self, start: datetime, end: datetime) -> list[ArchiveSegment]:
+        """
+        The chunks recorded between `start` and `end`, e.g. a transcript row
+        from `timestamp - duration` to `timestamp`: a streamed row spans
+        several chunks.
+        """
+        start_second = start.timestamp() + SEGMENT_TOLERANCE_SECOND
+        end_second = end.timestamp() - SEGMENT_TOLERANCE_SECOND
+        found = []
+        for i in range(bisect_left(self._times, start_second), len(self.segments)):
+            segment = self.segments[i]
+            if self._times[i] - segment.samples / self.sample_rate >= end_second:
+                break
+            found.append(segment)
+        return found
+
+    def read_pcm(self, segment: ArchiveSegment) -> bytes:
+        """The segment in the source format, without decoding any other."""
+        with open(self.path, "rb") as archive:
+            archive.seek(segment.byte_offset)
+            return _decode(self.codec, archive.read(segment.byte_length))
+
+    def read_float32(self, segments: list[ArchiveSegment] | None = None) -> np.ndarray:
+        """16 kHz float32 samples of some segments, or of the whole session."""
+        segments = self.segments if segments is None else segments
+        pcm = b"".join(self.read_pcm(s) for s in segments)
+        if self.sample_rate != WHISPER_SAMPLE_RATE:
+            import speech_recognition as sr
+
+            audio = sr.AudioData(pcm, self.sample_rate, self.sample_width)
+            pcm = audio.get_raw_data(WHISPER_SAMPLE_RATE, PCM16_WIDTH)
+        return pcm16_to_float32(pcm)
+
+
+def open_merged_audio(
+    path: Path, sample_rate: int, sample_width: int, archive_format: str
+) -> StreamingWavWriter | SegmentedArchiveWriter:
+    """The writer of `store_merged_wav` in the configured `archive_format`."""
+    if archive_format == "WAV":
+        return StreamingWavWriter(path, sample_rate, sample_width)
+    return SegmentedArchiveWriter(path, sample_rate, sample_width, archive_format)
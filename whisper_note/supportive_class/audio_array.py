@@ -0,0 +1,25 @@
+from pathlib import Path
+import wave
+
+import numpy as np
+
+WHISPER_SAMPLE_RATE = 16000  # same as whisper.audio.SAMPLE_RATE, without torch
+PCM16_WIDTH = 2  # bytes per sample of signed 16-bit PCM
+PCM16_SCALE = 32768.0
+
+
+def pcm16_to_float32(raw: bytes) -> np.ndarray:
+    """
+    Convert mono little-endian signed 16-bit PCM to float32 samples in [-1, 1),
+    the same way `whisper.load_audio` does after its ffmpeg decoding.
+    """
+    return np.frombuffer(raw, np.int16).astype(np.float32) / PCM16_SCALE
+
+
+def load_wav_float32(path: Path) -> np.ndarray:
+    """Read a 16 kHz mono 16-bit wav without ffmpeg, else raise ValueError."""
+    with wave.open(str(path)) as wav:
+        wav_format = (wav.getframerate(), wav.getsampwidth(), wav.getnchannels())
+        if wav_format != (WHISPER_SAMPLE_RATE, PCM16_WIDTH, 1):
+            raise ValueError(f"{path} is not 16 kHz mono 16-bit: {wav_format=}")
+        return pcm16_to_float32(wav.readframes(wav.getnframes()))
@@ -0,0 +1,79 @@
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+from typing import NamedTuple
+
+import numpy as np
+
+_ITEM_SIZE = np.dtype(np.float32).itemsize
+
+
+class RingSlice(NamedTuple):
+    """Samples in a SharedAudioRing, all another process needs to find them."""
+
+    start: int  # samples written to the ring before these
+    length: int
+
+
+class SharedAudioRing:
+    """
+    16 kHz float32 samples in a `multiprocessing.shared_memory` block, so
+    other processes read the audio in place instead of receiving a pickled
+    copy. The recorder writes, and never overwrites samples that are not
+    `release`d yet: `write` answers None when the ring is full.
+    Attach to an existing ring in another process with its `name`.
+    """
+
+    capacity: int  # in samples
+    written: int  # samples ever written, the start of the next slice
+    released: int  # samples before this are decoded and can be overwritten
+
+    def __init__(self, capacity: int, name: str | None = None) -> None:
+        self.capacity = capacity
+        self._memory = SharedMemory(
+            name, create=name is None, size=capacity * _ITEM_SIZE
+        )
+        self.written = self.released = 0
+        self._lock = Lock()
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def write(self, samples: np.ndarray) -> RingSlice | None:
+        with self._lock:
+            if self.written + len(samples) - self.released > self.capacity:
+                return None
+            ring_slice = RingSlice(self.written, len(samples))
+            self.written += len(samples)
+        offset = ring_slice.start % self.capacity
+        first = min(len(samples), self.capacity - offset)
+        self._view(offset, first)[:] = samples[:first]
+        self._view(0, len(samples) - first)[:] = samples[first:]  # wrapped around
+        return ring_slice
+
+    def read(self, ring_slice: RingSlice) -> np.ndarray:
+        """The samples in place, or a copy when they wrap around the end."""
+        offset = ring_slice.start % self.capacity
+        first = min(ring_slice.length, self.capacity - offset)
+        if first == ring_slice.length:
+            return self._view(offset, first)
+        return np.concatenate(
+            [self._view(offset, first), self._view(0, ring_slice.length - first)]
+        )
+
+    def release(self, end: int) -> None:
+        """Samples before `end` are decoded, the recorder may overwrite them."""
+        with self._lock:
+            self.released = max(self.released, end)
+
+    def close(self, unlink: bool = False) -> None:
+        """Detach, and free the memory with `unlink`, in the creating process."""
+        self._memory.close()
+        if unlink:
+            self._memory.unlink()
+
+    def _view(self, offset: int, length: int) -> np.ndarray:
+        # a fresh view per call: a view kept alive would block `close`
+        buffer = self._memory.buf
+        assert buffer is not None, "The ring is closed"
+        return np.frombuffer(buffer, np.float32, length, offset * _ITEM_SIZE)
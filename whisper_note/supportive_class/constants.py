@@ -2,12 +2,33 @@ from datetime import datetime
 import os
 import logging
 from time import sleep
+from typing import Any, NamedTuple
 from rich.logging import RichHandler
 
 from queue import Queue
 from tempfile import _TemporaryFileWrapper
 
-WavTimeSizeQueue = Queue[tuple[_TemporaryFileWrapper, datetime, int]]
+import numpy as np
+
+from .audio_ring import RingSlice
+
+
+class PreparedChunk(NamedTuple):
+    """In-memory samples made ready to decode on the recorder side."""
+
+    samples: np.ndarray  # as recorded
+    voiced: np.ndarray  # without the leading and trailing silence
+    features: Any  # the model input of `voiced`, None if not precomputed
+
+
+# a temp .wav file for whisper to read, or float32 samples with `in_memory_audio`,
+# in the shared ring with `inference_workers`
+AudioChunk = _TemporaryFileWrapper | np.ndarray | PreparedChunk | RingSlice
+# a chunk, when its recording ended by the source's clock, its size in bytes and
+# perf_counter() when it was captured, the latency in wall time, even in a replay
+WavTimeSizeQueue = Queue[
+    tuple[AudioChunk, datetime, int, float] | None
+]  # None: source ended
 
 logging.basicConfig(
     level="INFO",
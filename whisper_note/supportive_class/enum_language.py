@@ -1,7 +1,8 @@
 from enum import Enum
-from typing import cast
+from typing import TYPE_CHECKING, cast
 
-import deepl
+if TYPE_CHECKING:
+    import deepl  # imported on first use, it takes a good part of startup
 
 
 class Language(Enum):
@@ -22,7 +23,9 @@ class Language(Enum):
             Language.ZH: Language.CN,
         }.get(self, self)
 
-    def to_deepl_language(self) -> deepl.Language:
+    def to_deepl_language(self) -> "deepl.Language":
+        import deepl
+
         return cast(
             deepl.Language,
             {
@@ -1,23 +1,12 @@
 from datetime import datetime
-from io import BufferedWriter
 import os.path
 from pathlib import Path
-from typing import Protocol, Sequence
+from threading import Lock
+import wave
 
 from whisper_note.supportive_class import format_filename, format_local_time, LOG
 
 
-WAV_HEADER_SIZE = 44  # suppose it's always 44 bytes
-
-
-class SupportSeekAndRead(Protocol):
-    def seek(self, offset: int, whence: int = 0) -> int:
-        ...
-
-    def read(self, n: int = -1) -> bytes:
-        ...
-
-
 def parse_path_config(path_config: str) -> Path | None:
     """
     Return an absolute path to the new file, without extension.
@@ -44,29 +33,40 @@ def parse_path_config(path_config: str) -> Path | None:
         return path
 
 
-# #TEST_MISSING
-def merge_wav_files(wav_files: Sequence[SupportSeekAndRead], output: BufferedWriter):
-    if len(wav_files) == 0:
-        LOG.warning("No wav files to merge")
-        return
-    assert output.writable(), f"{output.name} is not writable"
-    assert os.path.exists(output.name), f"{output.name} not found"
-    assert os.path.getsize(output.name) == 0, f"{output.name} is not empty"
+class StreamingWavWriter:
+    """
+    Append PCM to one wav file as chunks are recorded. The header is patched
+    after every chunk, so the file stays valid even if the session crashes.
+    """
+
+    path: Path
+    sample_rate: int
+    sample_width: int
+
+    def __init__(self, path: Path, sample_rate: int, sample_width: int) -> None:
+        assert (
+            not path.exists() or os.path.getsize(path) == 0
+        ), f"{path} exists and is not empty, cannot write it"
+        self.path, self.sample_rate, self.sample_width = path, sample_rate, sample_width
+        self._file = open(path, "wb")
+        self._wav = wave.open(self._file, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(sample_width)
+        self._wav.setframerate(sample_rate)
+        self._lock = Lock()  # written by the recorder thread, closed by another
 
-    # the 44 bytes header, line numbers end on same digit -> 11 lines
-    output.write(b"RIFF")
-    output.write(b"\x00\x00\x00\x00")
-    output.write(b"WAVE")
-    output.write(b"fmt ")
-    output.write(b"\x10\x00\x00\x00")
-    output.write(b"\x01\x00\x01\x00")
-    output.write(b"\x80\x3e\x00\x00")
-    output.write(b"\x00\x7d\x00\x00")
-    output.write(b"\x02\x00\x10\x00")
-    output.write(b"data")
-    output.write(b"\x00\x00\x00\x00")
+    def write(self, pcm: bytes, time: datetime | None = None) -> None:
+        """`time` is only indexed by the segmented archives."""
+        with self._lock:
+            if self._file.closed:
+                LOG.warning(f"Dropped {len(pcm)} bytes recorded after closing")
+                return
+            self._wav.writeframes(pcm)  # also patches the RIFF and data sizes
+            self._file.flush()
 
-    for wav in wav_files:
-        wav.seek(0)
-        wav.seek(WAV_HEADER_SIZE)
-        output.write(wav.read())
+    def close(self) -> Path:
+        with self._lock:
+            if not self._file.closed:
+                self._wav.close()
+                self._file.close()
+        return self.path
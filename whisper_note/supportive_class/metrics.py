@@ -0,0 +1,153 @@
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Sequence
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+RATIO_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 5)
+METRIC_PREFIX = "whisper_note_"
+
+
+class Histogram:
+    """Cumulative buckets as Prometheus wants them, plus the max for summaries."""
+
+    __slots__ = ("help", "bounds", "counts", "sum", "count", "max")
+
+    def __init__(self, help: str, bounds: Sequence[float]) -> None:
+        self.help = help
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # the last one is +Inf
+        self.sum, self.count, self.max = 0.0, 0, 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the quantile, at most the max."""
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """
+    Thread-safe registry of the pipeline histograms, gauges and counters,
+    read as Prometheus text by the metrics endpoint and summarized at stop.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.histograms: dict[str, Histogram] = {}
+        self.gauges: dict[str, tuple[str, float]] = {}
+        self.counters: dict[str, tuple[str, float]] = {}
+
+    def histogram(
+        self, name: str, help: str, bounds: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        with self._lock:
+            self.histograms.setdefault(name, Histogram(help, bounds))
+
+    def counter(self, name: str, help: str) -> None:
+        with self._lock:
+            self.counters.setdefault(name, (help, 0.0))
+
+    def gauge(self, name: str, help: str) -> None:
+        with self._lock:
+            self.gauges.setdefault(name, (help, 0.0))
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self.histograms[name].observe(value)
+
+    def inc(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            help, value = self.counters[name]
+            self.counters[name] = (help, value + amount)
+
+    def set(self, name: str, value: float) -> None:
+        with self._lock:
+            self.gauges[name] = (self.gauges[name][0], value)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for kind, values in (("counter", self.counters), ("gauge", self.gauges)):
+                for name, (help, value) in values.items():
+                    full = METRIC_PREFIX + name
+                    lines += [f"# HELP {full} {help}", f"# TYPE {full} {kind}"]
+                    lines.append(f"{full} {value:g}")
+            for name, h in self.histograms.items():
+                full = METRIC_PREFIX + name
+                lines += [f"# HELP {full} {h.help}", f"# TYPE {full} histogram"]
+                cumulative = 0
+                for bound, count in zip((*h.bounds, "+Inf"), h.counts):
+                    cumulative += count
+                    lines.append(f'{full}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{full}_sum {h.sum:g}")
+                lines.append(f"{full}_count {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        with self._lock:
+            rows = [
+                f"{name}: n={h.count} mean={h.sum / h.count:.3f} "
+                f"p50={h.quantile(0.5):.3f} p95={h.quantile(0.95):.3f} "
+                f"max={h.max:.3f}"
+                for name, h in self.histograms.items()
+                if h.count
+            ]
+            rows += [f"{name}: {value:g}" for name, (_, value) in self.counters.items()]
+        return "\n".join(rows)
+
+
+METRICS = Metrics()  # one pipeline per process, like LOG
+METRICS.histogram("capture_seconds", "Recording end to queued, format conversion.")
+METRICS.histogram("features_seconds", "Trimming and model input of one chunk.")
+METRICS.histogram("queue_wait_seconds", "Recording end to speech recognition start.")
+METRICS.histogram("asr_seconds", "Speech recognition of one chunk or batch.")
+METRICS.histogram(
+    "asr_real_time_factor", "Recognition time per second of audio.", RATIO_BUCKETS
+)
+METRICS.histogram("translate_seconds", "One translator request.")
+METRICS.histogram("translation_lag_seconds", "Recognized to translated, per row.")
+METRICS.histogram("render_seconds", "Building one frame of the live table.")
+METRICS.histogram("end_to_end_seconds", "Recording end to exported, per row.")
+METRICS.counter("asr_calls_total", "Speech recognition calls, a batch is one.")
+METRICS.counter(
+    "audio_seconds_total", "Seconds of audio recognized, re-decodes included."
+)
+METRICS.gauge("queue_depth", "Chunks waiting for speech recognition.")
+METRICS.gauge("translate_queue_depth", "Rows waiting for translation.")
+METRICS.gauge("sessions", "Open sessions of the transcription server.")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics: Metrics = METRICS
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.metrics.to_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        ...  # scraped every few seconds, do not flood the console
+
+
+def serve_metrics(address: str) -> ThreadingHTTPServer:
+    """Serve METRICS at http://host:port/metrics from a daemon thread."""
+    host, _, port = address.rpartition(":")
+    server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), _MetricsHandler)
+    Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
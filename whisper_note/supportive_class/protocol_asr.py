@@ -0,0 +1,48 @@
+from typing import TYPE_CHECKING, Any, Protocol
+
+from whisper_note.supportive_class import FrozenConfig
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class AsrBackendProtocol(Protocol):
+    """A speech recognition engine, the only thing Transcriber talks to."""
+
+    model: Any  # the engine's model object, loaded in __init__
+    config: FrozenConfig
+
+    def __init__(self, config: FrozenConfig):
+        ...
+
+    def transcribe(
+        self, audio: "np.ndarray | str", prompt: str = "", fast: bool = False
+    ) -> str:
+        """
+        Text of 16 kHz float32 samples, or of an audio file path. The prompt
+        is text said just before, to carry context over between chunks.
+        `fast` decodes once, greedily, for when inference falls behind.
+        """
+        ...
+
+    def transcribe_batch(
+        self,
+        audios: "list[np.ndarray]",
+        prompt: str = "",
+        fast: bool = False,
+        features: list[Any] | None = None,
+    ) -> list[str]:
+        """
+        Text of each of several chunks, decoded together where supported.
+        `features` are the chunks' `features`, precomputed or None.
+        """
+        ...
+
+    def features(self, audio: "np.ndarray") -> Any:
+        """
+        The model input of 16 kHz samples, e.g. a log-mel spectrogram, safe
+        to compute on another thread while the model decodes. In host memory,
+        as many chunks can be queued: `transcribe_batch` moves it to the
+        model's device. None where the engine only takes samples.
+        """
+        ...
@@ -1,13 +1,19 @@
 import os
-from typing import Any, Protocol, Union, final
-import deepl
+import sqlite3
+from collections import OrderedDict
+from threading import Lock
+from time import time
+from typing import TYPE_CHECKING, Any, Protocol, Sequence, Union, cast, final
+
+if TYPE_CHECKING:
+    import deepl  # imported when a translator is created
 
 from whisper_note.supportive_class import FrozenConfig
 
 
 class TranslatorProtocol(Protocol):
     # not saving API key because it's safer and we don't need it later.
-    translator: Union[deepl.Translator, Any]  # TODO:LTR Add other translators
+    translator: Union["deepl.Translator", Any]  # TODO:LTR Add other translators
     config: FrozenConfig
 
     @final
@@ -27,17 +33,28 @@ class TranslatorProtocol(Protocol):
     def translate(self, text: str) -> str:
         ...
 
+    def translate_batch(self, texts: Sequence[str]) -> list[str]:
+        """Translate all texts at once, keeping the order."""
+        ...
+
 
 class DeepLTranslator(TranslatorProtocol):
-    translator: deepl.Translator
+    translator: "deepl.Translator"
     config: FrozenConfig
 
     def __init__(
         self,
         config: FrozenConfig,
     ):
+        import deepl
+
         self.config = config
-        self.translator = deepl.Translator(self._get_api_key())
+        # The SDK retries 429 and 5xx with exponential backoff, this is global.
+        deepl.http_client.max_network_retries = config.translator_max_retries
+        # one translator holds one pooled HTTP session for the whole meeting
+        self.translator = deepl.Translator(
+            self._get_api_key(), server_url=config.translator_server_url or None
+        )
 
     def translate(self, text: str) -> str:
         if text == "":
@@ -52,6 +69,153 @@ class DeepLTranslator(TranslatorProtocol):
             raise ValueError(f"DeepL returned a list of translations: {result=}")
         return result.text
 
+    def translate_batch(self, texts: Sequence[str]) -> list[str]:
+        """One request for all texts, DeepL accepts a list of texts."""
+        non_empty = [text for text in texts if text != ""]
+        if not non_empty:
+            return ["" for _ in texts]
+        target, source = self.config.target_lang, self.config.source_lang
+        results = self.translator.translate_text(
+            non_empty,
+            target_lang=target.to_deepl_language(),
+            source_lang=source and source.to_deepl_language(),
+        )
+        if not isinstance(results, list) or len(results) != len(non_empty):
+            raise ValueError(f"DeepL returned unexpected translations: {results=}")
+        translated = iter(result.text for result in results)
+        return [next(translated) if text != "" else "" for text in texts]
+
+
+class CachedTranslator(TranslatorProtocol):
+    """
+    Wrap any translator with an in-memory LRU and an optional SQLite store
+    that persists across sessions, keyed on text + source + target language.
+    Only the misses reach the wrapped translator, in one batch, and each
+    batch is written to the store in one transaction.
+    """
+
+    translator: TranslatorProtocol
+    config: FrozenConfig
+    memory: OrderedDict[tuple[str, str, str], str]
+    db: sqlite3.Connection | None
+    rows: int  # in the store, evicted only once over the limit
+    hits: int
+    misses: int
+
+    def __init__(self, translator: TranslatorProtocol, config: FrozenConfig):
+        self.translator = translator
+        self.config = config
+        self.memory = OrderedDict()
+        self.hits, self.misses = 0, 0
+        self._lock = Lock()
+        self.db = None
+        self.rows = 0
+        if config.translation_cache:
+            self.db = sqlite3.connect(config.translation_cache, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS translation ("
+                " text TEXT, source TEXT, target TEXT, translated TEXT, used_at REAL,"
+                " PRIMARY KEY (text, source, target))"
+            )
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS translation_used_at"
+                " ON translation (used_at)"
+            )
+            self.db.commit()
+            (self.rows,) = self.db.execute(
+                "SELECT COUNT(*) FROM translation"
+            ).fetchone()
+
+    def _key(self, text: str) -> tuple[str, str, str]:
+        source, target = self.config.source_lang, self.config.target_lang
+        return (text, source.value if source else "", target.value)
+
+    def translate(self, text: str) -> str:
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts: Sequence[str]) -> list[str]:
+        with self._lock:  # keeps the counters and the LRU order consistent
+            used: list[tuple[str, str, str]] = []  # found in the store
+            found = {key: self._lookup(key, used) for key in map(self._key, texts)}
+            missing = [key for key, value in found.items() if value is None]
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+            stored: list[tuple[str, str, str, str]] = []  # translated now
+            if missing:
+                translated = self.translator.translate_batch([k[0] for k in missing])
+                for key, value in zip(missing, translated):
+                    found[key] = value
+                    self._remember(key, value)
+                    stored.append((*key, value))
+            self._persist(used, stored)
+            return [cast(str, found[self._key(text)]) for text in texts]
+
+    def _lookup(
+        self, key: tuple[str, str, str], used: list[tuple[str, str, str]]
+    ) -> str | None:
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+        if self.db is None:
+            return None
+        row = self.db.execute(
+            "SELECT translated FROM translation"
+            " WHERE text = ? AND source = ? AND target = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            return None
+        used.append(key)
+        self._remember(key, row[0])
+        return row[0]
+
+    def _persist(
+        self,
+        used: list[tuple[str, str, str]],
+        stored: list[tuple[str, str, str, str]],
+    ) -> None:
+        """Touch the rows read and insert the new ones, one commit per batch."""
+        if self.db is None or not (used or stored):
+            return
+        now = time()
+        self.db.executemany(
+            "UPDATE translation SET used_at = ?"
+            " WHERE text = ? AND source = ? AND target = ?",
+            [(now, *key) for key in used],
+        )
+        self.db.executemany(
+            "INSERT OR REPLACE INTO translation VALUES (?, ?, ?, ?, ?)",
+            [(*row, now) for row in stored],
+        )
+        self.rows += len(stored)  # misses, so not in the store yet
+        excess = self.rows - self.config.translation_cache_max_rows
+        if excess > 0:  # the least recently used, through the used_at index
+            self.db.execute(
+                "DELETE FROM translation WHERE rowid IN (SELECT rowid FROM"
+                " translation ORDER BY used_at LIMIT ?)",
+                (excess,),
+            )
+            self.rows -= excess
+        self.db.commit()
+
+    def _remember(self, key: tuple[str, str, str], value: str) -> None:
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.config.translation_cache_memory_size:
+            self.memory.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        """Hit / miss counters, every hit is a saved translator call."""
+        return {"hits": self.hits, "misses": self.misses, "memory": len(self.memory)}
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
 
 def get_translator(config: FrozenConfig) -> TranslatorProtocol | None:
-    return DeepLTranslator(config)
+    translator = DeepLTranslator(config)
+    if config.translation_cache_memory_size <= 0 and not config.translation_cache:
+        return translator
+    return CachedTranslator(translator, config)
@@ -8,7 +8,7 @@ class InvalidConfigError(ValueError):
 
 
 # I don't know how to get a data
-ConfigValue = str | Language | int | None
+ConfigValue = str | Language | int | Path | None
 
 
 @final
@@ -16,16 +16,48 @@ class FrozenConfig(NamedTuple):
     dot_env_path: str
     translator: str
     translator_env_key: str
+    translator_server_url: str
+    translator_max_retries: int
+    translate_batch_size: int
+    translate_batch_ms: int
+    translation_cache: Path | None
+    translation_cache_memory_size: int
+    translation_cache_max_rows: int
+    asr_backend: str
     model: str
+    quantize_int8: bool
+    fallback_model: str  # "" for none
     source_lang: Language | None  # both translator and whisper support None
     target_lang: Language
+    audio_source: str
+    audio_source_path: str  # wav file, or socket address
+    audio_source_realtime: bool
+    audio_source_sample_rate: int  # of raw PCM
     linux_microphone: str | None
     energy_threshold: int  # TODO: name it better
     phrase_max_second: int
+    in_memory_audio: bool
+    vad: bool
+    vad_threshold_db: int
+    pipeline_queue_size: int
+    decode_batch_size: int  # 1 decodes one chunk at a time
+    inference_workers: int  # 0 decodes on the main process
+    backlog_max_chunks: int
+    backlog_max_second: int  # 0 never degrades
+    streaming_interval_ms: int  # 0 transcribes whole phrases only
     summarizer: str
     store_merged_wav: Path | None
+    archive_format: str  # WAV, ZLIB or FLAC
     merged_transcription: Path | None
+    final_pass_window_second: int
+    final_pass_workers: int
     live_history_html: Path | None
+    live_history_md: Path | None
+    live_history_srt: Path | None
+    live_history_vtt: Path | None
+    live_table_rows: int
+    live_refresh_fps: int
+    metrics_address: str  # "" for no endpoint
 
     def mutated_copy(self: "FrozenConfig", **kwargs: ConfigValue) -> "FrozenConfig":
         copy = FrozenConfig(**{**self._asdict(), **kwargs})  # type: ignore
@@ -37,16 +69,48 @@ class FrozenConfig(NamedTuple):
             "dot_env_path": str,
             "translator": str,
             "translator_env_key": str,
+            "translator_server_url": str,
+            "translator_max_retries": int,
+            "translate_batch_size": int,
+            "translate_batch_ms": int,
+            "translation_cache": Path | None,
+            "translation_cache_memory_size": int,
+            "translation_cache_max_rows": int,
+            "asr_backend": str,
             "model": str,
+            "quantize_int8": bool,
+            "fallback_model": str,
             "source_lang": Language | None,
             "target_lang": Language,
+            "audio_source": str,
+            "audio_source_path": str,
+            "audio_source_realtime": bool,
+            "audio_source_sample_rate": int,
             "linux_microphone": str | None,
             "energy_threshold": int,
             "phrase_max_second": int,
+            "in_memory_audio": bool,
+            "vad": bool,
+            "vad_threshold_db": int,
+            "pipeline_queue_size": int,
+            "decode_batch_size": int,
+            "inference_workers": int,
+            "backlog_max_chunks": int,
+            "backlog_max_second": int,
+            "streaming_interval_ms": int,
             "summarizer": str,
             "store_merged_wav": Path | None,
+            "archive_format": str,
             "merged_transcription": Path | None,
+            "final_pass_window_second": int,
+            "final_pass_workers": int,
             "live_history_html": Path | None,
+            "live_history_md": Path | None,
+            "live_history_srt": Path | None,
+            "live_history_vtt": Path | None,
+            "live_table_rows": int,
+            "live_refresh_fps": int,
+            "metrics_address": str,
         }
         for k, v in self._asdict().items():
             if isinstance(v, expected_type[k]):
@@ -58,14 +122,46 @@ EXAMPLE_CONFIG = FrozenConfig(
     dot_env_path="",
     translator="DEEPL",
     translator_env_key="DEEPL_API_KEY",
+    translator_server_url="",
+    translator_max_retries=5,
+    translate_batch_size=16,
+    translate_batch_ms=200,
+    translation_cache=None,
+    translation_cache_memory_size=1024,
+    translation_cache_max_rows=100000,
+    asr_backend="WHISPER",
     model="small",
+    quantize_int8=False,
+    fallback_model="",
     source_lang=Language.EN,
     target_lang=Language.CN,
+    audio_source="MICROPHONE",
+    audio_source_path="",
+    audio_source_realtime=True,
+    audio_source_sample_rate=16000,
     linux_microphone=None,
     energy_threshold=805000,
     phrase_max_second=3,
+    in_memory_audio=True,
+    vad=True,
+    vad_threshold_db=-45,
+    pipeline_queue_size=32,
+    decode_batch_size=4,
+    inference_workers=0,
+    backlog_max_chunks=4,
+    backlog_max_second=10,
+    streaming_interval_ms=0,
     summarizer="NONE",
     store_merged_wav=None,
+    archive_format="WAV",
     merged_transcription=None,
+    final_pass_window_second=30,
+    final_pass_workers=1,
     live_history_html=None,
+    live_history_md=None,
+    live_history_srt=None,
+    live_history_vtt=None,
+    live_table_rows=50,
+    live_refresh_fps=4,
+    metrics_address="",
 )
@@ -0,0 +1,112 @@
+import numpy as np
+
+from .audio_array import WHISPER_SAMPLE_RATE
+
+VAD_FRAME_SECOND = 0.03  # 480 samples, the usual VAD frame
+VAD_PAD_SECOND = 0.2  # kept around speech, for soft word onsets and endings
+VAD_MIN_SPEECH_SECOND = 0.1  # shorter bursts are clicks and bumps
+VAD_NOISE_MARGIN_DB = 10.0  # speech is this much louder than the noise floor
+VAD_MAX_ZERO_CROSSING = 0.4  # crossings per sample, higher is hiss, not voice
+_FRAME = round(VAD_FRAME_SECOND * WHISPER_SAMPLE_RATE)
+
+
+def frame_db_and_zcr(samples: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """RMS level in dBFS and zero-crossing rate of each full frame."""
+    n_frames = len(samples) // _FRAME
+    frames = samples[: n_frames * _FRAME].reshape(n_frames, _FRAME)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    db = 20 * np.log10(np.maximum(rms, 1e-10))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / _FRAME
+    return db, zcr
+
+
+def energy_to_db(energy: float) -> float:
+    """dBFS of a 16-bit RMS energy, as the recognizer's `energy_threshold`."""
+    return 20 * float(np.log10(max(energy, 1e-10) / 32768))
+
+
+class VoiceActivityDetector:
+    """
+    Energy and zero-crossing VAD on 16 kHz float32 samples. The noise floor
+    follows the frames the recorder hears as silence, below its
+    `energy_threshold`, and stays below `threshold_db`: the recorder only
+    hands over speech, so a floor learnt from whole chunks would climb to
+    the speech level. A speech frame must be louder than both
+    `threshold_db` and the floor plus a margin. Counts the audio it saves.
+    """
+
+    threshold_db: float
+    quiet_db: float  # frames below this are silence to the recorder too
+    noise_floor_db: float
+    chunks: int
+    dropped_chunks: int
+    total_second: float
+    skipped_second: float  # dropped or trimmed, never decoded
+
+    def __init__(
+        self, threshold_db: float, energy_threshold: float | None = None
+    ) -> None:
+        """`energy_threshold` as calibrated or configured for the recorder."""
+        self.threshold_db = threshold_db
+        self.quiet_db = (
+            threshold_db if energy_threshold is None else energy_to_db(energy_threshold)
+        )
+        self.noise_floor_db = threshold_db - VAD_NOISE_MARGIN_DB
+        self.chunks = self.dropped_chunks = 0
+        self.total_second = self.skipped_second = 0.0
+
+    def speech_mask(self, samples: np.ndarray) -> np.ndarray:
+        """One bool per frame, dilated by the padding around speech."""
+        db, zcr = frame_db_and_zcr(samples)
+        if len(db) == 0:
+            return np.zeros(0, bool)
+        silent = db[db < self.quiet_db]
+        if len(silent):  # a chunk of continuous speech leaves the floor alone
+            quiet = float(np.median(silent))
+            # falls fast, rises slowly
+            rate = 0.5 if quiet < self.noise_floor_db else 0.05
+            self.noise_floor_db += rate * (quiet - self.noise_floor_db)
+            self.noise_floor_db = min(self.noise_floor_db, self.threshold_db)
+        level = max(self.threshold_db, self.noise_floor_db + VAD_NOISE_MARGIN_DB)
+        speech = (db > level) & (zcr < VAD_MAX_ZERO_CROSSING)
+        if np.count_nonzero(speech) * VAD_FRAME_SECOND < VAD_MIN_SPEECH_SECOND:
+            return np.zeros_like(speech)
+        pad = round(VAD_PAD_SECOND / VAD_FRAME_SECOND)
+        kernel = np.ones(2 * pad + 1)
+        return np.convolve(speech, kernel, mode="same") > 0
+
+    def has_speech(self, samples: np.ndarray) -> bool:
+        return bool(self.speech_mask(samples).any())
+
+    def trim(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Samples without the leading and trailing silence, empty when there
+        is no speech. Pauses inside the speech are kept.
+        """
+        start, end = self.voiced_span(samples)
+        trimmed = samples[start:end]
+        self.count(samples, trimmed)
+        return trimmed
+
+    def voiced_span(self, samples: np.ndarray) -> tuple[int, int]:
+        """Start and end of what `trim` keeps, without counting it."""
+        mask = self.speech_mask(samples)
+        voiced = np.flatnonzero(mask)
+        if len(voiced) == 0:
+            return 0, 0
+        last = voiced[-1] + 1  # keep the partial frame after the last one
+        end = len(samples) if last == len(mask) else last * _FRAME
+        return int(voiced[0]) * _FRAME, end
+
+    def count(self, samples: np.ndarray, kept: np.ndarray) -> None:
+        self.chunks += 1
+        self.dropped_chunks += len(kept) == 0
+        self.total_second += len(samples) / WHISPER_SAMPLE_RATE
+        self.skipped_second += (len(samples) - len(kept)) / WHISPER_SAMPLE_RATE
+
+    def stats(self) -> str:
+        return (
+            f"{self.dropped_chunks}/{self.chunks} chunks dropped, "
+            f"{self.skipped_second:.1f}s of {self.total_second:.1f}s audio not decoded"
+        )
@@ -1,34 +1,123 @@
-import os
+from collections import deque
+from contextlib import ExitStack, nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer
 from pathlib import Path
-from queue import Queue
-from time import sleep
-from typing import cast
+from queue import Empty, Queue
+from time import perf_counter
+from typing import Callable, ContextManager, NamedTuple, TypeVar, cast
 
-import torch
-import whisper
+import numpy as np
+from whisper_note.asr_backend import get_asr_backend
+from whisper_note.cli import RichTable
+from whisper_note.exporter import StreamingExporter, open_exporters
+from whisper_note.final_pass import load_merged_audio, transcribe_in_windows
+from whisper_note.inference import InferencePool
+from whisper_note.pipeline import BatchQueueWorker, QueueWorker
+from whisper_note.profiling import Profiler
 from whisper_note.recorder import ChunkedRecorder
+from whisper_note.scheduler import BacklogScheduler, DecodeLevel
+from whisper_note.streaming import StreamingHypothesis, carry_prompt
 from whisper_note.supportive_class import (
+    AsrBackendProtocol,
+    AudioChunk,
+    CachedTranslator,
     FrozenConfig,
     Language,
+    METRICS,
+    PreparedChunk,
+    RingSlice,
+    SharedAudioRing,
+    VoiceActivityDetector,
     WavTimeSizeQueue,
     get_translator,
     LOG,
+    WHISPER_SAMPLE_RATE,
+    serve_metrics,
 )
 from whisper_note.transcription import Transcriptions
 
+T = TypeVar("T")
+FIRST_TRANSCRIPT_BUDGET_SECOND = 15.0  # from creating the Transcriber
+PAUSE_RATIO = 0.9  # a streamed chunk shorter than this of the interval ends at a pause
+IDLE_INTERVALS = 2  # no streamed chunk for this many intervals ends the phrase
+RING_SECOND = 300  # how far the recorder may run ahead of `inference_workers`
+
+
+class InFlightDecode(NamedTuple):
+    """Chunks decoding in a worker process, in the order they were recorded."""
+
+    future: "Future[list[str]]"  # the texts of the voiced chunks
+    # time, size, duration, perf_counter() when captured, voiced
+    rows: list[tuple[datetime, int, float, float, bool]]
+    ring_end: int  # the ring is free up to here once decoded
+    submitted: float  # perf_counter()
+    voiced_second: float
+
 
 class Transcriber:
     config: FrozenConfig
-    whisper_model: whisper.Whisper
+    asr: AsrBackendProtocol
+    fallback_asr: "Future[AsrBackendProtocol] | None"  # loaded after `asr`
+    scheduler: BacklogScheduler | None
+    level: DecodeLevel  # of the chunk being transcribed
     data_q: WavTimeSizeQueue
     recorder: ChunkedRecorder
     transcription: Transcriptions
+    created_at: float  # perf_counter(), to measure the time to first transcript
+    translate_worker: BatchQueueWorker[int]  # index of the row to translate
+    render_worker: QueueWorker[bool]  # render requests, coalesced
+    export_worker: QueueWorker[int]  # index of the finalized row to export
+    exporters: list[StreamingExporter]
+    hypothesis: StreamingHypothesis | None  # only with `streaming_interval_ms`
+    prompt: str  # finalized text carried over to the next streamed phrase
+    vad: VoiceActivityDetector | None  # only with `in_memory_audio`
+    metrics_server: ThreadingHTTPServer | None  # only with `metrics_address`
+    ring: SharedAudioRing | None  # only with `inference_workers`
+    inference: InferencePool | None
+    _recognized_at: dict[int, float]  # perf_counter() of rows to translate
+    _captured_at: dict[int, float]  # perf_counter() of the audio of rows to export
 
-    def __init__(self, config: FrozenConfig) -> None:
+    def __init__(
+        self,
+        config: FrozenConfig,
+        recorder_factory: Callable[
+            [WavTimeSizeQueue, FrozenConfig], ChunkedRecorder
+        ] = ChunkedRecorder,
+        profiler: Profiler | None = None,
+    ) -> None:
+        """`recorder_factory` fills the queue, the microphone unless replaced."""
         self.config = config
-        self.whisper_model = self._load_whisper_model()
-        self.data_q = Queue()  # thread-safe queue, record audio in background
-        self.recorder = ChunkedRecorder(self.data_q, config)
+        self.profiler = profiler
+        self._chunk_count = 0
+        self.created_at = perf_counter()
+        # thread-safe queue, record audio in background. Unbounded on purpose:
+        # blocking the recording thread would drop audio from the microphone.
+        self.data_q = Queue()
+        # load the model while the microphone calibrates to the ambient noise
+        with ThreadPoolExecutor(1, "model-loader") as loader:
+            asr = loader.submit(get_asr_backend, config)
+            self.recorder = recorder_factory(self.data_q, config)
+            self.asr = asr.result()
+        self.fallback_asr = None
+        if config.fallback_model:  # not needed to start, load it meanwhile
+            fallback_config = config.mutated_copy(model=config.fallback_model)
+            loader = ThreadPoolExecutor(1, "fallback-loader")
+            self.fallback_asr = loader.submit(get_asr_backend, fallback_config)
+            loader.shutdown(wait=False)  # the thread finishes loading on its own
+        self.scheduler = (
+            BacklogScheduler(
+                config.backlog_max_chunks,
+                config.backlog_max_second,
+                has_fallback=bool(config.fallback_model),
+            )
+            if config.backlog_max_second
+            else None
+        )
+        self.level = DecodeLevel.NORMAL
+        LOG.info(f"Ready to record {perf_counter() - self.created_at:.1f}s after start")
         self.transcription = Transcriptions(
             live_print=True,
             live_translator=(
@@ -36,60 +125,460 @@ class Transcriber:
                 if self.config.translator == "NONE"
                 else get_translator(self.config)
             ),
+            rich_table=RichTable(config.live_table_rows, config.live_refresh_fps),
         )
         # output transcription
-
-    def _load_whisper_model(self) -> whisper.Whisper:
-        """Load / Download whisper model."""
-        model = self.config.model
-        # if self.config.source_lang == Language.EN and not model.endswith(".en"):
-        #     model += ".en"
-        LOG.info(f"Loading whisper model [{model}]")
-        try:
-            whisper_model = whisper.load_model(model)
-        except RuntimeError as e:
-            LOG.error(f"Failed to load whisper model [{model}]: {e}")
-        LOG.info(f"Whisper model [{model}] loaded.")
-        return whisper_model
+        self.translate_worker = BatchQueueWorker(
+            "translate",
+            self._profiled("translate", self._translate_rows),
+            config.pipeline_queue_size,
+            max_batch=config.translate_batch_size,
+            max_wait=config.translate_batch_ms / 1000,
+        )
+        self.render_worker = QueueWorker(
+            "render", self._profiled("render", self._render), maxsize=1
+        )
+        self.export_worker = QueueWorker(
+            "export",
+            self._profiled("export", self._export_row),
+            config.pipeline_queue_size,
+        )
+        self.exporters = []
+        self.hypothesis = (
+            StreamingHypothesis() if config.streaming_interval_ms else None
+        )
+        self.prompt = ""
+        self.metrics_server = None
+        self._recognized_at = {}
+        self._captured_at = {}
+        self.vad = (
+            VoiceActivityDetector(
+                config.vad_threshold_db, self.recorder.recognizer.energy_threshold
+            )
+            if config.vad and config.in_memory_audio
+            else None
+        )
+        self.ring = None
+        self.inference = None
+        if config.inference_workers:
+            self.ring = SharedAudioRing(RING_SECOND * WHISPER_SAMPLE_RATE)
+            self.inference = InferencePool(config, self.ring)
+            self.recorder.start_sharing(self.ring)
+        elif config.in_memory_audio and self.hypothesis is None:
+            # the streamed phrase grows chunk by chunk, nothing to precompute
+            self.recorder.start_preparing(self._prepare)
+        # decodes in flight, beyond one per worker the ASR stage waits
+        self.results_worker = QueueWorker(
+            "results",
+            self._profiled("results", self._collect_rows),
+            max(config.inference_workers, 1),
+        )
 
     def live_transcribe(self) -> None:
+        """
+        Run the ASR stage on this thread. Translation and rendering run on
+        their own workers, so a slow translator never delays the next chunk.
+        """
+        # cues are timed from the recording, it started before the model loaded
+        self.exporters = open_exporters(self.config, self.recorder.started_at)
+        if self.config.metrics_address:
+            self.metrics_server = serve_metrics(self.config.metrics_address)
+            LOG.info(f"Metrics at http://{self.config.metrics_address}/metrics")
+        self.translate_worker.start()
+        self.render_worker.start()
+        self.export_worker.start()
+        if self.inference is not None:
+            self.results_worker.start()
         LOG.info("Recording started...")  # Cue the user to go.
         while True:
             try:  # to not block the keyboard interrupt
-                temp_wav, time, size = self.recorder.get_next_part()
-                if temp_wav is None:
-                    sleep(0.3)  # uninterruptedly recording in another thread
-                    continue
-                text = self._transcribe_wav(Path(temp_wav.name))
-                if text == "":
-                    continue
-                self.transcription.add_phrase(time, text, size)
-                self.transcription.rich_print(self.recorder.pending_time_size)
-            except KeyboardInterrupt:
+                # blocks until the recorder thread hands over a chunk
+                part = chunk, time, size, captured = self._next_part()
+                METRICS.set("queue_depth", len(self.recorder.pending_time_size))
+                # in wall time, a replay runs ahead of the timestamps
+                wait = perf_counter() - captured
+                METRICS.observe("queue_wait_seconds", wait)
+                if self.scheduler is not None:
+                    self.level = self.scheduler.update(
+                        len(self.recorder.pending_time_size), wait
+                    )
+                if self.hypothesis is not None:
+                    assert isinstance(chunk, np.ndarray), "Uncaught invalid config"
+                    self._on_new_row(self._stream_chunk(chunk, time, size, captured))
+                elif isinstance(chunk, (np.ndarray, PreparedChunk, RingSlice)):
+                    # decode the chunks that piled up behind this one together
+                    parts = self.recorder.get_ready_parts(
+                        self.config.decode_batch_size - 1
+                    )
+                    for *_, part_captured in parts:
+                        wait = perf_counter() - part_captured
+                        METRICS.observe("queue_wait_seconds", wait)
+                    if self.inference is not None:
+                        self._submit_parts([part] + parts)
+                        continue
+                    for index in self._transcribe_parts([part] + parts):
+                        self._on_new_row(index)
+                else:
+                    text = self._transcribe_wav(Path(chunk.name))
+                    self._on_new_row(
+                        self._add_row(
+                            time, text, size, self._chunk_second(chunk, size), captured
+                        )
+                    )
+            except (KeyboardInterrupt, EOFError):  # Ctrl+C or the audio ended
                 break
         # If the loop is broken, we are done recording.
-        self._on_stop_recording()
+        self.recorder.close_source()
+        if self.hypothesis is not None and self.hypothesis.chunks:
+            # the time of its last chunk, as the archive has it
+            ended = cast(datetime, self.hypothesis.ended)
+            self._on_new_row(self._finalize_stream(ended))
+        self.results_worker.stop()  # adds the rows still decoding
+        if self.inference is not None and self.ring is not None:
+            self.inference.shutdown()
+            self.ring.close(unlink=True)
+        self.translate_worker.stop()  # translate what is already transcribed
+        self.export_worker.stop()
+        self.render_worker.stop()
+        self._render(True)
+        self.transcription.rich_table.close()  # draws the last frame
+        profiler = self.profiler
+        with nullcontext() if profiler is None else profiler.cprofile("on_stop"):
+            self._on_stop_recording()
+        if profiler is not None:
+            profiler.close()  # writes the flame graph
+
+    def _profiled(self, stage: str, handle: Callable[[T], None]) -> Callable[[T], None]:
+        """The handler of a pipeline stage, in a span when profiling."""
+        profiler = self.profiler
+        if profiler is None:
+            return handle
+
+        def handle_in_span(item: T) -> None:
+            with profiler.span(stage):
+                handle(item)
+
+        return handle_in_span
 
-    def _transcribe_wav(self, path: Path) -> str:
-        transcribed = self.whisper_model.transcribe(
-            str(path), fp16=torch.cuda.is_available()
-        )  # Get transcription from the whisper.
-        return cast(str, transcribed["text"]).strip()
+    def _asr_span(self, chunks: int) -> ContextManager:
+        if self.profiler is None:
+            return nullcontext()
+        span = self.profiler.span("asr", chunk=self._chunk_count, chunks=chunks)
+        torch_profile = self.profiler.torch_profile(self._chunk_count)
+        stack = ExitStack()
+        stack.enter_context(span)
+        stack.enter_context(torch_profile)
+        return stack
+
+    def _on_new_row(self, index: int | None) -> None:
+        if index == 0:
+            self._log_first_transcript()
+        if index is not None and self.transcription.live_translator:
+            self._recognized_at[index] = perf_counter()
+            self.translate_worker.put(index)
+            METRICS.set("translate_queue_depth", self.translate_worker.inbox.qsize())
+        elif index is not None:
+            self.export_worker.put(index)  # final without translation
+        self.render_worker.offer(True)
+
+    def _prepare(self, samples: np.ndarray) -> PreparedChunk:
+        """Trim and compute the model input, on the recorder's feature thread."""
+        started = perf_counter()
+        voiced = samples if self.vad is None else self.vad.trim(samples)
+        features = self.asr.features(voiced) if len(voiced) else None
+        METRICS.observe("features_seconds", perf_counter() - started)
+        return PreparedChunk(samples, voiced, features)
+
+    def _transcribe_parts(
+        self, parts: list[tuple[np.ndarray | PreparedChunk, datetime, int, float]]
+    ) -> list[int | None]:
+        """Transcribe the chunks in one batch, add a row per chunk in order."""
+        # chunks recorded before the model loaded are not prepared yet
+        chunks = [
+            chunk
+            if isinstance(chunk, PreparedChunk)
+            else PreparedChunk(chunk, self.vad.trim(chunk) if self.vad else chunk, None)
+            for chunk, *_ in parts
+        ]
+        voiced = [chunk for chunk in chunks if len(chunk.voiced)]
+        asr = self._current_asr()
+        # the fallback model may take other features, it computes its own
+        features = [chunk.features for chunk in voiced] if asr is self.asr else None
+        started = perf_counter()
+        with self._asr_span(len(voiced)):
+            texts = asr.transcribe_batch(
+                [chunk.voiced for chunk in voiced], *self._options(), features=features
+            )
+        self._chunk_count += len(parts)
+        if voiced:
+            voiced_samples = sum(len(chunk.voiced) for chunk in voiced)
+            self._observe_asr(started, voiced_samples / WHISPER_SAMPLE_RATE)
+        voiced_texts = iter(texts)
+        return [
+            self._add_row(
+                time,
+                next(voiced_texts) if len(chunk.voiced) else "",
+                size,
+                len(chunk.samples) / WHISPER_SAMPLE_RATE,
+                captured,
+            )
+            for chunk, (_, time, size, captured) in zip(chunks, parts)
+        ]
+
+    def _submit_parts(
+        self, parts: list[tuple[AudioChunk, datetime, int, float]]
+    ) -> None:
+        """
+        Trim the chunks and hand them to a worker process as slices of the
+        ring. The results thread adds their rows once decoded.
+        """
+        assert self.inference is not None and self.ring is not None
+        audios: list[RingSlice | np.ndarray] = []
+        rows = []
+        ring_end = voiced_samples = 0
+        for chunk, time, size, captured in parts:
+            if isinstance(chunk, RingSlice):
+                samples = self.ring.read(chunk)  # in place, not copied
+                ring_end = chunk.start + chunk.length
+            else:  # recorded before sharing started, or the ring was full
+                samples = cast(np.ndarray, chunk)
+            start, end = 0, len(samples)
+            if self.vad is not None:
+                start, end = self.vad.voiced_span(samples)
+                self.vad.count(samples, samples[start:end])
+            if end > start:
+                audios.append(
+                    RingSlice(chunk.start + start, end - start)
+                    if isinstance(chunk, RingSlice)
+                    else samples[start:end]
+                )
+                voiced_samples += end - start
+            duration = len(samples) / WHISPER_SAMPLE_RATE
+            rows.append((time, size, duration, captured, end > start))
+        self._chunk_count += len(parts)
+        future = self._submit_to_workers(audios)
+        voiced_second = voiced_samples / WHISPER_SAMPLE_RATE
+        self.results_worker.put(
+            InFlightDecode(future, rows, ring_end, perf_counter(), voiced_second)
+        )
+
+    def _submit_to_workers(
+        self, audios: list[RingSlice | np.ndarray]
+    ) -> "Future[list[str]]":
+        """Decode in a worker process, or here once the workers kept dying."""
+        assert self.inference is not None and self.ring is not None
+        if not self.inference.broken:
+            try:
+                return self.inference.submit(audios, *self._options())
+            except BrokenProcessPool:
+                LOG.exception("Inference workers keep dying, decoding here from now on")
+        done: Future[list[str]] = Future()
+        samples = [
+            self.ring.read(audio) if isinstance(audio, RingSlice) else audio
+            for audio in audios
+        ]
+        try:
+            done.set_result(
+                self._current_asr().transcribe_batch(samples, *self._options())
+                if samples
+                else []
+            )
+        except Exception as error:  # reported with the rows, as from a worker
+            done.set_exception(error)
+        return done
+
+    def _collect_rows(self, decode: InFlightDecode) -> None:
+        """Add the rows of one decode, on the results thread, in order."""
+        assert self.ring is not None
+        voiced = sum(row[-1] for row in decode.rows)
+        try:
+            texts = iter(decode.future.result())
+        except Exception:  # a crashed worker loses these rows, not the session
+            LOG.exception(f"Inference worker failed on {voiced} chunks")
+            texts = iter([""] * voiced)
+        self.ring.release(decode.ring_end)
+        if decode.voiced_second:
+            self._observe_asr(decode.submitted, decode.voiced_second)
+        for time, size, duration, captured, is_voiced in decode.rows:
+            text = next(texts) if is_voiced else ""
+            self._on_new_row(self._add_row(time, text, size, duration, captured))
+
+    def _next_part(self) -> tuple[AudioChunk, datetime, int, float]:
+        """
+        The next recorded chunk. When streaming, finalize the phrase first
+        if the speaker stopped: silence records no chunk at all, so either
+        none arrives for a while, or this one starts after a pause.
+        """
+        hypothesis = self.hypothesis
+        if hypothesis is None or not hypothesis.chunks:
+            return self.recorder.get_next_part()
+        interval = self.config.streaming_interval_ms / 1000
+        ended = cast(datetime, hypothesis.ended)
+        try:
+            part = self.recorder.get_next_part(timeout=interval * IDLE_INTERVALS)
+        except Empty:
+            self._on_new_row(self._finalize_stream(ended))
+            return self.recorder.get_next_part()
+        chunk, time, *_ = part
+        assert isinstance(chunk, np.ndarray), "Uncaught invalid config"
+        # the timestamps also tell a pause in a replay faster than real time
+        start = time - timedelta(seconds=len(chunk) / WHISPER_SAMPLE_RATE)
+        if (start - ended).total_seconds() > self.recorder.recognizer.pause_threshold:
+            self._on_new_row(self._finalize_stream(ended))
+        return part
+
+    def _stream_chunk(
+        self, samples: np.ndarray, time: datetime, size: int, captured: float
+    ) -> int | None:
+        """
+        Re-transcribe the phrase so far with the new chunk and show it as a
+        partial row. A chunk shorter than the interval was cut at a pause,
+        which finalizes the phrase, as does reaching `phrase_max_second`.
+        """
+        assert self.hypothesis is not None
+        if self.vad is not None and not self.vad.has_speech(samples):
+            # a silent chunk is a pause, it is not added to the phrase
+            self.vad.count(samples, samples[:0])
+            return self._finalize_stream(time) if self.hypothesis.chunks else None
+        if self.vad is not None:
+            self.vad.count(samples, samples)
+        self.hypothesis.append(samples, time, size, captured)
+        interval = self.config.streaming_interval_ms / 1000
+        paused = len(samples) < interval * WHISPER_SAMPLE_RATE * PAUSE_RATIO
+        if paused or self.hypothesis.duration >= self.config.phrase_max_second:
+            return self._finalize_stream(time)
+        if not self.data_q.empty():
+            return None  # behind, decode once with the chunks already waiting
+        self.hypothesis.update(self._transcribe_wav(self.hypothesis.audio()))
+        self.transcription.set_partial(
+            self.hypothesis.started,
+            self.hypothesis.stable_text,
+            self.hypothesis.unstable_text,
+        )
+        return None
+
+    def _finalize_stream(self, time: datetime) -> int | None:
+        assert self.hypothesis is not None
+        text = self._transcribe_wav(self.hypothesis.audio())
+        hypothesis = self.hypothesis
+        index = self._add_row(
+            time, text, hypothesis.size, hypothesis.duration, hypothesis.captured
+        )
+        if index is not None:
+            self.prompt = carry_prompt(self.prompt, text)
+        self.hypothesis.reset()
+        self.transcription.set_partial(None)
+        return index
+
+    def _add_row(
+        self, time: datetime, text: str, size: int, duration: float, captured: float
+    ) -> int | None:
+        """Add a row, remembering when its audio was captured for the export."""
+        index = self.transcription.add_phrase(time, text, size, duration)
+        if index is not None:
+            self._captured_at[index] = captured
+        return index
+
+    def _log_first_transcript(self) -> None:
+        elapsed = perf_counter() - self.created_at
+        if elapsed > FIRST_TRANSCRIPT_BUDGET_SECOND:
+            LOG.warning(
+                f"First transcript took {elapsed:.1f}s, "
+                f"over the {FIRST_TRANSCRIPT_BUDGET_SECOND}s budget"
+            )
+        else:
+            LOG.info(f"First transcript {elapsed:.1f}s after start")
+
+    def _translate_rows(self, indices: list[int]) -> None:
+        # one request for the phrases coalesced in the batch window
+        started = perf_counter()
+        try:
+            self.transcription.live_translate_batch(indices)  # updates rows in place
+            METRICS.observe("translate_seconds", perf_counter() - started)
+        finally:  # a failed translation still exports the rows, untranslated
+            done = perf_counter()
+            for index in indices:
+                recognized = self._recognized_at.pop(index, done)
+                METRICS.observe("translation_lag_seconds", done - recognized)
+                self.export_worker.put(index)
+            self.render_worker.offer(True)
+
+    def _export_row(self, index: int) -> None:
+        phrase = self.transcription.phrases[index]
+        for exporter in self.exporters:
+            exporter.write(phrase)
+        captured = self._captured_at.pop(index, None)
+        if captured is not None:
+            METRICS.observe("end_to_end_seconds", perf_counter() - captured)
+
+    def _chunk_second(self, chunk: AudioChunk, size: int) -> float:
+        if isinstance(chunk, np.ndarray):
+            return len(chunk) / WHISPER_SAMPLE_RATE
+        rate, width = self.recorder.sample_rate_width
+        return size / (rate * width)  # a wav file, the header is negligible
+
+    def _render(self, _: bool) -> None:
+        # copy, the recording thread appends to the deque while we render
+        self.transcription.rich_print(deque(self.recorder.pending_time_size))
+
+    def _transcribe_wav(self, wav: Path | np.ndarray) -> str:
+        """Transcribe a wav file, or 16 kHz float32 samples without ffmpeg."""
+        audio = str(wav) if isinstance(wav, Path) else wav
+        started = perf_counter()
+        with self._asr_span(1):
+            text = self._current_asr().transcribe(audio, *self._options())
+        self._chunk_count += 1
+        self._observe_asr(
+            started, 0.0 if isinstance(wav, Path) else len(wav) / WHISPER_SAMPLE_RATE
+        )
+        return text
+
+    @staticmethod
+    def _observe_asr(started: float, audio_second: float) -> None:
+        elapsed = perf_counter() - started
+        METRICS.observe("asr_seconds", elapsed)
+        METRICS.inc("asr_calls_total")
+        if audio_second:  # unknown for wav files
+            METRICS.observe("asr_real_time_factor", elapsed / audio_second)
+            METRICS.inc("audio_seconds_total", audio_second)
+
+    def _current_asr(self) -> AsrBackendProtocol:
+        if self.level == DecodeLevel.FALLBACK_MODEL and self._fallback_ready():
+            return cast(Future, self.fallback_asr).result()
+        return self.asr
+
+    def _options(self) -> tuple[str, bool]:
+        """The prompt and `fast` arguments of the backend."""
+        return self.prompt, self.level > DecodeLevel.NORMAL
+
+    def _fallback_ready(self) -> bool:
+        future = self.fallback_asr
+        return future is not None and future.done() and future.exception() is None
 
     def _on_stop_recording(self):  # #TODO: add summary with ChatGPT
+        if self.vad is not None:
+            LOG.info(f"Voice activity detection: {self.vad.stats()}")
+        if self.scheduler is not None:
+            LOG.info(f"Backlog scheduler: {self.scheduler.stats()}")
+        LOG.info(f"Pipeline metrics, in seconds:\n{METRICS.summary()}")
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+
+        translator = self.transcription.live_translator
+        if isinstance(translator, CachedTranslator):
+            LOG.info(f"Translation cache saved calls: {translator.stats()}")
+            translator.close()
+
         if self.config.store_merged_wav:  # double checking is good
             LOG.info("Stopping recording...")
-            self.recorder.write_merged_wav()
-            for wav in self.recorder.all_wav:
-                wav.close()
-                LOG.debug(f"Deleting piece {wav.name}")
-                os.remove(wav.name)
-            LOG.info(f"Merged wav generated: {self.config.merged_transcription}")
+            merged_wav = self.recorder.close_merged_wav()  # only closes the file
+            LOG.info(f"Merged recording generated: {merged_wav}")
 
         if self.config.merged_transcription:
             assert self.config.store_merged_wav is not None, "Uncaught invalid config"
             LOG.info("generating transcription...")
-            txt = self._transcribe_wav(self.config.store_merged_wav)
+            samples = load_merged_audio(self.config.store_merged_wav)
+            txt = transcribe_in_windows(samples, self.config, self.asr.transcribe)
             if txt == "":
                 LOG.info("No transcription generated. Discarding merged transcription.")
             else:
@@ -97,12 +586,8 @@ class Transcriber:
                     f.write(txt)
             LOG.info(f"Merged text generated: {self.config.merged_transcription}")
 
-        if self.config.live_history_html:
-            LOG.info("generating HTML of live transcription history...")
-            self.transcription.export_history_html(self.config.live_history_html)
-            LOG.info(
-                f"HTML of live transcription history generated: {self.config.live_history_html}"
-            )
+        for exporter in self.exporters:  # rows are already written
+            LOG.info(f"Live transcription history saved: {exporter.close()}")
 
     def get_transcription(self):
         return self.transcription
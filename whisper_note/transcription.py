@@ -1,97 +1,159 @@
+from array import array
+from bisect import bisect_left
 from collections import deque
 import os
 from datetime import datetime
-from pathlib import Path
-from typing import Iterator
+from typing import Iterator, Sequence
 from whisper_note.cli import RichTable
 
 
 from whisper_note.supportive_class import TranslatorProtocol, format_local_time
 
 
+class Phrase:
+    """One transcript row, slotted to keep all-day sessions small."""
+
+    __slots__ = (
+        "timestamp",
+        "time_str",
+        "text",
+        "translated_text",
+        "wav_size",
+        "duration",
+    )
+    timestamp: datetime  # when the recording of the phrase ended
+    time_str: str
+    text: str
+    translated_text: str  # filled in place when the translation arrives
+    wav_size: int
+    duration: float  # seconds of audio, 0 if unknown
+
+    def __init__(
+        self, timestamp: datetime, text: str, wav_size: int, duration: float = 0.0
+    ) -> None:
+        self.timestamp = timestamp
+        self.time_str = format_local_time(timestamp)
+        self.text = text
+        self.translated_text = ""
+        self.wav_size = wav_size
+        self.duration = duration
+
+    def format_for_rich(self) -> tuple[str, str, int, bool, bool]:
+        tran = self.translated_text
+        return (self.time_str, self.text + "\n" + tran, self.wav_size, True, bool(tran))
+
+
 class Transcriptions:
     """
     Will print upon updating the last phrase, unless told not to.
+    Phrases are added without translation, `live_translate` fills a row in
+    place later, so a slow translator does not hold up the transcription.
     """
 
-    timestamp: list[datetime]
-    time_str: list[str]
-    text: list[str]
-    translated_text: list[str]
-    wav_sizes: list[int]
-    # these five properties above are strongly coupled, should combine them.
+    phrases: list[Phrase]
+    epochs: array  # array("d") of POSIX timestamps, to slice by time
+    partial: tuple[datetime, str, str] | None  # streaming: time, stable, unstable
     live_print: bool
     live_translator: TranslatorProtocol | None
     # maybe another full text translator
-    rich_table = RichTable()
+    rich_table: RichTable
 
     def __init__(
         self,
         live_print: bool,
         live_translator: TranslatorProtocol | None = None,
+        rich_table: RichTable | None = None,
     ) -> None:
-        self.timestamp = []
-        self.text = []
-        self.time_str = []
-        self.wav_sizes = []
-        self.translated_text = []
+        self.phrases = []
+        self.epochs = array("d")
+        self.partial = None
         self.live_print = live_print
         self.live_translator = live_translator
+        self.rich_table = rich_table or RichTable()
 
-    def add_phrase(self, timestamp: datetime, text: str, wav_size: int) -> None:
+    def add_phrase(
+        self, timestamp: datetime, text: str, wav_size: int, duration: float = 0.0
+    ) -> int | None:
+        """Append a phrase, return its index to translate it later."""
         if text.strip() == "":
-            return
-        self.timestamp.append(timestamp)
-        self.time_str.append(format_local_time(timestamp))
-        self.text.append(text)
-        self.translated_text.append("")
-        self.wav_sizes.append(wav_size)
-        self.live_translate(len(self.text) - 1)
+            return None
+        self.epochs.append(timestamp.timestamp())
+        phrase = Phrase(timestamp, text, wav_size, duration)
+        self.phrases.append(phrase)  # readers see it now
+        return len(self.phrases) - 1
+
+    def set_partial(
+        self, timestamp: datetime | None, stable: str = "", unstable: str = ""
+    ) -> None:
+        """Show the phrase being spoken, or nothing with `timestamp=None`."""
+        self.partial = None if timestamp is None else (timestamp, stable, unstable)
+
+    def between(self, start: datetime, end: datetime) -> list[Phrase]:
+        """Phrases with `start <= timestamp < end`, phrases are added in order."""
+        lo = bisect_left(self.epochs, start.timestamp())
+        hi = bisect_left(self.epochs, end.timestamp())
+        return self.phrases[lo:hi]
 
     def live_translate(self, index: int) -> str:
         # this should be exclusive, but we are only calling it once.
-        assert 0 <= index < len(self.text), f"Transcriptions index {index} out of range"
+        return self.live_translate_batch([index])[0]
+
+    def live_translate_batch(self, indices: Sequence[int]) -> list[str]:
+        """Translate the rows with one translator request, update them in place."""
+        for index in indices:
+            assert (
+                0 <= index < len(self.phrases)
+            ), f"Transcriptions index {index} out of range"
         if not self.live_translator:
-            return ""
-        if self.translated_text[index] == "":
-            translation = self.live_translator.translate(self.text[index])
-            self.translated_text[index] = translation
-        return self.translated_text[index]
-
-    def format_for_rich(self) -> Iterator[tuple[str, str, int, bool, bool]]:
-        yield from (
-            (ts, txt + "\n" + tran, sz, True, bool(tran))
-            for ts, txt, sz, tran, in zip(
-                self.time_str, self.text, self.wav_sizes, self.translated_text
+            return ["" for _ in indices]
+        todo = [
+            self.phrases[i]
+            for i in dict.fromkeys(indices)
+            if self.phrases[i].translated_text == ""
+        ]
+        if todo:
+            translations = self.live_translator.translate_batch(
+                [phrase.text for phrase in todo]
             )
-        )
+            for phrase, translation in zip(todo, translations):
+                phrase.translated_text = translation
+        return [self.phrases[index].translated_text for index in indices]
+
+    def format_for_rich(
+        self, start: int = 0
+    ) -> Iterator[tuple[str, str, int, bool, bool]]:
+        yield from (phrase.format_for_rich() for phrase in self.phrases[start:])
 
     # #TODO: add a no_truncate option
     def rich_print(self, pending_recordings: deque[tuple[datetime, int]]) -> None:
-        self.rich_table.live_print(self.format_for_rich(), pending_recordings)
+        # only the rows in the viewport are formatted and handed over
+        start = max(len(self.phrases) - self.rich_table.max_rows, 0)
+        self.rich_table.live_print(
+            self.format_for_rich(start),
+            pending_recordings,
+            first_index=start,
+            partial=self.partial,
+        )
 
     def clear(self) -> None:  # never used
-        self.timestamp.clear()
-        self.time_str.clear()
-        self.text.clear()
-        self.translated_text.clear()
-
-    def export_history_html(self, path: Path) -> None:
-        self.rich_table.save_history_html(self.format_for_rich(), path)
+        self.phrases.clear()
+        del self.epochs[:]
+        self.partial = None
 
     def __str__(self) -> str:
-        return "\n".join(self.text)
+        return "\n".join(phrase.text for phrase in self.phrases)
 
     def __repr__(self) -> str:
-        return f"Transcripts({self.timestamp}, {self.text})"
+        return f"Transcripts({[(p.timestamp, p.text) for p in self.phrases]})"
 
     def __len__(self) -> int:
-        return len(self.text)
+        return len(self.phrases)
 
     def __iter__(self) -> Iterator[tuple[str, str, str] | None]:
         i = 0
         while True:
             if i >= len(self):
                 yield None
-            yield self.time_str[i], self.text[i], self.translated_text[i]
+            phrase = self.phrases[i]
+            yield phrase.time_str, phrase.text, phrase.translated_text
             i += 1